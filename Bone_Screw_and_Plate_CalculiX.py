@@ -0,0 +1,479 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code to solve the Bone and Screw model with CalculiX (ccx)
+#   (plain Python, exports a flat Abaqus deck to the CalculiX keyword subset
+#    and reads the .frd results, no Abaqus licence needed to solve)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     1. Write a flat input deck of the model once
+#      >>abaqus cae noGUI=Bone_Screw_and_Plate_Final_Model.py -- jobAction="Write Input" inputFormat=Flat
+#
+#     2. Solve it with ccx
+#      >>python Bone_Screw_and_Plate_CalculiX.py Job-1.inp
+#       or solve the variants of a table (columns of the deck patcher:
+#       jobName, Ecortical, Etrabecular, Eplate, Escrew, DispLoad,
+#       contactForm, fricFact) on all cores
+#      >>python Bone_Screw_and_Plate_CalculiX.py Job-1.inp variants.csv
+#
+#     1. The deck is translated keyword by keyword
+#          *NODE, *ELEMENT, *NSET, *ELSET, *SURFACE, *MATERIAL, *ELASTIC,
+#          *DENSITY, *SOLID SECTION  - copied (C3D10M written as C3D10)
+#          *TIE                      - copied with the position tolerance
+#          *SURFACE INTERACTION,
+#          *FRICTION                 - linear pressure-overclosure with
+#                                      normalStiffness, and friction with a
+#                                      stick slope (rough friction as
+#                                      roughFriction, Lagrange friction with
+#                                      the stiffer lagrangeStickSlope)
+#          *CONTACT PAIR             - surface to surface
+#          *BOUNDARY                 - XSYMM, YSYMM, ZSYMM, PINNED and
+#                                      ENCASTRE as degrees of freedom
+#          *STEP, *STATIC            - copied, with U and RF, S and the
+#                                      contact displacements and stresses
+#                                      written to the .frd file
+#        Output requests and solver and contact controls are dropped; decks
+#        with parts and instances, amplitudes or other procedures are
+#        rejected. Names are written without spaces or quotes
+#     2. Each deck is solved by ccx in its own job directory with ccxThreads
+#        threads, numWorkers decks at a time
+#     3. The displacement, reaction force, contact pressure and slip of each
+#        increment are read from the .frd file into the same results as the
+#        Abaqus results script (<jobName>_results.json)
+#
+#     The ccx command can be changed with the environment variable CCX_CMD
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import os
+import re
+import sys
+import json
+import time
+import subprocess
+from math import hypot
+from concurrent.futures import ThreadPoolExecutor
+from Bone_Screw_and_Plate_Runner import runVariant, readTable, writeTable, MODEL_SCRIPT
+from Bone_Screw_and_Plate_Inp_Patcher import readTemplate, renderVariant
+
+# *****************************************************************************
+# Create a list of 'CalculiX' parameters
+# *****************************************************************************
+
+# ccx command
+CCX=os.environ.get('CCX_CMD', 'ccx')
+
+# Slope of the linear pressure-overclosure of the contact (N/mm^3)
+normalStiffness=2e5
+
+# Stick slope of penalty (Coulomb) and Lagrange friction (N/mm^3), and
+#   friction coefficient standing in for rough (no slip) friction
+stickSlope=5e4
+lagrangeStickSlope=2e6
+roughFriction=100.0
+
+# Threads of each ccx job and number of jobs solved at the same time
+ccxThreads=1
+numWorkers=max(1, (os.cpu_count() or 1)//ccxThreads)
+
+# Element types renamed for CalculiX
+elementTypes={'C3D10M':'C3D10'}
+
+# Degrees of freedom (first, last) of the symmetry keywords of *BOUNDARY
+symmetryDofs={'XSYMM':(1, 1), 'YSYMM':(2, 2), 'ZSYMM':(3, 3), 'PINNED':(1, 3),
+	'ENCASTRE':(1, 3)}
+
+# Keywords copied with their parameters (names written for CalculiX), and
+#   keywords dropped with their data lines
+copiedKeywords=['heading', 'node', 'element', 'nset', 'elset', 'surface',
+	'material', 'elastic', 'density']
+droppedKeywords=['preprint', 'output', 'node output', 'element output',
+	'contact output', 'energy output', 'restart', 'controls', 'solver controls',
+	'contact controls', 'contact stabilization', 'surface behavior', 'monitor',
+	'print', 'node print', 'el print', 'file format']
+
+# Output of each step in the .frd file
+stepOutput=['*NODE FILE', 'U, RF', '*EL FILE', 'S', '*CONTACT FILE', 'CDIS, CSTR']
+
+# Name of the loaded node set and message of a completed ccx job
+loadedSet='Bone X Plane'
+COMPLETED_MESSAGE='Job finished'
+
+# Directory of the runs and table of results of a sweep
+workDir='runs'
+resultsTable='calculix_results.csv'
+
+# *****************************************************************************
+# Define Functions to Write Names and Keyword Lines for CalculiX
+# *****************************************************************************
+def ccxName(name):
+	# No spaces, quotes or other characters outside [A-Za-z0-9_-]
+	return re.sub(r'[^A-Za-z0-9_\-]', '_', name.strip().strip('"'))[:80]
+
+def _keyword(line):
+	# Quoted names may contain commas
+	fields=re.findall(r'(?:[^,"]|"[^"]*")+', line[1:])
+	params=[]
+	for field in fields[1:]:
+		if '=' in field:
+			k, v=field.split('=', 1)
+			params.append((k.strip().lower(), v.strip()))
+		elif field.strip():
+			params.append((field.strip().lower(), None))
+	return fields[0].strip().lower(), params
+
+def _keywordLine(keyword, params):
+	fields=['*'+keyword.upper()]
+	for k, v in params:
+		if v is None:
+			fields.append(k.upper())
+		elif k in ('name', 'nset', 'elset', 'material', 'interaction'):
+			fields.append('%s=%s' % (k.upper(), ccxName(v)))
+		else:
+			fields.append('%s=%s' % (k.upper(), v))
+	return ', '.join(fields)
+
+def _dataLine(line):
+	# Names in the data lines of sets, surfaces, ties, contact pairs and
+	#   boundaries are written for CalculiX, numbers and face labels as given
+	fields=[]
+	for field in line.split(','):
+		value=field.strip()
+		try:
+			float(value)
+		except ValueError:
+			if value and not re.match(r'^(S\d|SPOS|SNEG)$', value.upper()) and \
+				value.upper() not in symmetryDofs:
+				value=ccxName(value)
+		fields.append(value)
+	return ', '.join(fields)
+
+# *****************************************************************************
+# Define Function to Export a Flat Abaqus Deck to CalculiX
+# *****************************************************************************
+def exportDeck(inpPath, ccxPath):
+	# Returns the names of the steps of the deck
+	blocks=[]
+	f=open(inpPath)
+	try:
+		for line in f:
+			line=line.strip()
+			if line.startswith('**') or not line:
+				continue
+			if line.startswith('*'):
+				blocks.append([_keyword(line), []])
+			elif blocks:
+				# Long element definitions continue on the next line
+				if blocks[-1][0][0]=='element' and blocks[-1][1] and blocks[-1][1][-1].endswith(','):
+					blocks[-1][1][-1]+=line
+				else:
+					blocks[-1][1].append(line)
+	finally:
+		f.close()
+
+	out=[]
+	stepNames=[]
+	friction=None
+	for (keyword, params), data in blocks:
+		paramDict=dict(params)
+
+		# ================= Model Data =====================================
+		if keyword in copiedKeywords:
+			if keyword=='element':
+				params=[(k, elementTypes.get(v.upper(), v.upper()) if k=='type' else v)
+					for k, v in params]
+			params=[(k, v) for k, v in params if k not in ('internal', 'instance')]
+			out.append(_keywordLine(keyword, params))
+			if keyword in ('nset', 'elset', 'surface'):
+				out+=[_dataLine(line) for line in data]
+			else:
+				out+=data
+		elif keyword=='solid section':
+			out.append(_keywordLine(keyword, [(k, v) for k, v in params
+				if k in ('elset', 'material')]))
+		elif keyword=='tie':
+			tieParams=[(k, v) for k, v in params if k in ('name', 'position tolerance')]
+			out.append(_keywordLine(keyword, tieParams))
+			out+=[_dataLine(line) for line in data]
+
+		# ================= Contact ========================================
+		elif keyword=='surface interaction':
+			out.append(_keywordLine(keyword, [('name', paramDict['name'])]))
+			out.append('*SURFACE BEHAVIOR, PRESSURE-OVERCLOSURE=LINEAR')
+			out.append('%g' % normalStiffness)
+		elif keyword=='friction':
+			if 'rough' in paramDict:
+				mu, slope=roughFriction, lagrangeStickSlope
+			elif 'lagrange' in paramDict:
+				mu, slope=float(data[0].split(',')[0]), lagrangeStickSlope
+			else:
+				mu, slope=float(data[0].split(',')[0]), stickSlope
+			out.append('*FRICTION')
+			out.append('%g, %g' % (mu, slope))
+		elif keyword=='contact pair':
+			out.append(_keywordLine(keyword, [('interaction', paramDict['interaction']),
+				('type', 'SURFACE TO SURFACE')]))
+			out+=[_dataLine(line) for line in data]
+
+		# ================= Boundary Conditions ============================
+		elif keyword=='boundary':
+			if 'type' in paramDict or 'submodel' in paramDict or 'amplitude' in paramDict:
+				raise ValueError('*BOUNDARY with %s is not exported to CalculiX' %
+					', '.join([k for k, v in params]))
+			out.append(_keywordLine(keyword, [(k, v) for k, v in params if k=='op']))
+			for line in data:
+				values=[v.strip() for v in line.split(',')]
+				if len(values)>1 and values[1].upper() in symmetryDofs:
+					first, last=symmetryDofs[values[1].upper()]
+					line='%s, %d, %d' % (values[0], first, last)
+				out.append(_dataLine(line))
+
+		# ================= Steps ==========================================
+		elif keyword=='step':
+			stepNames.append(paramDict.get('name', 'Step-%d' % (len(stepNames)+1)).strip('"'))
+			stepParams=[('inc', paramDict['inc'])] if 'inc' in paramDict else []
+			if (paramDict.get('nlgeom') or 'NO').upper()=='YES':
+				stepParams.append(('nlgeom', None))
+			out.append(_keywordLine(keyword, stepParams))
+		elif keyword=='static':
+			out.append('*STATIC')
+			out+=data
+		elif keyword=='end step':
+			out+=stepOutput
+			out.append('*END STEP')
+		elif keyword in droppedKeywords:
+			continue
+		else:
+			raise ValueError('*%s is not exported to CalculiX (write the deck with '
+				'inputFormat=Flat and the static step)' % keyword.upper())
+
+	f=open(ccxPath, 'w')
+	try:
+		f.write('\n'.join(out)+'\n')
+	finally:
+		f.close()
+	return stepNames
+
+# *****************************************************************************
+# Define Function to Read the Node Sets of a CalculiX Deck
+# *****************************************************************************
+def readNsets(ccxPath):
+	nsets={}
+	name=None
+	generate=False
+	f=open(ccxPath)
+	try:
+		for line in f:
+			if line.startswith('*'):
+				keyword, params=_keyword(line.strip())
+				name=dict(params).get('nset') if keyword=='nset' else None
+				generate='generate' in dict(params)
+				continue
+			if name is None:
+				continue
+			values=[int(v) for v in line.split(',') if v.strip()]
+			if generate:
+				values=list(range(values[0], values[1]+1, values[2] if len(values)>2 else 1))
+			nsets.setdefault(name.upper(), []).extend(values)
+	finally:
+		f.close()
+	return nsets
+
+# *****************************************************************************
+# Define Function to Read the Results of a .frd File
+# *****************************************************************************
+def readFrd(frdPath):
+	# Returns one frame per increment written, each with the step number, the
+	#   time and the nodal values of every component ({name:{node:value}})
+	frames=[]
+	step=None
+	block=None
+	components=[]
+	f=open(frdPath)
+	try:
+		for line in f:
+			key=line[:6].strip()
+			if line.startswith('    1PSTEP'):
+				step=int(line.split()[-1])
+			elif key.startswith('100C'):
+				frames.append({'step':step, 'time':float(line.split()[2]), 'values':{}})
+				block=frames[-1]
+				components=[]
+			elif block is None:
+				continue
+			elif line.startswith(' -4'):
+				components=[]
+			elif line.startswith(' -5'):
+				components.append(line.split()[1])
+			elif line.startswith(' -1'):
+				node=int(line[3:13])
+				values=[float(line[13+12*i:25+12*i]) for i in range((len(line.rstrip())-13)//12)]
+				for name, value in zip(components, values):
+					block['values'].setdefault(name, {})[node]=value
+	finally:
+		f.close()
+
+	# Result blocks of the same increment share a step and time
+	merged=[]
+	for frame in frames:
+		if merged and (merged[-1]['step'], merged[-1]['time'])==(frame['step'], frame['time']):
+			for name, values in frame['values'].items():
+				merged[-1]['values'].setdefault(name, {}).update(values)
+		else:
+			merged.append(frame)
+	return merged
+
+# *****************************************************************************
+# Define Function to Extract the Results of a CalculiX Job
+# *****************************************************************************
+def frdResults(frdPath, nsets, stepNames):
+	xPlane=nsets.get(ccxName(loadedSet).upper(), [])
+	steps=[]
+	for frame in readFrd(frdPath):
+		values=frame['values']
+		rf=values.get('F1', {})
+		u=values.get('D1', {})
+		reactionForce=sum([rf.get(n, 0.0) for n in xPlane])
+		displacement=sum([u.get(n, 0.0) for n in xPlane])/max(len(xPlane), 1)
+		stiffness=abs(reactionForce/displacement) if displacement!=0 else 0.0
+
+		slip1, slip2=values.get('CSLIP1', {}), values.get('CSLIP2', {})
+		slips=[hypot(s, slip2.get(n, 0.0)) for n, s in slip1.items()]
+		result={'time':frame['time'], 'stiffness':stiffness,
+			'reactionForce':reactionForce, 'displacement':displacement,
+			'peakContactPressure':max(list(values.get('CPRESS', {}).values())+[0.0]),
+			'peakSlip':max(slips+[0.0])}
+
+		k=(frame['step'] or 1)-1
+		name=stepNames[k] if k<len(stepNames) else 'Step-%d' % (k+1)
+		if not steps or steps[-1]['name']!=name:
+			steps.append({'name':name, 'frames':[]})
+		steps[-1]['frames'].append(result)
+
+	# ================= Final State and Final State of Each Step ===========
+	results={}
+	for step in steps:
+		if step['frames']:
+			results=dict(step['frames'][-1])
+			del results['time']
+	results['steps']=steps
+	results['levels']=[dict(step['frames'][-1], step=step['name'])
+		for step in steps if step['frames']]
+	return results
+
+# *****************************************************************************
+# Define Function to Solve an Abaqus Deck with CalculiX
+# *****************************************************************************
+def runDeck(inpPath, jobName, jobDir):
+	if not os.path.isdir(jobDir):
+		os.makedirs(jobDir)
+	results={'jobName':jobName, 'jobDir':jobDir, 'wallTime':0.0, 'completed':False}
+	try:
+		stepNames=exportDeck(inpPath, os.path.join(jobDir, jobName+'.inp'))
+	except ValueError as error:
+		results['rejected']=str(error)
+		return results
+
+	# ================= Solve ==============================================
+	env=dict(os.environ, OMP_NUM_THREADS=str(ccxThreads),
+		CCX_NPROC_EQUATION_SOLVER=str(ccxThreads))
+	logPath=os.path.join(jobDir, 'ccx.log')
+	start=time.time()
+	log=open(logPath, 'w')
+	try:
+		subprocess.call([CCX, '-i', jobName], cwd=jobDir, stdout=log,
+			stderr=subprocess.STDOUT, env=env, shell=(os.name=='nt'))
+	finally:
+		log.close()
+	results['wallTime']=time.time()-start
+
+	f=open(logPath)
+	try:
+		results['completed']=COMPLETED_MESSAGE in f.read()
+	finally:
+		f.close()
+
+	# ================= Post-Process =======================================
+	frdPath=os.path.join(jobDir, jobName+'.frd')
+	if os.path.exists(frdPath):
+		results.update(frdResults(frdPath, readNsets(os.path.join(jobDir, jobName+'.inp')),
+			stepNames))
+		f=open(os.path.join(jobDir, jobName+'_results.json'), 'w')
+		try:
+			json.dump(results, f, indent=1)
+		finally:
+			f.close()
+	return results
+
+# *****************************************************************************
+# Define Function to Solve a Variant of a Model Script with CalculiX
+# *****************************************************************************
+def runVariantCcx(params, jobName, modelScript=MODEL_SCRIPT):
+	# CAE writes the flat deck (one CAE start-up), ccx solves it
+	written=runVariant(dict(params, inputFormat='Flat'), jobName, modelScript=modelScript,
+		workDir=workDir, jobAction='Write Input')
+	if 'rejected' in written:
+		return written
+	inpPath=os.path.join(written['jobDir'], jobName+'.inp')
+	os.rename(inpPath, os.path.join(written['jobDir'], jobName+'_abaqus.inp'))
+	results=runDeck(os.path.join(written['jobDir'], jobName+'_abaqus.inp'), jobName,
+		written['jobDir'])
+	results.update(params)
+	return results
+
+# *****************************************************************************
+# Define Function to Solve Patched Variants of One Deck on All Cores
+# *****************************************************************************
+def runPatched(template, values):
+	jobName=values['jobName']
+	jobDir=os.path.abspath(os.path.join(workDir, jobName))
+	if not os.path.isdir(jobDir):
+		os.makedirs(jobDir)
+	abaqusPath=os.path.join(jobDir, jobName+'_abaqus.inp')
+	f=open(abaqusPath, 'w')
+	try:
+		f.write(renderVariant(template, values))
+	finally:
+		f.close()
+	results=runDeck(abaqusPath, jobName, jobDir)
+	results.update(values)
+	return results
+
+def runSweep(inpPath, variants):
+	template=readTemplate(inpPath)
+	pool=ThreadPoolExecutor(max_workers=numWorkers)
+	try:
+		futures=[pool.submit(runPatched, template, values) for values in variants]
+		return [future.result() for future in futures]
+	finally:
+		pool.shutdown()
+
+# *****************************************************************************
+# Solve a Deck or a Table of Variants
+# *****************************************************************************
+if __name__=='__main__':
+	if len(sys.argv) not in (2, 3):
+		print('Usage: python Bone_Screw_and_Plate_CalculiX.py base.inp [variants.csv]')
+		sys.exit(1)
+
+	inpPath=sys.argv[1]
+	if len(sys.argv)==3:
+		rows=runSweep(inpPath, readTable(sys.argv[2]))
+		writeTable(resultsTable, rows)
+		print('%d of %d variants completed, results in %s' % (
+			len([row for row in rows if row['completed']]), len(rows), resultsTable))
+	else:
+		jobName=os.path.splitext(os.path.basename(inpPath))[0]
+		results=runDeck(inpPath, jobName+'-ccx', os.path.abspath(os.path.join(workDir,
+			jobName+'-ccx')))
+		if 'rejected' in results:
+			print('Not exported: '+results['rejected'])
+		else:
+			print('%s: completed=%s, stiffness=%g N/mm, peak CPRESS=%g N/mm^2 (%.1f s)' % (
+				results['jobName'], results['completed'], results.get('stiffness', 0),
+				results.get('peakContactPressure', 0), results['wallTime']))
@@ -0,0 +1,94 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code to solve repeated load cycles of the Bone and Screw model and
+#   tabulate the micromotion of each cycle (plain Python, uses the runner and
+#   cyclicLoad of the model scripts)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     >>python Bone_Screw_and_Plate_Cyclic.py
+#       or, for another design and more cycles
+#     >>python Bone_Screw_and_Plate_Cyclic.py Bone_Screw_and_Plate_New_Design.py numCycles=50
+#
+#     The screws have Coulomb friction (contactParams) unless contactForm is
+#     given; with Rough contact or Tie they do not slip and the run is rejected
+#
+#     1. After a static step to cycleRatio*DispLoad, 'Bone X Plane' is moved
+#        up to DispLoad and back in each cycle, with a direct cyclic step
+#        (stabilized cycle) or one static step per cycle (cyclicLoad)
+#     2. Only the peak and end of each cycle are written as field output, so
+#        long histories keep a small ODB
+#     3. The micromotion, slip accumulated by the cycle and total slip at
+#        'Hole Interior' and 'Hole 2 Interior' of each cycle are written to
+#        cycleTable
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import sys
+from Bone_Screw_and_Plate_Runner import runVariant, writeTable, MODEL_SCRIPT
+
+# *****************************************************************************
+# Create a list of 'cyclic loading' parameters
+# *****************************************************************************
+
+# Cyclic loading parameters of the model scripts
+cyclicParams={'cyclicLoad':'Auto', 'numCycles':10, 'cycleRatio':0.0}
+
+# Contact of the screws that can slip while closed (Rough contact and Tie
+#   have no micromotion)
+contactParams={'contactForm':'Coulomb', 'fricFact':0.3}
+
+# Fixed model parameters
+baseParams={}
+
+# Responses of each cycle
+responses=['micromotion1', 'micromotion2', 'slipIncrement1', 'slipIncrement2',
+	'slip1', 'slip2', 'peakStiffness']
+
+# Directory of the runs
+workDir='runs'
+
+# Table of the responses of each cycle
+cycleTable='cycles.csv'
+
+# *****************************************************************************
+# Define Function to Solve the Load Cycles
+# *****************************************************************************
+def loadCycles(params={}, modelScript=MODEL_SCRIPT):
+	jobName='Cyclic-'+modelScript.replace('Bone_Screw_and_Plate_', '').replace('.py', '')
+	runParams=dict(baseParams, **contactParams)
+	runParams.update(cyclicParams)
+	runParams.update(params)
+	results=runVariant(runParams, jobName, modelScript=modelScript, workDir=workDir)
+	return results, results.get('cycles', [])
+
+# *****************************************************************************
+# Run Load Cycles
+# *****************************************************************************
+if __name__=='__main__':
+	args=sys.argv[1:]
+	modelScript=MODEL_SCRIPT
+	if args and args[0].endswith('.py'):
+		modelScript=args.pop(0)
+	params={}
+	for arg in args:
+		name, value=arg.split('=', 1)
+		try:
+			params[name]=float(value)
+		except ValueError:
+			params[name]=value
+
+	results, rows=loadCycles(params, modelScript)
+	writeTable(cycleTable, rows, ['cycle', 'step']+responses)
+
+	print('%-8s' % 'cycle' + ''.join(['%-16s' % r for r in responses]))
+	for row in rows:
+		print('%-8d' % row['cycle'] + ''.join(['%-16.4g' % row.get(r, 0.0)
+			for r in responses]))
+	if not results['completed']:
+		print('%d cycles completed, see %s' % (len(rows), results['jobDir']))
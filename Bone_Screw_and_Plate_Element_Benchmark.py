@@ -0,0 +1,129 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code to benchmark the element technologies of the Bone and Screw
+#   model for accuracy per CPU second (plain Python, uses the runner)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     >>python Bone_Screw_and_Plate_Element_Benchmark.py
+#       or, for another design
+#     >>python Bone_Screw_and_Plate_Element_Benchmark.py Bone_Screw_and_Plate_New_Design.py
+#
+#     1. The reference case (quadratic hex at a fine mesh) is solved once
+#     2. Each element technology is solved at each mesh size, with the same
+#        technology for the bone, plate and screws (boneElement,
+#        plateElement, screwElement of the model scripts)
+#     3. The error of the tracked responses against the reference, the CPU
+#        time and the memory of each case are written to benchmarkTable
+#     4. The case within targetError of the reference with the least CPU time
+#        is recommended for production runs
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import sys
+from Bone_Screw_and_Plate_Runner import runVariant, runVariants, writeTable, MODEL_SCRIPT
+from Bone_Screw_and_Plate_Mesh_Convergence import relativeChange
+
+# *****************************************************************************
+# Create a list of 'benchmark' parameters
+# *****************************************************************************
+
+# Element technologies compared
+technologies=['Default', 'Reduced', 'Incompatible', 'Quadratic', 'Tet']
+
+# Mesh sizes of each technology
+meshSizes=[0.65, 0.4875, 0.325]
+
+# Reference case
+referenceParams={'boneElement':'Quadratic', 'plateElement':'Quadratic',
+	'screwElement':'Quadratic', 'meshSize':0.1625}
+
+# Fixed model parameters for all cases
+baseParams={}
+
+# Responses tracked and largest relative error accepted for production
+responses=['stiffness', 'peakContactPressure']
+targetError=0.02
+
+# Number of cases solved at the same time
+numWorkers=2
+
+# Directory of the runs
+workDir='runs'
+
+# Table of benchmark results
+benchmarkTable='element_benchmark.csv'
+
+# *****************************************************************************
+# Define Function to Run the Benchmark
+# *****************************************************************************
+def elementBenchmark(modelScript=MODEL_SCRIPT):
+	prefix='Elem-'+modelScript.replace('Bone_Screw_and_Plate_', '').replace('.py', '')
+
+	# ================= Reference Case =====================================
+	reference=runVariant(dict(baseParams, **referenceParams), prefix+'-Reference',
+		modelScript=modelScript, workDir=workDir)
+	if not reference['completed']:
+		print('Reference case did not complete, see %s' % reference['jobDir'])
+		return reference, [], None
+
+	# ================= Each Technology at Each Mesh Size ==================
+	paramList=[dict(baseParams, boneElement=technology, plateElement=technology,
+		screwElement=technology, meshSize=size)
+		for technology in technologies for size in meshSizes]
+	rows=runVariants(paramList, jobPrefix=prefix, numWorkers=numWorkers,
+		modelScript=modelScript, workDir=workDir)
+
+	recommended=None
+	for row in rows:
+		row['technology']=row['boneElement']
+		if not row['completed']:
+			continue
+		# CPU time of the analysis, or wall time of the run if it was not found
+		row['cpuTime']=row.get('cpuTime', row['wallTime'])
+		for r in responses:
+			row[r+'Error']=relativeChange(row[r], reference[r])
+		row['maxError']=max([row[r+'Error'] for r in responses])
+		if row['maxError']<targetError and (recommended is None or
+			row['cpuTime']<recommended['cpuTime']):
+			recommended=row
+	return reference, rows, recommended
+
+# *****************************************************************************
+# Run Benchmark
+# *****************************************************************************
+if __name__=='__main__':
+	if len(sys.argv)>1:
+		modelScript=sys.argv[1]
+	else:
+		modelScript=MODEL_SCRIPT
+
+	reference, rows, recommended=elementBenchmark(modelScript)
+
+	columns=['technology', 'meshSize', 'completed', 'elements', 'nodes',
+		'cpuTime', 'wallTime', 'memoryMB', 'maxError']
+	for r in responses:
+		columns+=[r, r+'Error']
+	writeTable(benchmarkTable, rows, columns)
+
+	print('%-14s %-10s %-10s %-10s %-10s' % ('technology', 'meshSize', 'cpuTime',
+		'memoryMB', 'maxError'))
+	for row in rows:
+		if not row['completed']:
+			print('%-14s %-10.4g did not complete, see %s' % (row['technology'],
+				row['meshSize'], row['jobDir']))
+			continue
+		print('%-14s %-10.4g %-10.1f %-10s %-10.3g' % (row['technology'],
+			row['meshSize'], row['cpuTime'], row.get('memoryMB', ''), row['maxError']))
+
+	if recommended is None:
+		print('No case within %g of the reference' % targetError)
+	else:
+		print('Recommended boneElement=plateElement=screwElement=%s meshSize=%.4g '
+			'(%.1f CPU seconds)' % (recommended['technology'], recommended['meshSize'],
+			recommended['cpuTime']))
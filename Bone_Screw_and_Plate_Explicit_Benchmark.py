@@ -0,0 +1,203 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code to benchmark the Standard and quasi-static Explicit builds of
+#   the Bone and Screw model and route each case to the cheaper solver
+#   (plain Python, uses the runner)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     >>python Bone_Screw_and_Plate_Explicit_Benchmark.py
+#       or, for another design
+#     >>python Bone_Screw_and_Plate_Explicit_Benchmark.py Bone_Screw_and_Plate_New_Design.py
+#
+#     From Python (after the benchmark)
+#      >>from Bone_Screw_and_Plate_Explicit_Benchmark import *
+#      >>results=runRouted({'contactForm':'Lagrange', 'fricFact':1.5}, 'Job-Routed')
+#
+#     1. Each contact formulation is solved at each mesh size with
+#        solver=Standard and solver=Explicit; Lagrange friction is solved
+#        with Standard only, since the general contact of the Explicit build
+#        replaces it with penalty friction
+#     2. An explicit case is quasi-static when the kinetic energy stays below
+#        kineticLimit and the artificial strain energy below artificialLimit
+#        of the internal energy, and mass scaling adds less than massLimit
+#        percent to the model; its responses are compared with the Standard
+#        case when that completed
+#     3. Each case is routed to the solver with the least CPU time among
+#        those that completed (and, for Explicit, passed the checks and the
+#        tolerance), and the routes are written to routingTable
+#     4. runRouted solves a variant with the solver of the nearest case of
+#        the same contact formulation, and solves it again with Standard if
+#        the explicit run does not pass the checks
+#     Cases missing a Standard run are left out of the routes
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import os
+import sys
+from math import log
+from Bone_Screw_and_Plate_Runner import runVariant, runVariants, readTable, \
+	writeTable, MODEL_SCRIPT
+from Bone_Screw_and_Plate_Preflight import modelValues
+from Bone_Screw_and_Plate_Mesh_Convergence import relativeChange
+
+# *****************************************************************************
+# Create a list of 'benchmark' parameters
+# *****************************************************************************
+
+# Contact formulations and mesh sizes compared
+contactForms=['Rough', 'Coulomb', 'Lagrange']
+meshSizes=[0.65, 0.325]
+
+# Contact formulations the Explicit build solves as given (Lagrange is
+#   mapped to penalty friction, so it is always routed to Standard)
+explicitForms=['Rough', 'Coulomb']
+
+# Fixed model parameters for all cases
+baseParams={}
+
+# Limits of a quasi-static explicit solution (energy ratios and DMASS in %)
+kineticLimit=0.05
+artificialLimit=0.05
+massLimit=10.0
+
+# Responses compared with the Standard solution and change accepted
+responses=['stiffness', 'reactionForce']
+tolerance=0.02
+
+# Number of cases solved at the same time
+numWorkers=2
+
+# Directory of the runs
+workDir='runs'
+
+# Table of benchmark results and of the solver of each case
+benchmarkTable='explicit_benchmark.csv'
+routingTable='solver_routing.csv'
+
+# *****************************************************************************
+# Define Function to Check an Explicit Solution Is Quasi-Static
+# *****************************************************************************
+def quasiStatic(results):
+	problems=[]
+	if results.get('kineticEnergyRatio', 1.0)>kineticLimit:
+		problems.append('ALLKE/ALLIE=%.3g' % results.get('kineticEnergyRatio', 1.0))
+	if results.get('artificialEnergyRatio', 0.0)>artificialLimit:
+		problems.append('ALLAE/ALLIE=%.3g' % results['artificialEnergyRatio'])
+	if results.get('massChange', 0.0)>massLimit:
+		problems.append('DMASS=%.3g%%' % results['massChange'])
+	return problems
+
+# *****************************************************************************
+# Define Function to Run the Benchmark
+# *****************************************************************************
+def explicitBenchmark(modelScript=MODEL_SCRIPT):
+	prefix='Explicit-'+modelScript.replace('Bone_Screw_and_Plate_', '').replace('.py', '')
+	paramList=[dict(baseParams, contactForm=form, meshSize=size, solver=solver)
+		for form in contactForms for size in meshSizes
+		for solver in ('Standard', 'Explicit')
+		if solver=='Standard' or form in explicitForms]
+	rows=runVariants(paramList, jobPrefix=prefix, numWorkers=numWorkers,
+		modelScript=modelScript, workDir=workDir)
+
+	# ================= Checks and the Cheaper Solver of Each Case =========
+	routes=[]
+	for form in contactForms:
+		for size in meshSizes:
+			case=dict([(row['solver'], row) for row in rows
+				if row['contactForm']==form and row['meshSize']==size])
+			standard, explicit=case.get('Standard'), case.get('Explicit')
+			if standard is None:
+				continue
+			for row in case.values():
+				row['cpuTime']=row.get('cpuTime', row['wallTime'])
+			route={'contactForm':form, 'meshSize':size, 'solver':'Standard',
+				'standardTime':standard['cpuTime'], 'explicitTime':''}
+			if explicit is not None:
+				checks=quasiStatic(explicit)
+				if explicit['completed'] and standard['completed']:
+					explicit['maxChange']=max([relativeChange(explicit[r], standard[r])
+						for r in responses])
+					if explicit['maxChange']>tolerance:
+						checks.append('change %.3g from Standard' % explicit['maxChange'])
+				explicit['checks']='; '.join(checks)
+				route['explicitTime']=explicit['cpuTime']
+
+			valid=[row for row in case.values() if row['completed'] and
+				not row.get('checks')]
+			if valid:
+				route['solver']=min(valid, key=lambda row: row['cpuTime'])['solver']
+			routes.append(route)
+	return rows, routes
+
+# *****************************************************************************
+# Define Function to Choose the Solver of a Variant
+# *****************************************************************************
+def chooseSolver(params, modelScript=MODEL_SCRIPT, routes=None):
+	# Solver of the benchmark case of the same contact formulation nearest in
+	#   meshSize, Standard without one
+	if routes is None:
+		if not os.path.exists(routingTable):
+			return 'Standard'
+		routes=readTable(routingTable)
+	values=modelValues(params, modelScript)
+	if values['contactForm'] not in explicitForms:
+		return 'Standard'
+	cases=[route for route in routes if route['contactForm']==values['contactForm']]
+	if not cases:
+		return 'Standard'
+	nearest=min(cases, key=lambda route: abs(log(route['meshSize']/values['meshSize'])))
+	return nearest['solver']
+
+# *****************************************************************************
+# Define Function to Run a Variant with the Routed Solver
+# *****************************************************************************
+def runRouted(params, jobName, modelScript=MODEL_SCRIPT, routes=None):
+	solver=chooseSolver(params, modelScript, routes)
+	results=runVariant(dict(params, solver=solver), jobName, modelScript=modelScript,
+		workDir=workDir)
+	if solver=='Explicit' and 'rejected' not in results:
+		problems=quasiStatic(results)
+		if problems or not results['completed']:
+			# Not quasi-static, so solved again with the static step
+			results=runVariant(dict(params, solver='Standard'), jobName+'-Standard',
+				modelScript=modelScript, workDir=workDir)
+			results['explicitChecks']='; '.join(problems) or 'did not complete'
+	return results
+
+# *****************************************************************************
+# Run Benchmark
+# *****************************************************************************
+if __name__=='__main__':
+	if len(sys.argv)>1:
+		modelScript=sys.argv[1]
+	else:
+		modelScript=MODEL_SCRIPT
+
+	rows, routes=explicitBenchmark(modelScript)
+	writeTable(benchmarkTable, rows, ['contactForm', 'meshSize', 'solver',
+		'completed', 'elements', 'cpuTime', 'wallTime', 'memoryMB',
+		'kineticEnergyRatio', 'artificialEnergyRatio', 'massChange', 'maxChange',
+		'checks']+responses)
+	writeTable(routingTable, routes, ['contactForm', 'meshSize', 'solver',
+		'standardTime', 'explicitTime'])
+
+	print('%-10s %-10s %-10s %-10s %-10s %-s' % ('contact', 'meshSize', 'standard',
+		'explicit', 'route', 'explicit checks'))
+	for route in routes:
+		explicit=[row for row in rows if row['solver']=='Explicit' and
+			row['contactForm']==route['contactForm'] and
+			row['meshSize']==route['meshSize']]
+		if not explicit:
+			print('%-10s %-10.4g %-10.1f %-10s %-10s %-s' % (route['contactForm'],
+				route['meshSize'], route['standardTime'], '-', route['solver'],
+				'not solved with Explicit'))
+			continue
+		print('%-10s %-10.4g %-10.1f %-10.1f %-10s %-s' % (route['contactForm'],
+			route['meshSize'], route['standardTime'], route['explicitTime'],
+			route['solver'], explicit[0]['checks'] or 'passed'))
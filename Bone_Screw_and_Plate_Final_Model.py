@@ -18,6 +18,10 @@
 #       or
 #     At Aabqus CAE command line,     
 #     >>execfile('***.py')
+#
+#     Any parameter below can be overridden without editing this file by 
+#     passing name=value pairs after '--' (used by the sweep drivers)
+#      >>abaqus cae noGUI=***.py -- BoneStrength=High dcort=0.5 jobAction=Submit
 
 # *****************************************************************************
 # Import modules required for CAE and Python (No additional files requred)
@@ -37,6 +41,27 @@ from visualization import *
 from connectorBehavior import *
 from math import *
 from Numeric import *
+import sys
+import os
+import hashlib
+import shutil
+import uuid
+
+# ***************************************************************************** 
+# Read parameter overrides from the command line (name=value after '--')
+# *****************************************************************************
+
+cmdParams={}
+if '--' in sys.argv:
+	for arg in sys.argv[sys.argv.index('--')+1:]:
+		name,value=arg.split('=',1)
+		try:
+			cmdParams[name]=float(value)
+		except ValueError:
+			cmdParams[name]=value
+
+def applyOverrides():
+	globals().update(cmdParams)
 
 # ***************************************************************************** 
 # Create a list of  'simulation properties' parameters
@@ -45,18 +70,139 @@ from Numeric import *
 # Displacement Load (mm)
 DispLoad=0.025
 
+# Load Ladder (comma-separated DispLoad values solved as a sequence of
+#   static steps in one job, e.g. '0.0125,0.025,0.0375'; DispLoad is not used
+#   when given)
+loadLevels=''
+
+# Cyclic Loading of 'Bone X Plane' (Off, Auto, Direct, or Steps)
+#   After the static step to cycleRatio*DispLoad, each cycle moves the plane
+#   up to DispLoad and back down to cycleRatio*DispLoad
+#   Direct - direct cyclic step iterating (at most cyclicIterations times)
+#            to the stabilized cycle (not with Lagrange friction)
+#   Steps  - numCycles static steps of one cycle each, with restart output
+#            at the end of each cycle to continue the history in a later job
+#   Auto   - Direct, or Steps with contactForm='Lagrange'
+cyclicLoad='Off'
+numCycles=10
+cycleRatio=0.0
+cycleIncrements=8
+cyclicIterations=200
+
 # Friction Formulation for Tangential Contact Interaction (Lagrange, Coulomb, or Rough)
+#   (or Tie to approximate Rough by bonding the screws to the bone, solved in
+#    one linear increment for screening sweeps)
 contactForm='Rough'
 
 # Friction factor (Lagrange or Coulomb ONLY)
 fricFact=2
 
+# Automatic Stabilization of the Screw-Bone Contact (On or Off)
+contactStabilization='Off'
+
 # Bone Strength (Low, Med, or High)
 BoneStrength='Med'
 
 # Global Mesh Size
 meshSize=0.65
 
+# Initial, Largest and Smallest Increment of the Static Step (fraction of the
+#   step; tied screws take one increment unless these are given)
+initialInc=0.1
+maxInc=0.1
+minInc=1e-5
+
+# Element Technology of the Bone, Plate and Screws (Default, Reduced,
+#   Incompatible, Quadratic, or Tet)
+#   Default      - CAE default element of the mesh
+#   Reduced      - linear hex, reduced integration (C3D8R)
+#   Incompatible - linear hex, incompatible modes (C3D8I)
+#   Quadratic    - quadratic hex, reduced integration (C3D20R)
+#   Tet          - free quadratic tet mesh (C3D10)
+boneElement='Default'
+plateElement='Default'
+screwElement='Default'
+
+# Geometry Construction (Merge to merge partition shells with the solids and
+#   cut the holes, or Direct to partition the solids in place without
+#   boolean operations)
+construction='Merge'
+
+# Screw to Plate Connection (Tie, or Merged for one conformal part of the
+#   plate and screw heads with shared nodes and no tie constraints)
+screwPlate='Tie'
+
+# Job Name
+jobName='Job-1'
+
+# Action Taken on Job After Building Model (None, Write Input, or Submit)
+jobAction='None'
+
+# Input File Format (Parts, or Flat for a single list of nodes and elements)
+inputFormat='Parts'
+
+# Number of CPUs (and domains) of the Job
+numCpus=2
+
+# Solver (Standard for the static step, or Explicit for a quasi-static
+#   explicit dynamic step with a smooth-step displacement, semi-automatic
+#   mass scaling and general contact between the screws and the bone)
+solver='Standard'
+
+# Step Time of the Explicit Step (s) and Stable Time Increment Targeted by
+#   Mass Scaling (s)
+explicitTime=0.02
+explicitInc=1e-6
+
+# Restart Output Every restartFrequency Increments of Each Step (0 for none;
+#   only the latest restart point is kept, and a preempted job is resumed
+#   from it by Bone_Screw_and_Plate_Restart.py)
+restartFrequency=0
+
+# Scratch Directory of the Job (empty for the Abaqus default)
+scratchDir=''
+
+# Matrix Solver of the Static Step (Auto, Direct, or Iterative)
+#   (Auto uses the iterative solver for symmetric models with more than
+#    iterativeDofs degrees of freedom, and the direct sparse solver otherwise)
+matrixSolver='Auto'
+iterativeDofs=2e6
+
+# Matrix Storage of the Static Step (Auto, Symmetric, or Unsymmetric)
+#   (Auto is unsymmetric for the frictional Lagrange and Coulomb contact and
+#    symmetric for Rough contact and tied screws)
+matrixStorage='Auto'
+
+# Condense the Far-Field Bone into a Cached Substructure (On or Off)
+farField='Off'
+
+# Directory of Cached Far-Field Substructures
+substructureDir='substructures'
+
+# Local Submodel Around One Screw Hole (0 for the full model, 1, or 2)
+#   (requires farField='Off')
+submodelHole=0
+
+# Global ODB Driving the Local Submodel
+globalOdb='Global.odb'
+
+# Reuse Checkpoints of Build Stages with Unchanged Inputs (On or Off)
+checkpoints='Off'
+
+# Directory of Build Stage Checkpoints (give an absolute path to share
+#   checkpoints between the job directories of a sweep)
+checkpointDir='checkpoints'
+
+# Check Element Quality of the Written Input Before Submitting (On or Off)
+#   (the job is not submitted if the mesh fails the limits of
+#    Bone_Screw_and_Plate_Mesh_Quality.py, found in meshQualityDir)
+meshQuality='Off'
+
+# Directory of Bone_Screw_and_Plate_Mesh_Quality.py
+meshQualityDir='.'
+
+applyOverrides()
+
 # *****************************************************************************
 # Create a list of 'mechanical properties' parameters
 # *****************************************************************************
@@ -65,6 +211,12 @@ Eplate=104.1e3           	# Young's Modulus Plate (N/mm^2)
 Escrew=112e3            	# Young's Modulus Screw (N/mm^2)
 n=0.3         			# Poisson's Ratio
 
+# Densities (tonne/mm^3, used by the explicit solver only)
+rhoPlate=4.51e-9
+rhoScrew=4.43e-9
+rhoCortical=1.9e-9
+rhoTrabecular=0.6e-9
+
 if BoneStrength=='Low':
 	Ecortical=6e3		# Young's Modulus Cortical Bone (N/mm^2)
 	Etrabecular=0.04e3       # Young's Modulus Trabecular Bone (N/mm^2)
@@ -77,6 +229,9 @@ if BoneStrength=='High':
 	Ecortical=25e3		# Young's Modulus Cortical Bone (N/mm^2)
 	Etrabecular=2.2e3       # Young's Modulus Trabecular Bone (N/mm^2)
 
+# Moduli given on the command line take precedence over BoneStrength
+applyOverrides()
+
 # ***************************************************************************** 
 # Create a list of  'geometrical properties' parameters
 # *****************************************************************************
@@ -107,13 +262,135 @@ dplate=1.6
 # Length of Screw (dscrew)
 dscrew=10.775
 
+# Bone Outline (x from 0 to boneX, y from boneY1 on the plane of symmetry
+#   to boneY2)
+boneX=14.96
+boneY1=-5.715
+boneY2=9.265
+
+# Half Width of the Square Partition Block Around Each Screw Hole (blockHalf)
+blockHalf=2.225
+
+# Half Width of the Plate Arms (armHalf)
+armHalf=1.195
+
+applyOverrides()
+if 'dtrab' not in cmdParams:
+	dtrab=dbone-2*dcort
+
+# ***************************************************************************** 
+# Partition Layout Derived from the Screw Holes
+# *****************************************************************************
+
+# Partition blocks around the screw holes (xmin, ymin, xmax, ymax)
+nearFieldBlocks=((cx-blockHalf,cy-blockHalf,cx+blockHalf,cy+blockHalf),
+	(cx2-blockHalf,cy2-blockHalf,cx2+blockHalf,cy2+blockHalf))
+(h1x1,h1y1,h1x2,h1y2),(h2x1,h2y1,h2x2,h2y2)=nearFieldBlocks
+
+# -X arm of the plate, centred on screw hole 1 and chamfered at 45 degrees
+#   to block 1
+armY=cy
+armX=h1x1-(blockHalf-armHalf)
+
+# -Y arm of the plate, centred on screw hole 1 and chamfered at 45 degrees
+#   to block 1
+lowArmY=h1y1-(blockHalf-armHalf)
+
+# Probe points (x, y) of the top faces and edges used to place sketches
+boneFaceProbe=(h1x1/2,cy)
+boneEdgeProbe=(boneX,cy)
+plateFaceProbe=(armX/2,armY)
+plateEdgeProbe=(h1x2,cy)
+
+# Probe points of the faces of the bone -Y and X planes, one per partition
+boneYPlaneX=(h1x1/2, cx, (h1x2+boneX)/2)
+boneXPlaneY=((boneY1+h1y1)/2, cy, (h1y2+h2y1)/2, (h2y1+boneY2)/2)
+
+# ***************************************************************************** 
+# Build Stages and the Parameters Each Stage Depends On
+# *****************************************************************************
+
+# Each stage also depends on the parameters of the stages before it
+buildStages=[
+	('Partitions', ['cx','cy','cx2','cy2','R','dbone','dcort','dtrab','dplate',
+		'boneX','boneY1','boneY2','blockHalf','armHalf','construction']),
+	('Holes', ['dscrew','screwPlate']),
+	('Mesh', ['meshSize','farField','boneElement','plateElement','screwElement',
+		'solver'])]
+
+# The far-field substructure in the mesh is generated with the bone moduli
+#   and read from substructureDir
+if farField=='On':
+	buildStages[-1][1].extend(['Ecortical','Etrabecular','n','substructureDir'])
+
+stageNames=[name for name,params in buildStages]
+
+def stageKey(stage):
+	values=[]
+	for name,params in buildStages[:stageNames.index(stage)+1]:
+		values+=[(p, globals()[p]) for p in params]
+	return hashlib.md5(repr(values).encode()).hexdigest()[:10]
+
+def checkpointPath(stage):
+	return os.path.join(os.path.abspath(checkpointDir), '%s-%s.cae' % (stage,
+		stageKey(stage)))
+
+def saveCheckpoint(stage):
+	if checkpoints=='On' and not os.path.exists(checkpointPath(stage)):
+		try:
+			os.makedirs(os.path.abspath(checkpointDir))
+		except OSError:
+			if not os.path.isdir(os.path.abspath(checkpointDir)):
+				raise
+		# Saved in the job directory, copied to a temporary name and renamed into
+		#   place, so parallel variants never open a partly written checkpoint
+		localCopy=os.path.abspath('Checkpoint-%s.cae' % stage)
+		mdb.saveAs(pathName=localCopy)
+		tempPath='%s.%s.tmp' % (checkpointPath(stage), uuid.uuid4().hex[:8])
+		shutil.copyfile(localCopy, tempPath)
+		try:
+			os.rename(tempPath, checkpointPath(stage))
+		except OSError:
+			# Already saved by another variant (Windows does not replace it)
+			os.remove(tempPath)
+
+def buildStage(stage):
+	# True unless the stage was restored from a checkpoint
+	return restoredStage is None or stageNames.index(stage)>stageNames.index(restoredStage)
+
+# ================= Restore the Latest Checkpoint With Unchanged Inputs ======
+restoredStage=None
+if checkpoints=='On':
+	for name in stageNames:
+		if os.path.exists(checkpointPath(name)):
+			restoredStage=name
+	if restoredStage is not None:
+		# Opened from a copy so that parallel variants do not lock the checkpoint
+		localCopy=os.path.abspath('Checkpoint-%s.cae' % restoredStage)
+		shutil.copyfile(checkpointPath(restoredStage), localCopy)
+		openMdb(pathName=localCopy)
+
 # ***************************************************************************** 
 # Create model & assembly
 # *****************************************************************************
 
 model_name='Bone and Screw'
-myModel=mdb.Model(name=model_name)
-myAssem=myModel.rootAssembly
+if restoredStage is None:
+	myModel=mdb.Model(name=model_name)
+	myAssem=myModel.rootAssembly
+else:
+	myModel=mdb.models[model_name]
+	myAssem=myModel.rootAssembly
+	BoneInstance=myAssem.instances['Bone']
+	BonePart=BoneInstance.part
+	PlateInstance=myAssem.instances['Plate']
+	PlatePart=PlateInstance.part
+	if construction=='Direct':
+		plateZ=0
+	else:
+		plateZ=dbone
+	if 'Far Field' in myAssem.instances.keys():
+		FarFieldInstance=myAssem.instances['Far Field']
 
 # *****************************************************************************
 # Materials
@@ -131,6 +408,11 @@ myModel.Material(name='Trabecular Bone')
 myModel.materials['Trabecular Bone'].Elastic(table=((
    Etrabecular, n), ))
 
+if solver=='Explicit':
+	for name,rho in (('Pure TI Grade IV',rhoPlate),('Ti-6AL-4V',rhoScrew),
+		('Cortical Bone',rhoCortical),('Trabecular Bone',rhoTrabecular)):
+		myModel.materials[name].Density(table=((rho, ), ))
+
 # ***************************************************************************** 
 # Create Sections
 # *****************************************************************************
@@ -144,42 +426,51 @@ myModel.HomogeneousSolidSection(material='Trabecular Bone',
     name='Trabecular', thickness=None)
 
 # *****************************************************************************
-# Define Function to Construct Shell Part for Partitioning Bone
+# Define Function to Draw the Partition Lines of the Bone
 # *****************************************************************************                    
-def createPartitionBone(myModel, myAssem):
-
-	# ================= Create Section Sketch ==============================
-	BonePartitionSketch=myModel.ConstrainedSketch(name='Bone Partition Sketch',sheetSize=10.0)
+def drawPartitionBone(sketch):
+	sketch.rectangle(point1=(0,boneY2),point2=(boneX,boneY1))
+	sketch.rectangle(point1=(h1x1,h1y2),point2=(h1x2,h1y1))
+	sketch.rectangle(point1=(h2x1,h2y2),point2=(h2x2,h2y1))
 	
-	# ================= Draw Sketch ========================================
-	BonePartitionSketch.rectangle(point1=(0.0, 9.265),point2=(14.96, -5.715))
-	BonePartitionSketch.rectangle(point1=(3.49, 2.225),point2=(7.94, -2.225))
-	BonePartitionSketch.rectangle(point1=(6.06, 9.265),point2=(10.51, 4.815))
-	
-	BonePartitionSketch.Line(point1=(3.49,-2.225),point2=(3.49,-5.715))
-	BonePartitionSketch.Line(point1=(7.94,-2.225),point2=(7.94,-5.715))
+	sketch.Line(point1=(h1x1,h1y1),point2=(h1x1,boneY1))
+	sketch.Line(point1=(h1x2,h1y1),point2=(h1x2,boneY1))
+	if h2y2<boneY2:
+		sketch.Line(point1=(h2x1,h2y2),point2=(h2x1,boneY2))
+		sketch.Line(point1=(h2x2,h2y2),point2=(h2x2,boneY2))
 		
 	rp=R*cos(pi/4)
 	
-	BonePartitionSketch.CircleByCenterPerimeter(center=(cx,cy), point1=(cx+rp,cy+rp))
-	BonePartitionSketch.CircleByCenterPerimeter(center=(cx2,cy2), point1=(cx2+rp,cy2+rp))
+	sketch.CircleByCenterPerimeter(center=(cx,cy), point1=(cx+rp,cy+rp))
+	sketch.CircleByCenterPerimeter(center=(cx2,cy2), point1=(cx2+rp,cy2+rp))
+	
+	sketch.Line(point1=(h1x1,h1y2),point2=(cx-rp,cy+rp))
+	sketch.Line(point1=(h1x2,h1y2),point2=(cx+rp,cy+rp))
+	sketch.Line(point1=(h1x1,h1y1),point2=(cx-rp,cy-rp))
+	sketch.Line(point1=(h1x2,h1y1),point2=(cx+rp,cy-rp))
 	
-	BonePartitionSketch.Line(point1=(3.49,2.225),point2=(cx-rp,cy+rp))
-	BonePartitionSketch.Line(point1=(7.94,2.225),point2=(cx+rp,cy+rp))
-	BonePartitionSketch.Line(point1=(3.49,-2.225),point2=(cx-rp,cy-rp))
-	BonePartitionSketch.Line(point1=(7.94,-2.225),point2=(cx+rp,cy-rp))
+	sketch.Line(point1=(h2x1,h2y2),point2=(cx2-rp,cy2+rp))
+	sketch.Line(point1=(h2x2,h2y2),point2=(cx2+rp,cy2+rp))
+	sketch.Line(point1=(h2x1,h2y1),point2=(cx2-rp,cy2-rp))
+	sketch.Line(point1=(h2x2,h2y1),point2=(cx2+rp,cy2-rp))
 	
-	BonePartitionSketch.Line(point1=(6.06,9.265),point2=(cx2-rp,cy2+rp))
-	BonePartitionSketch.Line(point1=(10.51,9.265),point2=(cx2+rp,cy2+rp))
-	BonePartitionSketch.Line(point1=(6.06,4.815),point2=(cx2-rp,cy2-rp))
-	BonePartitionSketch.Line(point1=(10.51,4.815),point2=(cx2+rp,cy2-rp))
+	sketch.Line(point1=(h1x1,h1y2),point2=(h2x1,h2y1))
+	sketch.Line(point1=(h1x2,h1y2),point2=(h2x2,h2y1))
 	
-	BonePartitionSketch.Line(point1=(3.49,2.225),point2=(6.06,4.815))
-	BonePartitionSketch.Line(point1=(7.94,2.225),point2=(10.51,4.815))
+	sketch.Line(point1=(0,h1y1),point2=(boneX,h1y1))
+	sketch.Line(point1=(0,h1y2),point2=(boneX,h1y2))
+	sketch.Line(point1=(0,h2y1),point2=(boneX,h2y1))
+
+# *****************************************************************************
+# Define Function to Construct Shell Part for Partitioning Bone
+# *****************************************************************************                    
+def createPartitionBone(myModel, myAssem):
+
+	# ================= Create Section Sketch ==============================
+	BonePartitionSketch=myModel.ConstrainedSketch(name='Bone Partition Sketch',sheetSize=10.0)
 	
-	BonePartitionSketch.Line(point1=(0,-2.225),point2=(14.96,-2.225))
-	BonePartitionSketch.Line(point1=(0,2.225),point2=(14.96,2.225))
-	BonePartitionSketch.Line(point1=(0,4.815),point2=(14.96,4.815))
+	# ================= Draw Sketch ========================================
+	drawPartitionBone(BonePartitionSketch)
 	
 	# ================= Create Part ========================================
 	BonePartitionPart=myModel.Part(dimensionality=THREE_D, name='Bone Partition', type=
@@ -191,20 +482,20 @@ def createPartitionBone(myModel, myAssem):
 # *****************************************************************************
 # Define Function to Construct Bone Part
 # *****************************************************************************                    
-def createPartBone(myModel, myAssem):
+def createPartBone(myModel, myAssem, name='Solid Bone'):
 
 	# ================= Create Bone Section Sketches =======================
 	BoneSketch=myModel.ConstrainedSketch(name='Bone Sketch',sheetSize=10.0)
 	
 	# ================= Draw Sketch ========================================
-	BoneSketch.rectangle(point1=(0.0, 9.265),point2=(14.96, -5.715))
+	BoneSketch.rectangle(point1=(0,boneY2),point2=(boneX,boneY1))
 
 	# ================= Create Parts =======================================
-	BonePart=myModel.Part(dimensionality=THREE_D, name='Solid Bone',
+	BonePart=myModel.Part(dimensionality=THREE_D, name=name,
 		type=DEFORMABLE_BODY)
 	BonePart.BaseSolidExtrude(sketch=BoneSketch, depth=dbone)
 	
-	myAssem.Instance(dependent=ON, name='Solid Bone', part=BonePart)
+	myAssem.Instance(dependent=ON, name=name, part=BonePart)
 	
 	# ================= Partition Bone Layers ==============================
 	face1 = BonePart.faces.findAt((0,0,0.))
@@ -220,24 +511,24 @@ def createPartBone(myModel, myAssem):
 	BonePart.PartitionCellByDatumPlane(datumPlane=d1[3],
 	    cells=pickedCells)
 	
-	pickedCells = BonePart.cells.findAt(((0,9.265,0),),
-		((14.96,9.265,0),), ((14.96,-5.715,0),),)
+	pickedCells = BonePart.cells.findAt(((0,boneY2,0),),
+		((boneX,boneY2,0),), ((boneX,boneY1,0),),)
 	BonePart.Set(cells=pickedCells, name='Bottom Cortical')
 	BonePart.SectionAssignment(offset=0.0, 
 	    offsetField='', offsetType=MIDDLE_SURFACE, region=Region(
 	    cells=pickedCells), sectionName='Cortical', thicknessAssignment=
 	    FROM_SECTION)
 
-	pickedCells = BonePart.cells.findAt(((0,9.265,12),),
-		((14.96,9.265,12),), ((14.96,-5.715,12),),)
+	pickedCells = BonePart.cells.findAt(((0,boneY2,dbone),),
+		((boneX,boneY2,dbone),), ((boneX,boneY1,dbone),),)
 	BonePart.Set(cells=pickedCells, name='Top Cortical')
 	BonePart.SectionAssignment(offset=0.0, 
 	    offsetField='', offsetType=MIDDLE_SURFACE, region=Region(
 	    cells=pickedCells), sectionName='Cortical', thicknessAssignment=
 	    FROM_SECTION)
 	
-	pickedCells = BonePart.cells.findAt(((0,9.265,dtrab),),
-		((14.96,9.265,dtrab),), ((14.96,-5.715,dtrab),),)
+	pickedCells = BonePart.cells.findAt(((0,boneY2,dtrab),),
+		((boneX,boneY2,dtrab),), ((boneX,boneY1,dtrab),),)
 	BonePart.Set(cells=pickedCells, name='Trabecular')
 	BonePart.SectionAssignment(offset=0.0, 
 	    offsetField='', offsetType=MIDDLE_SURFACE, region=Region(
@@ -245,39 +536,45 @@ def createPartBone(myModel, myAssem):
 	    FROM_SECTION)
 
 # *****************************************************************************
-# Define Function to Construct Shell Part for Partitioning Plate
+# Define Function to Draw the Partition Lines of the Plate
 # *****************************************************************************                    
-def createPartitionPlate(myModel, myAssem):
-	# ================= Create Plate Section Sketches =======================
-	PlatePartitionSketch=myModel.ConstrainedSketch(name='Plate Sketch',sheetSize=10.0)
+def drawPartitionPlate(sketch):
+	sketch.rectangle(point1=(0,armY+armHalf),point2=(armX,armY-armHalf))
+	sketch.rectangle(point1=(h1x1,h1y2),point2=(h1x2,h1y1))
+	sketch.rectangle(point1=(cx-armHalf,lowArmY),point2=(cx+armHalf,boneY1))
+	sketch.rectangle(point1=(h2x1,h2y2),point2=(h2x2,h2y1))
 	
-	# ================= Draw Sketch ========================================
-	PlatePartitionSketch.rectangle(point1=( 0.0, 1.195),point2=(2.46, -1.195))
-	PlatePartitionSketch.rectangle(point1=(3.49, 2.225),point2=(7.94, -2.225))
-	PlatePartitionSketch.rectangle(point1=(4.52, -3.255),point2=(6.91, -5.715))
-	PlatePartitionSketch.rectangle(point1=(6.06, 9.265),point2=(10.51, 4.815))
-	
-	PlatePartitionSketch.Line(point1=(2.46,1.195),point2=(3.49,2.225))
-	PlatePartitionSketch.Line(point1=(2.46,-1.195),point2=(3.49,-2.225))
-	PlatePartitionSketch.Line(point1=(3.49,-2.225),point2=(4.52,-3.255))
-	PlatePartitionSketch.Line(point1=(7.94,-2.225),point2=(6.91,-3.255))
-	PlatePartitionSketch.Line(point1=(3.49,2.225),point2=(6.06,4.815))
-	PlatePartitionSketch.Line(point1=(7.94,2.225),point2=(10.51,4.815))
+	sketch.Line(point1=(armX,armY+armHalf),point2=(h1x1,h1y2))
+	sketch.Line(point1=(armX,armY-armHalf),point2=(h1x1,h1y1))
+	sketch.Line(point1=(h1x1,h1y1),point2=(cx-armHalf,lowArmY))
+	sketch.Line(point1=(h1x2,h1y1),point2=(cx+armHalf,lowArmY))
+	sketch.Line(point1=(h1x1,h1y2),point2=(h2x1,h2y1))
+	sketch.Line(point1=(h1x2,h1y2),point2=(h2x2,h2y1))
 	
 	rp=R*cos(pi/4)
 	
-	PlatePartitionSketch.CircleByCenterPerimeter(center=(cx,cy), point1=(cx+rp,cy+rp))
-	PlatePartitionSketch.CircleByCenterPerimeter(center=(cx2,cy2), point1=(cx2+rp,cy2+rp))
+	sketch.CircleByCenterPerimeter(center=(cx,cy), point1=(cx+rp,cy+rp))
+	sketch.CircleByCenterPerimeter(center=(cx2,cy2), point1=(cx2+rp,cy2+rp))
+	
+	sketch.Line(point1=(h1x1,h1y2),point2=(cx-rp,cy+rp))
+	sketch.Line(point1=(h1x2,h1y2),point2=(cx+rp,cy+rp))
+	sketch.Line(point1=(h1x1,h1y1),point2=(cx-rp,cy-rp))
+	sketch.Line(point1=(h1x2,h1y1),point2=(cx+rp,cy-rp))
 	
-	PlatePartitionSketch.Line(point1=(3.49,2.225),point2=(cx-rp,cy+rp))
-	PlatePartitionSketch.Line(point1=(7.94,2.225),point2=(cx+rp,cy+rp))
-	PlatePartitionSketch.Line(point1=(3.49,-2.225),point2=(cx-rp,cy-rp))
-	PlatePartitionSketch.Line(point1=(7.94,-2.225),point2=(cx+rp,cy-rp))
+	sketch.Line(point1=(h2x1,h2y2),point2=(cx2-rp,cy2+rp))
+	sketch.Line(point1=(h2x2,h2y2),point2=(cx2+rp,cy2+rp))
+	sketch.Line(point1=(h2x1,h2y1),point2=(cx2-rp,cy2-rp))
+	sketch.Line(point1=(h2x2,h2y1),point2=(cx2+rp,cy2-rp))
+
+# *****************************************************************************
+# Define Function to Construct Shell Part for Partitioning Plate
+# *****************************************************************************                    
+def createPartitionPlate(myModel, myAssem):
+	# ================= Create Plate Section Sketches =======================
+	PlatePartitionSketch=myModel.ConstrainedSketch(name='Plate Sketch',sheetSize=10.0)
 	
-	PlatePartitionSketch.Line(point1=(6.06,9.265),point2=(cx2-rp,cy2+rp))
-	PlatePartitionSketch.Line(point1=(10.51,9.265),point2=(cx2+rp,cy2+rp))
-	PlatePartitionSketch.Line(point1=(6.06,4.815),point2=(cx2-rp,cy2-rp))
-	PlatePartitionSketch.Line(point1=(10.51,4.815),point2=(cx2+rp,cy2-rp))
+	# ================= Draw Sketch ========================================
+	drawPartitionPlate(PlatePartitionSketch)
 
 	# ================= Create Parts =======================================
 	PlatePartitionPart=myModel.Part(dimensionality=THREE_D, name='Plate Partition', type=
@@ -292,38 +589,38 @@ def createPartitionPlate(myModel, myAssem):
 # *****************************************************************************
 # Define Function to Construct Plate Part
 # *****************************************************************************                    
-def createPartPlate(myModel, myAssem):
+def createPartPlate(myModel, myAssem, name='Solid Plate'):
 	# ================= Create Plate Section Sketches =======================
 	PlateSketch=myModel.ConstrainedSketch(name='Plate Sketch',sheetSize=10.0)
 	
 	# ================= Draw Sketch ========================================
-	PlateSketch.rectangle(point1=( 0.0, 1.195),point2=(2.46, -1.195))
-	PlateSketch.rectangle(point1=(3.49, 2.225),point2=(7.94, -2.225))
-	PlateSketch.rectangle(point1=(4.52, -3.255),point2=(6.91, -5.715))
-	PlateSketch.rectangle(point1=(6.06, 9.265),point2=(10.51, 4.815))
-	
-	PlateSketch.Line(point1=(2.46,1.195),point2=(3.49,2.225))
-	PlateSketch.Line(point1=(2.46,-1.195),point2=(3.49,-2.225))
-	PlateSketch.Line(point1=(3.49,-2.225),point2=(4.52,-3.255))
-	PlateSketch.Line(point1=(7.94,-2.225),point2=(6.91,-3.255))
-	PlateSketch.Line(point1=(3.49,2.225),point2=(6.06,4.815))
-	PlateSketch.Line(point1=(7.94,2.225),point2=(10.51,4.815))
-	
-	PlateSketch.delete(objectList=(PlateSketch.geometry.findAt((2.46,0)),))
-	PlateSketch.delete(objectList=(PlateSketch.geometry.findAt((3.49,0)),))
-	PlateSketch.delete(objectList=(PlateSketch.geometry.findAt((5.7,-3.255)),))
-	PlateSketch.delete(objectList=(PlateSketch.geometry.findAt((5.7,-2.225)),))
-	PlateSketch.delete(objectList=(PlateSketch.geometry.findAt((5.7,2.225)),))
-	PlateSketch.delete(objectList=(PlateSketch.geometry.findAt((7.94,4.815)),))
+	PlateSketch.rectangle(point1=(0,armY+armHalf),point2=(armX,armY-armHalf))
+	PlateSketch.rectangle(point1=(h1x1,h1y2),point2=(h1x2,h1y1))
+	PlateSketch.rectangle(point1=(cx-armHalf,lowArmY),point2=(cx+armHalf,boneY1))
+	PlateSketch.rectangle(point1=(h2x1,h2y2),point2=(h2x2,h2y1))
+	
+	PlateSketch.Line(point1=(armX,armY+armHalf),point2=(h1x1,h1y2))
+	PlateSketch.Line(point1=(armX,armY-armHalf),point2=(h1x1,h1y1))
+	PlateSketch.Line(point1=(h1x1,h1y1),point2=(cx-armHalf,lowArmY))
+	PlateSketch.Line(point1=(h1x2,h1y1),point2=(cx+armHalf,lowArmY))
+	PlateSketch.Line(point1=(h1x1,h1y2),point2=(h2x1,h2y1))
+	PlateSketch.Line(point1=(h1x2,h1y2),point2=(h2x2,h2y1))
+	
+	PlateSketch.delete(objectList=(PlateSketch.geometry.findAt((armX,armY)),))
+	PlateSketch.delete(objectList=(PlateSketch.geometry.findAt((h1x1,armY)),))
+	PlateSketch.delete(objectList=(PlateSketch.geometry.findAt((cx,lowArmY)),))
+	PlateSketch.delete(objectList=(PlateSketch.geometry.findAt((cx,h1y1)),))
+	PlateSketch.delete(objectList=(PlateSketch.geometry.findAt((cx,h1y2)),))
+	PlateSketch.delete(objectList=(PlateSketch.geometry.findAt((cx2,h2y1)),))
 
 	# ================= Create Parts =======================================
-	PlatePart=myModel.Part(dimensionality=THREE_D, name='Solid Plate',
+	PlatePart=myModel.Part(dimensionality=THREE_D, name=name,
 		type=DEFORMABLE_BODY)
 	PlatePart.BaseSolidExtrude(sketch=PlateSketch, depth=dplate)
 	
-	myAssem.Instance(dependent=ON, name='Solid Plate', part=PlatePart)
+	myAssem.Instance(dependent=ON, name=name, part=PlatePart)
 	
-	myAssem.translate(instanceList=('Solid Plate',), 
+	myAssem.translate(instanceList=(name,), 
 		vector=(0,0,dbone))
 	
 	# ================= Assign Section =====================================
@@ -579,113 +876,440 @@ def createPartScrew(myModel, myAssem):
 	ScrewPart2.PartitionCellByPlaneThreePoints(
 	    cells=ScrewPart2.cells, point1=(cx2,cy2,0), point2=(cx2-rp,cy2+rp,0), point3=(cx2-rp,cy2+rp,dscrew))
 
+# *****************************************************************************
+# Define Functions to Partition Solids in Place (no boolean operations)
+# *****************************************************************************
+def partitionFromTop(part, drawPartition, facePoint, edgePoint, tol=1e-3):
+	# ================= Partition the Top Face by Sketch ===================
+	zTop=facePoint[2]
+	PartitionSketch=myModel.ConstrainedSketch(gridSpacing=0.36, name=
+	    part.name+' Partition Sketch', sheetSize=14.96, transform=
+	    part.MakeSketchTransform(
+	    sketchPlane=part.faces.findAt(facePoint), 
+	    sketchPlaneSide=SIDE1, 
+	    sketchUpEdge=part.edges.findAt(edgePoint), 
+	    sketchOrientation=RIGHT, origin=(0, 0, zTop)))
+	drawPartition(PartitionSketch)
+	part.PartitionFaceBySketch(faces=part.faces.findAt((facePoint,)), 
+	    sketch=PartitionSketch, sketchUpEdge=part.edges.findAt(edgePoint), 
+	    sketchOrientation=RIGHT)
+	
+	# ================= Extrude Partition Edges Through the Cells ==========
+	edges=[]
+	for edge in part.edges:
+		if abs(edge.pointOn[0][2]-zTop)>tol:
+			continue
+		topFaces=[i for i in edge.getFaces() if abs(part.faces[i].pointOn[0][2]-zTop)<tol]
+		if len(topFaces)==2:
+			edges.append(edge)
+	axis=part.DatumAxisByPrincipalAxis(principalAxis=ZAXIS)
+	part.PartitionCellByExtrudeEdge(line=part.datums[axis.id], cells=part.cells,
+		edges=edges, sense=REVERSE)
+
+def holeCells(part, zMin=None):
+	# Cells inside the screw hole circles (above zMin)
+	cells=[]
+	for cell in part.cells:
+		x,y,z=cell.pointOn[0]
+		if hypot(x-cx,y-cy)<R or hypot(x-cx2,y-cy2)<R:
+			if zMin is None or z>zMin:
+				cells.append(cell)
+	return cells
+
+# *****************************************************************************
+# Define Functions to Split the Bone into Near-Field and Far-Field Regions
+# *****************************************************************************
+
+def inNearField(point, blocks=nearFieldBlocks):
+	for x1,y1,x2,y2 in blocks:
+		if x1<=point[0]<=x2 and y1<=point[1]<=y2:
+			return True
+	return False
+
+def nearFieldCells(part, blocks=nearFieldBlocks):
+	return [cell for cell in part.cells if inNearField(cell.pointOn[0], blocks)]
+
+def farFieldCells(part, blocks=nearFieldBlocks):
+	return [cell for cell in part.cells if not inNearField(cell.pointOn[0], blocks)]
+
+def farFieldInterface(objects, blocks=nearFieldBlocks, tol=1e-3):
+	# Faces or nodes on the sides of the blocks shared with the far field
+	found=None
+	for x1,y1,x2,y2 in blocks:
+		for bx1,by1,bx2,by2 in ((x1,y1,x1,y2),(x2,y1,x2,y2),(x1,y1,x2,y1),(x1,y2,x2,y2)):
+			if by1==by2 and by1 in (boneY1,boneY2):
+				continue
+			box=objects.getByBoundingBox(xMin=bx1-tol, yMin=by1-tol, zMin=-tol,
+				xMax=bx2+tol, yMax=by2+tol, zMax=dbone+dplate+tol)
+			if found is None:
+				found=box
+			else:
+				found=found+box
+	return found
+
+def screwSurface(k, name):
+	# Surface of screw k, on the screw instance or on the merged plate
+	if screwPlate=='Merged':
+		return myAssem.instances['Plate'].surfaces['Screw %d %s' % (k, name)]
+	return myAssem.instances['Screw %d' % k].surfaces[name]
+
+def planeNodes(nodes, x=None, y=None, tol=1e-3):
+	if x is not None:
+		return nodes.getByBoundingBox(xMin=x-tol, xMax=x+tol, yMin=boneY1-tol,
+			yMax=boneY2+tol, zMin=-tol, zMax=dbone+tol)
+	return nodes.getByBoundingBox(xMin=-tol, xMax=boneX+tol, yMin=y-tol,
+		yMax=y+tol, zMin=-tol, zMax=dbone+tol)
+
+# *****************************************************************************
+# Define Function to Set the Element Technology of Cells
+# *****************************************************************************
+
+# Element codes of hex, wedge and tet regions of each element technology
+elementCodes={
+	'Reduced':(C3D8R, C3D6, C3D4),
+	'Incompatible':(C3D8I, C3D6, C3D4),
+	'Quadratic':(C3D20R, C3D15, C3D10),
+	'Tet':(C3D20R, C3D15, C3D10)}
+
+# Element codes of the explicit element library, where they differ
+explicitElementCodes={
+	'Tet':(C3D8R, C3D6, C3D10M)}
+
+def setElementTechnology(part, cells, technology):
+	# Called before the part is meshed (mesh controls delete the mesh)
+	if technology=='Default' or not len(cells):
+		return
+	if technology=='Tet':
+		part.setMeshControls(regions=cells, elemShape=TET, technique=FREE)
+	if solver=='Explicit':
+		codes=explicitElementCodes.get(technology, elementCodes[technology])
+		library=EXPLICIT
+	else:
+		codes=elementCodes[technology]
+		library=STANDARD
+	part.setElementType(regions=(cells,), elemTypes=tuple([ElemType(
+	    elemCode=code, elemLibrary=library) for code in codes]))
+
 #*****************************************************************************
 # Call Functions
 #*****************************************************************************
-createPartitionBone(myModel, myAssem)
-createPartBone(myModel, myAssem)
-createPartitionPlate(myModel, myAssem)
-createPartPlate(myModel, myAssem)
-createPartScrew(myModel, myAssem)
+if buildStage('Partitions'):
+	if construction=='Direct':
+		createPartBone(myModel, myAssem, 'Bone')
+		createPartPlate(myModel, myAssem, 'Plate')
+	else:
+		createPartitionBone(myModel, myAssem)
+		createPartBone(myModel, myAssem)
+		createPartitionPlate(myModel, myAssem)
+		createPartPlate(myModel, myAssem)
 
 #*****************************************************************************
 # Merge Solid Bone with Shell Partition
 #*****************************************************************************
-BoneInstance=myAssem.InstanceFromBooleanMerge(domain=
-    GEOMETRY, instances=(
-    myAssem.instances['Solid Bone'], 
-    myAssem.instances['Bone Partition Part']), 
-    keepIntersections=ON, name='Bone', originalInstances=SUPPRESS)
-myAssem.features.changeKey(fromName='Bone-1', 
-    toName='Bone')
-BonePart = mdb.models['Bone and Screw'].parts['Bone']
+if buildStage('Partitions') and construction!='Direct':
+	BoneInstance=myAssem.InstanceFromBooleanMerge(domain=
+	    GEOMETRY, instances=(
+	    myAssem.instances['Solid Bone'], 
+	    myAssem.instances['Bone Partition Part']), 
+	    keepIntersections=ON, name='Bone', originalInstances=SUPPRESS)
+	myAssem.features.changeKey(fromName='Bone-1', 
+	    toName='Bone')
+	BonePart = mdb.models['Bone and Screw'].parts['Bone']
 
 #*****************************************************************************
 # Merge Solid Plate with Shell Partition
 #*****************************************************************************
-PlateInstance=myAssem.InstanceFromBooleanMerge(domain=
-    GEOMETRY, instances=(
-    myAssem.instances['Solid Plate'], 
-    myAssem.instances['Plate Partition Part']), 
-    keepIntersections=ON, name='Plate', originalInstances=SUPPRESS)
-myAssem.features.changeKey(fromName='Plate-1', 
-    toName='Plate')
-PlatePart = mdb.models['Bone and Screw'].parts['Plate']
+if buildStage('Partitions') and construction!='Direct':
+	PlateInstance=myAssem.InstanceFromBooleanMerge(domain=
+	    GEOMETRY, instances=(
+	    myAssem.instances['Solid Plate'], 
+	    myAssem.instances['Plate Partition Part']), 
+	    keepIntersections=ON, name='Plate', originalInstances=SUPPRESS)
+	myAssem.features.changeKey(fromName='Plate-1', 
+	    toName='Plate')
+	PlatePart = mdb.models['Bone and Screw'].parts['Plate']
+	plateZ=dbone
 
 #*****************************************************************************
-# Create Screw Holes
+# Partition Bone and Plate in Place (no boolean operations)
 #*****************************************************************************
-ScrewHolesSketch=myModel.ConstrainedSketch(gridSpacing=0.36, name=
-    'Screw Hole Sketch', sheetSize=14.96, transform=
-    BonePart.MakeSketchTransform(
-    sketchPlane=BonePart.faces.findAt((3.49/2,0,dbone)), 
-    sketchPlaneSide=SIDE1, 
-    sketchUpEdge=BonePart.edges.findAt((14.96,0,dbone)), 
-    sketchOrientation=RIGHT, origin=(0, 0, dbone)))
-BonePart.projectReferencesOntoSketch(filter=
-    COPLANAR_EDGES, sketch=ScrewHolesSketch)
-
-rp= R*cos(pi/4)
-ScrewHolesSketch.CircleByCenterPerimeter(center=(cx,cy), point1=(cx+rp,cy+rp))
-ScrewHolesSketch.CircleByCenterPerimeter(center=(cx2,cy2), point1=(cx2+rp,cy2+rp))
-
-ScrewHolesSketch2=myModel.ConstrainedSketch(gridSpacing=0.36, name=
-    'Screw Hole Sketch 2', sheetSize=14.96, transform=
-    PlatePart.MakeSketchTransform(
-    sketchPlane=PlatePart.faces.findAt((2.46/2,0,dbone+dplate)), 
-    sketchPlaneSide=SIDE1, 
-    sketchUpEdge=PlatePart.edges.findAt((7.94,0,dbone+dplate)), 
-    sketchOrientation=RIGHT, origin=(0, 0, dbone+dplate)))
-PlatePart.projectReferencesOntoSketch(filter=
-    COPLANAR_EDGES, sketch=ScrewHolesSketch2)
-
-rp= R*cos(pi/4)
-ScrewHolesSketch2.CircleByCenterPerimeter(center=(cx,cy), point1=(cx+rp,cy+rp))
-ScrewHolesSketch2.CircleByCenterPerimeter(center=(cx2,cy2), point1=(cx2+rp,cy2+rp))
-
-BonePart.CutExtrude(depth=dscrew-dplate, 
-    flipExtrudeDirection=OFF, sketch=
-    ScrewHolesSketch, sketchOrientation=
-    RIGHT, sketchPlane=BonePart.faces.findAt((3.49/2,0,dbone)), 
-    sketchPlaneSide=SIDE1, sketchUpEdge=
-    BonePart.edges.findAt((14.96,0,dbone)))
-
-PlatePart.CutExtrude(depth=dplate, 
-    flipExtrudeDirection=OFF, sketch=
-    ScrewHolesSketch2, sketchOrientation=
-    RIGHT, sketchPlane=PlatePart.faces.findAt((2.46/2,0,dbone+dplate)), 
-    sketchPlaneSide=SIDE1, sketchUpEdge=
-    PlatePart.edges.findAt((7.94,0,dbone+dplate)))
+if buildStage('Partitions') and construction=='Direct':
+	BoneInstance=myAssem.instances['Bone']
+	BonePart = mdb.models['Bone and Screw'].parts['Bone']
+	PlateInstance=myAssem.instances['Plate']
+	PlatePart = mdb.models['Bone and Screw'].parts['Plate']
+	
+	partitionFromTop(BonePart, drawPartitionBone, boneFaceProbe+(dbone,), boneEdgeProbe+(dbone,))
+	partitionFromTop(PlatePart, drawPartitionPlate, plateFaceProbe+(dplate,), plateEdgeProbe+(dplate,))
+	
+	# The plate part is built from z=0 and translated in the assembly
+	plateZ=0
 
 #*****************************************************************************
-# Mesh Parts
+# Checkpoint of the Partitioned Bone and Plate
 #*****************************************************************************
-BonePart.seedPart(deviationFactor=0.1, size=meshSize)
-BonePart.generateMesh()
+if buildStage('Partitions'):
+	saveCheckpoint('Partitions')
 
-PlatePart.seedPart(deviationFactor=0.1, size=meshSize)
-PlatePart.generateMesh()
+#*****************************************************************************
+# Create Screws and Screw Holes
+#*****************************************************************************
+if buildStage('Holes'):
+	createPartScrew(myModel, myAssem)
+
+if buildStage('Holes') and construction!='Direct':
+	ScrewHolesSketch=myModel.ConstrainedSketch(gridSpacing=0.36, name=
+	    'Screw Hole Sketch', sheetSize=14.96, transform=
+	    BonePart.MakeSketchTransform(
+	    sketchPlane=BonePart.faces.findAt(boneFaceProbe+(dbone,)), 
+	    sketchPlaneSide=SIDE1, 
+	    sketchUpEdge=BonePart.edges.findAt(boneEdgeProbe+(dbone,)), 
+	    sketchOrientation=RIGHT, origin=(0, 0, dbone)))
+	BonePart.projectReferencesOntoSketch(filter=
+	    COPLANAR_EDGES, sketch=ScrewHolesSketch)
+
+	rp= R*cos(pi/4)
+	ScrewHolesSketch.CircleByCenterPerimeter(center=(cx,cy), point1=(cx+rp,cy+rp))
+	ScrewHolesSketch.CircleByCenterPerimeter(center=(cx2,cy2), point1=(cx2+rp,cy2+rp))
+
+	ScrewHolesSketch2=myModel.ConstrainedSketch(gridSpacing=0.36, name=
+	    'Screw Hole Sketch 2', sheetSize=14.96, transform=
+	    PlatePart.MakeSketchTransform(
+	    sketchPlane=PlatePart.faces.findAt(plateFaceProbe+(dbone+dplate,)), 
+	    sketchPlaneSide=SIDE1, 
+	    sketchUpEdge=PlatePart.edges.findAt(plateEdgeProbe+(dbone+dplate,)), 
+	    sketchOrientation=RIGHT, origin=(0, 0, dbone+dplate)))
+	PlatePart.projectReferencesOntoSketch(filter=
+	    COPLANAR_EDGES, sketch=ScrewHolesSketch2)
+
+	rp= R*cos(pi/4)
+	ScrewHolesSketch2.CircleByCenterPerimeter(center=(cx,cy), point1=(cx+rp,cy+rp))
+	ScrewHolesSketch2.CircleByCenterPerimeter(center=(cx2,cy2), point1=(cx2+rp,cy2+rp))
+
+	BonePart.CutExtrude(depth=dscrew-dplate, 
+	    flipExtrudeDirection=OFF, sketch=
+	    ScrewHolesSketch, sketchOrientation=
+	    RIGHT, sketchPlane=BonePart.faces.findAt(boneFaceProbe+(dbone,)), 
+	    sketchPlaneSide=SIDE1, sketchUpEdge=
+	    BonePart.edges.findAt(boneEdgeProbe+(dbone,)))
+
+	PlatePart.CutExtrude(depth=dplate, 
+	    flipExtrudeDirection=OFF, sketch=
+	    ScrewHolesSketch2, sketchOrientation=
+	    RIGHT, sketchPlane=PlatePart.faces.findAt(plateFaceProbe+(dbone+dplate,)), 
+	    sketchPlaneSide=SIDE1, sketchUpEdge=
+	    PlatePart.edges.findAt(plateEdgeProbe+(dbone+dplate,)))
+
+if buildStage('Holes') and construction=='Direct':
+	# ================= Screw Holes from the Hole Cells ====================
+	holeBottom=dbone+dplate-dscrew
+	if holeBottom>1e-6 and min(abs(holeBottom-dcort),abs(holeBottom-dcort-dtrab))>1e-6:
+		datum=BonePart.DatumPlaneByPrincipalPlane(principalPlane=XYPLANE,
+			offset=holeBottom)
+		BonePart.PartitionCellByDatumPlane(datumPlane=BonePart.datums[datum.id],
+			cells=holeCells(BonePart))
+	BonePart.RemoveCells(cellList=holeCells(BonePart, holeBottom))
+	PlatePart.RemoveCells(cellList=holeCells(PlatePart))
 
-ScrewPart = mdb.models['Bone and Screw'].parts['Screw 1']
-ScrewPart2 = mdb.models['Bone and Screw'].parts['Screw 2']
+#*****************************************************************************
+# Fuse Screws and Plate into One Conformal Part (replaces the screw ties)
+#*****************************************************************************
+if buildStage('Holes') and screwPlate=='Merged':
+	PlateInstance=myAssem.InstanceFromBooleanMerge(domain=
+	    GEOMETRY, instances=(
+	    myAssem.instances['Plate'], 
+	    myAssem.instances['Screw 1'], 
+	    myAssem.instances['Screw 2']), 
+	    keepIntersections=ON, name='Plate and Screws', originalInstances=DELETE)
+	myAssem.features.changeKey(fromName='Plate and Screws-1', 
+	    toName='Plate')
+	PlatePart = mdb.models['Bone and Screw'].parts['Plate and Screws']
+	
+	# ================= Keep Sections per Region ===========================
+	while len(PlatePart.sectionAssignments):
+		del PlatePart.sectionAssignments[0]
+	screwPoints=[]
+	platePoints=[]
+	for cell in PlatePart.cells:
+		x,y,z=cell.pointOn[0]
+		if hypot(x-cx,y-cy)<R or hypot(x-cx2,y-cy2)<R:
+			screwPoints.append(((x,y,z),))
+		else:
+			platePoints.append(((x,y,z),))
+	for points,sectionName in ((screwPoints,'Screw'),(platePoints,'Plate')):
+		PlatePart.SectionAssignment(offset=0.0, 
+		    offsetField='', offsetType=MIDDLE_SURFACE, region=Region(
+		    cells=PlatePart.cells.findAt(*points)), sectionName=sectionName, 
+		    thicknessAssignment=FROM_SECTION)
+	
+	# ================= Carry Over Screw Surfaces in the Bone ==============
+	for k in (1,2):
+		ScrewPart=myModel.parts['Screw %d' % k]
+		for name in ScrewPart.surfaces.keys():
+			if name=='Plate':
+				continue
+			points=[((p[0],p[1],p[2]+dbone+dplate-dscrew),) for p in
+				[face.pointOn[0] for face in ScrewPart.surfaces[name].faces]]
+			PlatePart.Surface(side1Faces=PlatePart.faces.findAt(*points),
+				name='Screw %d %s' % (k, name))
 
-ScrewPart.seedPart(deviationFactor=0.1, size=meshSize)
-ScrewPart.generateMesh()
-ScrewPart2.seedPart(deviationFactor=0.1, size=meshSize)
-ScrewPart2.generateMesh()
+#*****************************************************************************
+# Checkpoint of the Bone, Plate and Screws
+#*****************************************************************************
+if buildStage('Holes'):
+	saveCheckpoint('Holes')
+
+#*****************************************************************************
+# Condense Far-Field Bone into a Substructure (generated once, then cached)
+#*****************************************************************************
+if buildStage('Mesh') and farField=='On':
+	farFieldKey=hashlib.md5(repr((dbone, dcort, dtrab, Ecortical, Etrabecular,
+		n, meshSize, boneElement, nearFieldBlocks)).encode()).hexdigest()[:10]
+	farFieldName='Far-Field-'+farFieldKey
+	substructureDir=os.path.abspath(substructureDir)
+	farFieldPath=os.path.join(substructureDir, farFieldName)
+
+	if not os.path.exists(farFieldPath+'_Z1.sim'):
+		# ================= Far-Field Bone Model ===========================
+		farModel=mdb.Model(name='Far Field')
+		farModel.copyMaterials(sourceModel=myModel)
+		farModel.copySections(sourceModel=myModel)
+		FarPart=farModel.Part(name='Far Field Bone', objectToCopy=BonePart)
+		FarPart.RemoveCells(cellList=nearFieldCells(FarPart))
+		setElementTechnology(FarPart, FarPart.cells, boneElement)
+		FarPart.seedPart(deviationFactor=0.1, size=meshSize)
+		FarPart.generateMesh()
+		FarInstance=farModel.rootAssembly.Instance(dependent=ON,
+			name='Far Field Bone', part=FarPart)
+
+		# ================= Retained Nodes and Condensed BCs ===============
+		farModel.SubstructureGenerateStep(name='Generate Far Field',
+			previous='Initial', substructureIdentifier=1)
+		farModel.RetainedNodalDofsBC(createStepName='Generate Far Field',
+			name='Retain Interface', region=Region(nodes=farFieldInterface(
+			FarInstance.nodes)), u1=ON, u2=ON, u3=ON, ur1=OFF, ur2=OFF, ur3=OFF)
+		farModel.RetainedNodalDofsBC(createStepName='Generate Far Field',
+			name='Retain Bone X Plane', region=Region(nodes=planeNodes(
+			FarInstance.nodes, x=boneX)), u1=ON, u2=OFF, u3=OFF, ur1=OFF,
+			ur2=OFF, ur3=OFF)
+		farModel.DisplacementBC(amplitude=UNSET, createStepName='Initial',
+			distributionType=UNIFORM, fieldName='', localCsys=None,
+			name='Fix Z Disp of Bone X Plane', region=Region(nodes=planeNodes(
+			FarInstance.nodes, x=boneX)), u1=UNSET, u2=UNSET, u3=SET,
+			ur1=UNSET, ur2=UNSET, ur3=UNSET)
+		farModel.YsymmBC(createStepName='Initial', name='Y Symm of Bone -Y Plane',
+			region=Region(nodes=planeNodes(FarInstance.nodes, y=boneY1)))
+
+		# ================= Generate Substructure ==========================
+		# Generated under a temporary name in the job directory and renamed
+		#   into the cache only once it has completed, so parallel variants
+		#   never read a partly written or failed substructure
+		tempName='%s-%s' % (farFieldName, uuid.uuid4().hex[:8])
+		tempDir=os.path.abspath(tempName)
+		os.makedirs(tempDir)
+		workDir=os.getcwd()
+		os.chdir(tempDir)
+		try:
+			mdb.Job(name=tempName, model='Far Field', type=ANALYSIS,
+				memory=90, memoryUnits=PERCENTAGE, getMemoryFromAnalysis=True)
+			mdb.jobs[tempName].submit(consistencyChecking=OFF)
+			mdb.jobs[tempName].waitForCompletion()
+		finally:
+			os.chdir(workDir)
+		del mdb.jobs[tempName]
+		del mdb.models['Far Field']
+
+		tempPath=os.path.join(tempDir, tempName)
+		completed=False
+		for extension in ('.sta', '.msg'):
+			if os.path.exists(tempPath+extension):
+				with open(tempPath+extension) as f:
+					completed=completed or \
+						'THE ANALYSIS HAS COMPLETED SUCCESSFULLY' in f.read()
+		if not completed or not os.path.exists(tempPath+'_Z1.sim'):
+			raise RuntimeError('Far-field substructure %s did not complete, see '
+				'the .msg and .dat files in %s' % (farFieldName, tempDir))
+
+		try:
+			os.makedirs(substructureDir)
+		except OSError:
+			if not os.path.isdir(substructureDir):
+				raise
+		# The .odb is moved first, so a cached .sim always has its .odb
+		for extension in ('.odb', '_Z1.sim'):
+			try:
+				os.rename(tempPath+extension, farFieldPath+extension)
+			except OSError:
+				# Already cached by another variant (Windows does not replace it)
+				if not os.path.exists(farFieldPath+extension):
+					raise
+		shutil.rmtree(tempDir, ignore_errors=True)
+
+	# ================= Keep Only the Near-Field Bone ======================
+	BonePart.RemoveCells(cellList=farFieldCells(BonePart))
+	myAssem.regenerate()
+
+	FarFieldPart=myModel.PartFromSubstructure(name='Far Field',
+		substructureFile=farFieldPath+'_Z1.sim', odbFile=farFieldPath+'.odb')
+	FarFieldInstance=myAssem.Instance(dependent=ON, name='Far Field',
+		part=FarFieldPart)
+
+#*****************************************************************************
+# Mesh Parts
+#*****************************************************************************
+if buildStage('Mesh'):
+	setElementTechnology(BonePart, BonePart.cells, boneElement)
+	BonePart.seedPart(deviationFactor=0.1, size=meshSize)
+	BonePart.generateMesh()
+
+	if screwPlate=='Merged':
+		screwPoints=[]
+		platePoints=[]
+		for cell in PlatePart.cells:
+			x,y,z=cell.pointOn[0]
+			if hypot(x-cx,y-cy)<R or hypot(x-cx2,y-cy2)<R:
+				screwPoints.append(((x,y,z),))
+			else:
+				platePoints.append(((x,y,z),))
+		setElementTechnology(PlatePart, PlatePart.cells.findAt(*platePoints),
+			plateElement)
+		setElementTechnology(PlatePart, PlatePart.cells.findAt(*screwPoints),
+			screwElement)
+	else:
+		setElementTechnology(PlatePart, PlatePart.cells, plateElement)
+	PlatePart.seedPart(deviationFactor=0.1, size=meshSize)
+	PlatePart.generateMesh()
+
+	if screwPlate!='Merged':
+		ScrewPart = mdb.models['Bone and Screw'].parts['Screw 1']
+		ScrewPart2 = mdb.models['Bone and Screw'].parts['Screw 2']
+	
+		setElementTechnology(ScrewPart, ScrewPart.cells, screwElement)
+		setElementTechnology(ScrewPart2, ScrewPart2.cells, screwElement)
+		ScrewPart.seedPart(deviationFactor=0.1, size=meshSize)
+		ScrewPart.generateMesh()
+		ScrewPart2.seedPart(deviationFactor=0.1, size=meshSize)
+		ScrewPart2.generateMesh()
+
+#*****************************************************************************
+# Checkpoint of the Meshed Model
+#*****************************************************************************
+if buildStage('Mesh'):
+	saveCheckpoint('Mesh')
 
 #*****************************************************************************
 #Create Surfaces
 #*****************************************************************************
 
-face1 = PlatePart.faces.findAt(((cx+R,cy,dbone+dplate/2),),
-	((cx,cy+R,dbone+dplate/2),), ((cx-R,cy,dbone+dplate/2),),
-	((cx,cy-R,dbone+dplate/2),),)
-PlatePart.Surface(side1Faces=face1, name='Int 1')
-face1 = PlatePart.faces.findAt(((cx2+R,cy2,dbone+dplate/2),),
-	((cx2,cy2+R,dbone+dplate/2),), ((cx2-R,cy2,dbone+dplate/2),),
-	((cx2,cy2-R,dbone+dplate/2),),)
-PlatePart.Surface(side1Faces=face1, name='Int 2')
+if screwPlate!='Merged':
+	face1 = PlatePart.faces.findAt(((cx+R,cy,plateZ+dplate/2),),
+		((cx,cy+R,plateZ+dplate/2),), ((cx-R,cy,plateZ+dplate/2),),
+		((cx,cy-R,plateZ+dplate/2),),)
+	PlatePart.Surface(side1Faces=face1, name='Int 1')
+	face1 = PlatePart.faces.findAt(((cx2+R,cy2,plateZ+dplate/2),),
+		((cx2,cy2+R,plateZ+dplate/2),), ((cx2-R,cy2,plateZ+dplate/2),),
+		((cx2,cy2-R,plateZ+dplate/2),),)
+	PlatePart.Surface(side1Faces=face1, name='Int 2')
 
 ###### Case 1 - Screw only partially penetrates trabecular
 if dscrew<(dplate+dcort+dtrab):
@@ -717,12 +1341,12 @@ if dscrew<(dplate+dcort+dtrab):
 	    myAssem.instances['Bone'].surfaces['Trab 2']))
 	myAssem.SurfaceByMerge(name='Screw 1 Bone Contact Area', 
 	    surfaces=(
-	    myAssem.instances['Screw 1'].surfaces['Top Cort'], 
-	    myAssem.instances['Screw 1'].surfaces['Trab']))
+	    screwSurface(1, 'Top Cort'), 
+	    screwSurface(1, 'Trab')))
 	myAssem.SurfaceByMerge(name='Screw 2 Bone Contact Area', 
 	    surfaces=(
-	    myAssem.instances['Screw 2'].surfaces['Top Cort'], 
-	    myAssem.instances['Screw 2'].surfaces['Trab']))
+	    screwSurface(2, 'Top Cort'), 
+	    screwSurface(2, 'Trab')))
 	
 	
 
@@ -755,12 +1379,12 @@ elif dscrew==(dplate+dcort+dtrab):
 	    myAssem.instances['Bone'].surfaces['Trab 2']))
 	myAssem.SurfaceByMerge(name='Screw 1 Bone Contact Area', 
 	    surfaces=(
-	    myAssem.instances['Screw 1'].surfaces['Top Cort'], 
-	    myAssem.instances['Screw 1'].surfaces['Trab']))
+	    screwSurface(1, 'Top Cort'), 
+	    screwSurface(1, 'Trab')))
 	myAssem.SurfaceByMerge(name='Screw 2 Bone Contact Area', 
 	    surfaces=(
-	    myAssem.instances['Screw 2'].surfaces['Top Cort'], 
-	    myAssem.instances['Screw 2'].surfaces['Trab']))
+	    screwSurface(2, 'Top Cort'), 
+	    screwSurface(2, 'Trab')))
 
 ###### Case 3 - Screw fully penetrates trabecular and partially penetrates bottom cortical	
 elif dscrew>(dplate+dcort+dtrab) and dscrew<(dplate+dbone):
@@ -803,14 +1427,14 @@ elif dscrew>(dplate+dcort+dtrab) and dscrew<(dplate+dbone):
 	    myAssem.instances['Bone'].surfaces['Bot Cort 2']))
 	myAssem.SurfaceByMerge(name='Screw 1 Bone Contact Area', 
 	    surfaces=(
-	    myAssem.instances['Screw 1'].surfaces['Top Cort'], 
-	    myAssem.instances['Screw 1'].surfaces['Trab'],
-	    myAssem.instances['Screw 1'].surfaces['Bot Cort']))
+	    screwSurface(1, 'Top Cort'), 
+	    screwSurface(1, 'Trab'),
+	    screwSurface(1, 'Bot Cort')))
 	myAssem.SurfaceByMerge(name='Screw 2 Bone Contact Area', 
 	    surfaces=(
-	    myAssem.instances['Screw 2'].surfaces['Top Cort'], 
-	    myAssem.instances['Screw 2'].surfaces['Trab'],
-	    myAssem.instances['Screw 2'].surfaces['Bot Cort']))
+	    screwSurface(2, 'Top Cort'), 
+	    screwSurface(2, 'Trab'),
+	    screwSurface(2, 'Bot Cort')))
 
 ###### Case 4 - Screw fully penetrates all bone layers	
 else:
@@ -851,37 +1475,35 @@ else:
 	    myAssem.instances['Bone'].surfaces['Bot Cort 2']))
 	myAssem.SurfaceByMerge(name='Screw 1 Bone Contact Area', 
 	    surfaces=(
-	    myAssem.instances['Screw 1'].surfaces['Top Cort'], 
-	    myAssem.instances['Screw 1'].surfaces['Trab'],
-	    myAssem.instances['Screw 1'].surfaces['Bot Cort']))
+	    screwSurface(1, 'Top Cort'), 
+	    screwSurface(1, 'Trab'),
+	    screwSurface(1, 'Bot Cort')))
 	myAssem.SurfaceByMerge(name='Screw 2 Bone Contact Area', 
 	    surfaces=(
-	    myAssem.instances['Screw 2'].surfaces['Top Cort'], 
-	    myAssem.instances['Screw 2'].surfaces['Trab'],
-	    myAssem.instances['Screw 1'].surfaces['Bot Cort']))
+	    screwSurface(2, 'Top Cort'), 
+	    screwSurface(2, 'Trab'),
+	    screwSurface(1, 'Bot Cort')))
 	
 
 #*****************************************************************************
 #Create Sets
 #*****************************************************************************
-face1 = BoneInstance.faces.findAt(((1.745,-5.715,dcort/2),),
-	((1.745,-5.715,dcort+dtrab/2),), ((1.745,-5.715,dcort+dtrab+dcort/2),),
-	((5.715,-5.715,dcort/2),), ((5.715,-5.715,dcort+dtrab/2),),
-	((5.715,-5.715,dcort+dtrab+dcort/2),), ((11.45,-5.715,dcort/2),),
-	((11.45,-5.715,dcort+dtrab/2),), ((11.45,-5.715,dcort+dtrab+dcort/2),),)
-myAssem.Set(faces=face1, name='Bone -Y Plane')
-face1 = BoneInstance.faces.findAt(((14.96,-3.97,dcort/2),),
-	((14.96,-3.97,dcort+dtrab/2),), ((14.96,-3.97,dcort+dtrab+dcort/2),),
-	((14.96,0,dcort/2),), ((14.96,0,dcort+dtrab/2),),
-	((14.96,0,dcort+dtrab+dcort/2),), ((14.96,3.52,dcort/2),),
-	((14.96,3.52,dcort+dtrab/2),), ((14.96,3.52,dcort+dtrab+dcort/2),),
-	((14.96,7.04,dcort/2),),
-	((14.96,7.04,dcort+dtrab/2),), ((14.96,7.04,dcort+dtrab+dcort/2),),)
-myAssem.Set(faces=face1, name='Bone X Plane')
-
-face1 = PlateInstance.faces.findAt(((0.,0.,dbone+dplate),),)
+if farField=='On':
+	# Bone -Y Plane symmetry and Z fixity are condensed into the substructure
+	myAssem.Set(nodes=planeNodes(FarFieldInstance.nodes, x=boneX),
+		name='Bone X Plane')
+else:
+	layerZ=(dcort/2, dcort+dtrab/2, dcort+dtrab+dcort/2)
+	face1 = BoneInstance.faces.findAt(*[((x,boneY1,z),) for x in boneYPlaneX
+		for z in layerZ])
+	myAssem.Set(faces=face1, name='Bone -Y Plane')
+	face1 = BoneInstance.faces.findAt(*[((boneX,y,z),) for y in boneXPlaneY
+		for z in layerZ])
+	myAssem.Set(faces=face1, name='Bone X Plane')
+
+face1 = PlateInstance.faces.findAt(((0,armY,dbone+dplate),),)
 myAssem.Set(faces=face1, name='Plate -X Plane')
-face1 = PlateInstance.faces.findAt(((5.715,-5.715,dbone+dplate),),)
+face1 = PlateInstance.faces.findAt(((cx,boneY1,dbone+dplate),),)
 myAssem.Set(faces=face1, name='Plate -Y Plane')
 
 # *****************************************************************************
@@ -907,16 +1529,23 @@ mdb.models['Bone and Screw'].interactionProperties['Coulomb Friction (Penalty)']
 
 
 # ================= Tie Constraints ===========================================
-myModel.Tie(adjust=ON, master=
-    myAssem.instances['Plate'].surfaces['Int 1']
-    , name='Tie Screw 1 to Plate', positionToleranceMethod=COMPUTED, slave=
-    myAssem.instances['Screw 1'].surfaces['Plate']
-    , thickness=ON, tieRotations=ON)
-myModel.Tie(adjust=ON, master=
-    myAssem.instances['Plate'].surfaces['Int 2']
-    , name='Tie Screw 2 to Plate', positionToleranceMethod=COMPUTED, slave=
-    myAssem.instances['Screw 2'].surfaces['Plate']
-    , thickness=ON, tieRotations=ON)
+if screwPlate!='Merged':
+	myModel.Tie(adjust=ON, master=
+	    myAssem.instances['Plate'].surfaces['Int 1']
+	    , name='Tie Screw 1 to Plate', positionToleranceMethod=COMPUTED, slave=
+	    myAssem.instances['Screw 1'].surfaces['Plate']
+	    , thickness=ON, tieRotations=ON)
+	myModel.Tie(adjust=ON, master=
+	    myAssem.instances['Plate'].surfaces['Int 2']
+	    , name='Tie Screw 2 to Plate', positionToleranceMethod=COMPUTED, slave=
+	    myAssem.instances['Screw 2'].surfaces['Plate']
+	    , thickness=ON, tieRotations=ON)
+
+if farField=='On':
+	myModel.Tie(adjust=OFF, master=Region(side1Faces=farFieldInterface(
+	    BoneInstance.faces)), name='Tie Near Field to Far Field',
+	    positionToleranceMethod=COMPUTED, slave=Region(nodes=farFieldInterface(
+	    FarFieldInstance.nodes)), thickness=ON, tieRotations=OFF)
 
 # ================= Interactions ==============================================
 
@@ -947,33 +1576,171 @@ if contactForm=='Coulomb':
 	myModel.interactions['Screw 2 and Bone'].setValuesInStep(
 	    interactionProperty='Coulomb Friction (Penalty)', stepName='Initial')
 
+if contactForm=='Tie':
+	for k,hole in (('1','Hole Interior'),('2','Hole 2 Interior')):
+		del myModel.interactions['Screw %s and Bone' % k]
+		myModel.Tie(adjust=OFF, master=
+		    myAssem.surfaces['Screw %s Bone Contact Area' % k]
+		    , name='Screw %s and Bone' % k, positionToleranceMethod=COMPUTED, slave=
+		    myAssem.surfaces[hole]
+		    , thickness=ON, tieRotations=OFF)
+
+if contactStabilization=='On' and contactForm!='Tie':
+	myModel.StdContactControl(name='Contact Stabilization', 
+	    stabilizeChoice=AUTOMATIC)
+	for k in ('1','2'):
+		myModel.interactions['Screw %s and Bone' % k].setValues(
+		    contactControls='Contact Stabilization')
+
+# ================= General Contact of the Explicit Solver ===================
+# (the screw-bone pairs above only, with penalty friction for Lagrange)
+if solver=='Explicit' and contactForm!='Tie':
+	explicitProperty={'Lagrange':'Coulomb Friction (Penalty)',
+		'Coulomb':'Coulomb Friction (Penalty)','Rough':'Rough Contact'}[contactForm]
+	for k in ('1','2'):
+		del myModel.interactions['Screw %s and Bone' % k]
+	myModel.ContactExp(name='General Contact', createStepName='Initial')
+	myModel.interactions['General Contact'].includedPairs.setValuesInStep(
+	    stepName='Initial', useAllstar=OFF, addPairs=(
+	    (myAssem.surfaces['Screw 1 Bone Contact Area'], myAssem.surfaces['Hole Interior']), 
+	    (myAssem.surfaces['Screw 2 Bone Contact Area'], myAssem.surfaces['Hole 2 Interior'])))
+	myModel.interactions['General Contact'].contactPropertyAssignments.appendInStep(
+	    stepName='Initial', assignments=((GLOBAL, SELF, explicitProperty), ))
+
 # *****************************************************************************
 # Loads
 # *****************************************************************************
-myModel.StaticStep(name='Loads (Static, General)', 
-    previous='Initial')
-myModel.steps['Loads (Static, General)'].setValues(
-    initialInc=0.1, maxInc=0.1)
+loadStep='Loads (Static, General)'
+loadAmplitude=UNSET
+if solver=='Explicit':
+	# ================= Quasi-Static Explicit Step =========================
+	loadStep='Loads (Explicit, Quasi-Static)'
+	myModel.ExplicitDynamicsStep(name=loadStep, previous='Initial', 
+	    timePeriod=explicitTime, massScaling=((SEMI_AUTOMATIC, MODEL, 
+	    AT_BEGINNING, 0.0, explicitInc, BELOW_MIN, 0, 0, 0.0, 0.0, 0, None), ))
+	myModel.SmoothStepAmplitude(name='Smooth Load', timeSpan=STEP, 
+	    data=((0.0, 0.0), (explicitTime, 1.0)))
+	loadAmplitude='Smooth Load'
+	
+	# Energies of the whole model and added mass for the quasi-static checks
+	if 'H-Output-1' in myModel.historyOutputRequests.keys():
+		myModel.historyOutputRequests['H-Output-1'].setValues(
+		    variables=('ALLAE', 'ALLIE', 'ALLKE', 'ALLWK', 'ETOTAL', 'DMASS'))
+else:
+	myModel.StaticStep(name='Loads (Static, General)', 
+	    previous='Initial')
+	if contactForm=='Tie' and 'initialInc' not in cmdParams and 'maxInc' not in cmdParams:
+		initialInc=1.0
+		maxInc=1.0
+	myModel.steps['Loads (Static, General)'].setValues(
+	    initialInc=initialInc, maxInc=maxInc, minInc=min(minInc, initialInc))
+
+	# ================= Solver Technique ===================================
+	if matrixStorage=='Auto':
+		if contactForm in ('Lagrange','Coulomb'):
+			matrixStorage='Unsymmetric'
+		else:
+			matrixStorage='Symmetric'
+	if matrixSolver=='Auto':
+		# Lagrange friction adds Lagrange multipliers, which need the direct solver
+		modelDofs=3*sum([len(instance.nodes) for instance in myAssem.instances.values()])
+		if matrixStorage=='Symmetric' and contactForm!='Lagrange' and modelDofs>iterativeDofs:
+			matrixSolver='Iterative'
+		else:
+			matrixSolver='Direct'
+	myModel.steps['Loads (Static, General)'].setValues(
+	    matrixSolver={'Direct':DIRECT, 'Iterative':ITERATIVE}[matrixSolver],
+	    matrixStorage={'Symmetric':SYMMETRIC, 'Unsymmetric':UNSYMMETRIC}[matrixStorage])
 
 region = myAssem.sets['Bone X Plane']
-myModel.DisplacementBC(amplitude=UNSET, 
-    createStepName='Loads (Static, General)', distributionType=UNIFORM, 
+myModel.DisplacementBC(amplitude=loadAmplitude, 
+    createStepName=loadStep, distributionType=UNIFORM, 
     fieldName='', fixed=OFF, localCsys=None, name='Disp Load of Bone X Plane', 
     region=region, 
     u1=DispLoad, u2=UNSET, u3=UNSET, ur1=UNSET, ur2=UNSET, ur3=UNSET)
 
+# ================= Load Ladder (one step per further DispLoad value) =======
+if loadLevels:
+	levels=[float(v) for v in str(loadLevels).split(',')]
+	myModel.boundaryConditions['Disp Load of Bone X Plane'].setValues(u1=levels[0])
+	previous='Loads (Static, General)'
+	for k,level in enumerate(levels[1:]):
+		stepName='Load Level %d' % (k+2)
+		myModel.StaticStep(name=stepName, previous=previous, 
+		    initialInc=initialInc, maxInc=maxInc, minInc=min(minInc, initialInc), 
+		    matrixSolver=myModel.steps[previous].matrixSolver, 
+		    matrixStorage=myModel.steps[previous].matrixStorage)
+		myModel.boundaryConditions['Disp Load of Bone X Plane'].setValuesInStep(
+		    stepName=stepName, u1=level)
+		previous=stepName
+
+# ================= Cyclic Loading (periodic displacement history) ==========
+if cyclicLoad!='Off':
+	if cyclicLoad=='Auto':
+		if contactForm=='Lagrange':
+			cyclicLoad='Steps'
+		else:
+			cyclicLoad='Direct'
+	
+	# One cycle per unit of step time, starting and ending at cycleRatio
+	myModel.PeriodicAmplitude(name='Load Cycle', timeSpan=STEP, frequency=2*pi, 
+	    start=0.0, a_0=(1+cycleRatio)/2.0, data=((-(1-cycleRatio)/2.0, 0.0), ))
+	myModel.boundaryConditions['Disp Load of Bone X Plane'].setValues(
+	    u1=cycleRatio*DispLoad)
+	cycleInc=1.0/cycleIncrements
+	staticStep=myModel.steps['Loads (Static, General)']
+	if cyclicLoad=='Direct':
+		cycleSteps=['Load Cycles (Direct Cyclic)']
+		myModel.DirectCyclicStep(name=cycleSteps[0], previous='Loads (Static, General)', 
+		    timePeriod=1.0, maxNumInc=10*int(cycleIncrements), initialInc=cycleInc, 
+		    maxInc=cycleInc, minInc=min(minInc, cycleInc), 
+		    maxNumIterations=int(cyclicIterations), 
+		    matrixStorage=staticStep.matrixStorage)
+	else:
+		cycleSteps=['Cycle %d' % (k+1) for k in range(int(numCycles))]
+		previous='Loads (Static, General)'
+		for stepName in cycleSteps:
+			myModel.StaticStep(name=stepName, previous=previous, timePeriod=1.0, 
+			    initialInc=cycleInc, maxInc=cycleInc, minInc=min(minInc, cycleInc), 
+			    matrixSolver=staticStep.matrixSolver, 
+			    matrixStorage=staticStep.matrixStorage)
+			myModel.steps[stepName].Restart(frequency=0, numberIntervals=1, 
+			    overlay=ON, timeMarks=OFF)
+			previous=stepName
+	myModel.boundaryConditions['Disp Load of Bone X Plane'].setValuesInStep(
+	    stepName=cycleSteps[0], u1=DispLoad, amplitude='Load Cycle')
+	
+	# Field output at the peak and end of each cycle only, and the contact
+	#   force and area of each screw at every increment
+	if 'F-Output-1' in myModel.fieldOutputRequests.keys():
+		myModel.fieldOutputRequests['F-Output-1'].setValuesInStep(
+		    stepName=cycleSteps[0], numIntervals=2, 
+		    variables=('S', 'U', 'RF', 'CSTRESS', 'CDISP'))
+	for k in ('1','2'):
+		myModel.HistoryOutputRequest(name='Screw %s Contact' % k, 
+		    createStepName=cycleSteps[0], interactions=('Screw %s and Bone' % k, ), 
+		    sectionPoints=DEFAULT, variables=('CFN', 'CFS', 'CAREA'))
+
+# ================= Restart Output for Resuming a Preempted Job ============
+if restartFrequency:
+	for stepName in myModel.steps.keys():
+		if stepName!='Initial':
+			myModel.steps[stepName].Restart(frequency=int(restartFrequency), 
+			    numberIntervals=0, overlay=ON, timeMarks=OFF)
+
 # *****************************************************************************
 # Boundary Conditions
 # *****************************************************************************
-region = myAssem.sets['Bone X Plane']
-myModel.DisplacementBC(amplitude=UNSET, createStepName=
-	    'Initial', distributionType=UNIFORM, fieldName='', localCsys=None, name=
-	    'Fix Z Disp of Bone X Plane', region=region, u1=UNSET, u2=UNSET,
-	    u3=SET, ur1=UNSET, ur2=UNSET, ur3=
-	    UNSET)
-region = myAssem.sets['Bone -Y Plane']
-myModel.YsymmBC(createStepName='Initial', name='Y Symm of Bone -Y Plane', 
-	    region=region)
+if farField!='On':
+	region = myAssem.sets['Bone X Plane']
+	myModel.DisplacementBC(amplitude=UNSET, createStepName=
+		    'Initial', distributionType=UNIFORM, fieldName='', localCsys=None, name=
+		    'Fix Z Disp of Bone X Plane', region=region, u1=UNSET, u2=UNSET,
+		    u3=SET, ur1=UNSET, ur2=UNSET, ur3=
+		    UNSET)
+	region = myAssem.sets['Bone -Y Plane']
+	myModel.YsymmBC(createStepName='Initial', name='Y Symm of Bone -Y Plane', 
+		    region=region)
 region = myAssem.sets['Plate -Y Plane']
 myModel.YsymmBC(createStepName='Initial', name='Y Symm of Plate -Y Plane', 
 	    region=region)
@@ -982,23 +1749,105 @@ myModel.XsymmBC(createStepName='Initial', name='X Symm of Plate -X Plane',
     region=region)
 
 # *****************************************************************************
-# Delete Extra Parts Used in Construction
+# Reduce to a Local Submodel Around One Screw Hole (driven by a global ODB)
 # *****************************************************************************
-del myModel.parts['Bone Partition']
-del myModel.parts['Plate Partition']
-del myModel.parts['Solid Bone']
-del myModel.parts['Solid Plate']
+if submodelHole in (1,2):
+	localBlock=(nearFieldBlocks[int(submodelHole)-1],)
+	other=str(3-int(submodelHole))
+	
+	# ================= Remove Everything Outside the Hole Block ===========
+	if contactForm=='Tie':
+		del myModel.constraints['Screw %s and Bone' % other]
+	else:
+		del myModel.interactions['Screw %s and Bone' % other]
+	for name in ('Disp Load of Bone X Plane','Fix Z Disp of Bone X Plane',
+		'Y Symm of Bone -Y Plane','Y Symm of Plate -Y Plane','X Symm of Plate -X Plane'):
+		del myModel.boundaryConditions[name]
+	for name in ('Bone X Plane','Bone -Y Plane','Plate -X Plane','Plate -Y Plane'):
+		del myAssem.sets[name]
+	
+	if other=='1':
+		otherSurfaces=('Hole Interior','Screw 1 Bone Contact Area')
+	else:
+		otherSurfaces=('Hole 2 Interior','Screw 2 Bone Contact Area')
+	for name in otherSurfaces:
+		del myAssem.surfaces[name]
+	for name in BonePart.surfaces.keys():
+		if (other=='2')==name.endswith(' 2'):
+			del BonePart.surfaces[name]
+	if screwPlate=='Merged':
+		for name in PlatePart.surfaces.keys():
+			if name.startswith('Screw %s ' % other):
+				del PlatePart.surfaces[name]
+	else:
+		del myModel.constraints['Tie Screw %s to Plate' % other]
+		del PlatePart.surfaces['Int %s' % other]
+		myAssem.deleteFeatures(('Screw %s' % other,))
+	
+	BonePart.RemoveCells(cellList=farFieldCells(BonePart, localBlock))
+	PlatePart.RemoveCells(cellList=farFieldCells(PlatePart, localBlock))
+	BonePart.generateMesh()
+	PlatePart.generateMesh()
+	myAssem.regenerate()
+	
+	# ================= Drive the Cut Faces with Global Displacements ======
+	myModel.setValues(globalJob=globalOdb)
+	myModel.SubmodelBC(absoluteExteriorTolerance=0.0, createStepName=
+	    'Loads (Static, General)', dofs=(1, 2, 3), exteriorTolerance=0.05, 
+	    globalDrivingRegion='', globalIncrement=0, globalStep='1', localCsys=None, 
+	    name='Global Displacements of Bone', region=Region(faces=farFieldInterface(
+	    BoneInstance.faces, localBlock)), timeScale=OFF)
+	myModel.SubmodelBC(absoluteExteriorTolerance=0.0, createStepName=
+	    'Loads (Static, General)', dofs=(1, 2, 3), exteriorTolerance=0.05, 
+	    globalDrivingRegion='', globalIncrement=0, globalStep='1', localCsys=None, 
+	    name='Global Displacements of Plate', region=Region(faces=farFieldInterface(
+	    PlateInstance.faces, localBlock)), timeScale=OFF)
 
-myAssem.deleteFeatures(('Bone Partition Part','Plate Partition Part',
-			'Solid Bone','Solid Plate'))
+# *****************************************************************************
+# Delete Extra Parts Used in Construction
+# *****************************************************************************
+if construction!='Direct':
+	del myModel.parts['Bone Partition']
+	del myModel.parts['Plate Partition']
+	del myModel.parts['Solid Bone']
+	del myModel.parts['Solid Plate']
+	
+	myAssem.deleteFeatures(('Bone Partition Part','Plate Partition Part',
+				'Solid Bone','Solid Plate'))
+if screwPlate=='Merged':
+	del myModel.parts['Plate']
+	del myModel.parts['Screw 1']
+	del myModel.parts['Screw 2']
 
 # *****************************************************************************
 # Create Job
 # *****************************************************************************
+if inputFormat=='Flat':
+	myModel.setValues(noPartsInputFile=ON)
+
 mdb.Job(atTime=None, contactPrint=OFF, description='', echoPrint=OFF, 
     explicitPrecision=SINGLE, getMemoryFromAnalysis=True, historyPrint=OFF, 
     memory=90, memoryUnits=PERCENTAGE, model='Bone and Screw', modelPrint=
-    OFF, name='Job-1', nodalOutputPrecision=SINGLE, queue=None, scratch='', 
+    OFF, name=jobName, nodalOutputPrecision=SINGLE, queue=None, scratch=scratchDir, 
     type=ANALYSIS, userSubroutine='', waitHours=0, waitMinutes=0)
-mdb.jobs['Job-1'].setValues(numCpus=2, numDomains=2)
+mdb.jobs[jobName].setValues(numCpus=int(numCpus), numDomains=int(numCpus))
+
+if jobAction=='Write Input':
+	mdb.jobs[jobName].writeInput(consistencyChecking=OFF)
+
+# ================= Gate Submission on the Element Quality =================
+if jobAction=='Submit' and meshQuality=='On':
+	mdb.jobs[jobName].writeInput(consistencyChecking=OFF)
+	sys.path.insert(0, os.path.abspath(meshQualityDir))
+	from Bone_Screw_and_Plate_Mesh_Quality import checkInput
+	meshReport=checkInput(jobName+'.inp')
+	if not meshReport['passed']:
+		print('Mesh quality check FAILED, %s not submitted' % jobName)
+		for problem in meshReport['problems']:
+			print('  '+problem)
+		jobAction='None'
+
+if jobAction=='Submit':
+	mdb.jobs[jobName].submit(consistencyChecking=OFF)
+	mdb.jobs[jobName].waitForCompletion()
 
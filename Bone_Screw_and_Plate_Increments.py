@@ -0,0 +1,196 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code to choose the increments of the static step of a Bone and Screw
+#   variant from the increment histories of similar runs (plain Python)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     >>python Bone_Screw_and_Plate_Increments.py contactForm=Lagrange fricFact=1.5
+#       prints the increments suggested for the variant
+#     >>python Bone_Screw_and_Plate_Increments.py contactForm=Lagrange fricFact=1.5 --run
+#       runs it with them
+#
+#     From Python
+#      >>from Bone_Screw_and_Plate_Increments import *
+#      >>results=runAdaptive({'contactForm':'Coulomb'}, 'Job-Coulomb')
+#
+#     1. The runner appends the attempts of every increment (from the .sta
+#        file) of each run to its increment store
+#     2. Runs of the same design with the same matchParams are similar, and
+#        the numNeighbours nearest in log(similarityParams) within
+#        maxDistance are used
+#     3. If the similar runs took every increment without a cut back in at
+#        most easyIterations iterations, the variant is solved in one
+#        increment; without cut backs it starts at growth times the largest
+#        increment taken; with cut backs it starts at the smallest increment
+#        taken, so it does not cut back from the same start again
+#     4. Without similar runs the increments of the model script are used; a
+#        variant whose nearest similar run failed starts with the
+#        conservative increments, and a variant that fails with suggested
+#        increments is run again with them
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import os
+import sys
+import json
+from math import log
+from Bone_Screw_and_Plate_Runner import runVariant, INCREMENT_STORE, MODEL_SCRIPT
+from Bone_Screw_and_Plate_Preflight import modelValues
+
+# *****************************************************************************
+# Create a list of 'increment control' parameters
+# *****************************************************************************
+
+# Parameters that must match for runs to be similar
+matchParams=['contactForm', 'BoneStrength', 'screwPlate', 'submodelHole']
+
+# Parameters compared by the ratio of their values
+similarityParams=['DispLoad', 'fricFact', 'meshSize', 'dcort', 'dscrew', 'dplate']
+
+# Largest sum of |log(ratio)| of a similar run, and number of runs used
+maxDistance=0.5
+numNeighbours=3
+
+# Growth of the increments after runs without cut backs
+growth=2.0
+
+# Iterations per increment of a nearly linear run
+easyIterations=4
+
+# Increments after a failure
+conservative={'initialInc':0.01, 'maxInc':0.05, 'minInc':1e-8}
+
+# Directory of the runs
+workDir='runs'
+
+# *****************************************************************************
+# Define Functions to Read the Increment Store
+# *****************************************************************************
+def loadStore(path=INCREMENT_STORE):
+	records=[]
+	if path and os.path.exists(path):
+		f=open(path)
+		try:
+			for line in f:
+				if line.strip():
+					records.append(json.loads(line))
+		finally:
+			f.close()
+	return records
+
+def distance(values, other):
+	d=0.0
+	for name in similarityParams:
+		a, b=float(values[name]), float(other[name])
+		if a!=b:
+			if a<=0 or b<=0:
+				return None
+			d+=abs(log(a/b))
+	return d
+
+def similarRuns(params, modelScript, store):
+	values=modelValues(params, modelScript)
+	found=[]
+	for record in store:
+		if record['modelScript']!=os.path.basename(modelScript):
+			continue
+		other=modelValues(record['params'], modelScript)
+		if any([values[name]!=other[name] for name in matchParams]):
+			continue
+		d=distance(values, other)
+		if d is not None and d<=maxDistance:
+			found.append((d, record))
+	found.sort(key=lambda item: item[0])
+	return [record for d, record in found[:numNeighbours]]
+
+# *****************************************************************************
+# Define Function to Suggest the Increments of a Variant
+# *****************************************************************************
+def suggestIncrements(params, modelScript=MODEL_SCRIPT, store=None):
+	if store is None:
+		store=loadStore()
+	defaults=modelValues({}, modelScript)
+	runs=similarRuns(params, modelScript, store)
+	suggestion={'initialInc':defaults['initialInc'], 'maxInc':defaults['maxInc'],
+		'minInc':defaults['minInc'], 'basis':'defaults', 'similarRuns':len(runs)}
+	if not runs:
+		return suggestion
+	if not runs[0]['completed']:
+		return dict(suggestion, basis='conservative', **conservative)
+
+	# ================= Increments Taken by the Similar Runs ===============
+	initialInc=1.0
+	maxInc=1.0
+	minInc=defaults['minInc']
+	used=0
+	for record in [record for record in runs if record['completed']]:
+		steps=[inc for inc in record['increments'] if inc[0]==1]
+		taken=[inc[5] for inc in steps if not inc[3]]
+		if not taken:
+			continue
+		used+=1
+		cutbacks=len([inc for inc in steps if inc[3]])
+		iterations=max([inc[4] for inc in steps])
+		if cutbacks==0 and iterations<=easyIterations:
+			start, largest=1.0, 1.0
+		elif cutbacks==0:
+			start=largest=min(1.0, growth*max(taken))
+		else:
+			start=min(taken)
+			largest=modelValues(record['params'], modelScript)['maxInc']
+		initialInc=min(initialInc, start)
+		maxInc=min(maxInc, max(largest, start))
+		minInc=min(minInc, min(taken)/100)
+	if not used:
+		return suggestion
+	return dict(suggestion, initialInc=initialInc, maxInc=maxInc, minInc=minInc,
+		basis='history')
+
+# *****************************************************************************
+# Define Function to Run a Variant with Suggested Increments
+# *****************************************************************************
+def runAdaptive(params, jobName, modelScript=MODEL_SCRIPT, store=None):
+	suggestion=suggestIncrements(params, modelScript, store)
+	runParams=dict(params)
+	if suggestion['basis']!='defaults':
+		runParams.update([(k, suggestion[k]) for k in ('initialInc', 'maxInc', 'minInc')])
+	results=runVariant(runParams, jobName, modelScript=modelScript, workDir=workDir)
+	results['incrementBasis']=suggestion['basis']
+
+	# ================= Fall Back to Conservative Increments ===============
+	if not results['completed'] and 'rejected' not in results and \
+		suggestion['basis']!='conservative':
+		results=runVariant(dict(params, **conservative), jobName+'-Conservative',
+			modelScript=modelScript, workDir=workDir)
+		results['incrementBasis']='conservative'
+	return results
+
+# *****************************************************************************
+# Suggest or Run
+# *****************************************************************************
+if __name__=='__main__':
+	params={}
+	for arg in sys.argv[1:]:
+		if '=' in arg:
+			name, value=arg.split('=', 1)
+			try:
+				params[name]=float(value)
+			except ValueError:
+				params[name]=value
+
+	suggestion=suggestIncrements(params)
+	print('initialInc=%g maxInc=%g minInc=%g (%s, %d similar runs)' % (
+		suggestion['initialInc'], suggestion['maxInc'], suggestion['minInc'],
+		suggestion['basis'], suggestion['similarRuns']))
+
+	if '--run' in sys.argv:
+		results=runAdaptive(params, 'Job-Adaptive')
+		print('%s: completed=%s, %s increments, %s cut backs, %.1f s' % (
+			results['jobName'], results['completed'], results.get('increments'),
+			results.get('cutbacks'), results['wallTime']))
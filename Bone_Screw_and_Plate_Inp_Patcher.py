@@ -0,0 +1,211 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code to patch a written Bone and Screw input deck into variants
+#   (plain Python, no Abaqus CAE required)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     1. Write the base deck once
+#      >>abaqus cae noGUI=Bone_Screw_and_Plate_Final_Model.py -- jobAction="Write Input"
+#
+#     2. Patch it into one deck per row of a variants table (CSV)
+#      >>python Bone_Screw_and_Plate_Inp_Patcher.py Job-1.inp variants.csv decks
+#
+#     Columns of the variants table (all optional except jobName)
+#       jobName      - name of the variant deck (jobName.inp)
+#       Ecortical    - *ELASTIC modulus of 'Cortical Bone'
+#       Etrabecular  - *ELASTIC modulus of 'Trabecular Bone'
+#       Eplate       - *ELASTIC modulus of 'Pure TI Grade IV'
+#       Escrew       - *ELASTIC modulus of 'Ti-6AL-4V'
+#       DispLoad     - magnitude of 'Disp Load of Bone X Plane'
+#       contactForm  - Lagrange, Coulomb, or Rough for 'Screw 1 and Bone' and
+#                      'Screw 2 and Bone'
+#       fricFact     - friction factor of 'Lagrange Friction' and
+#                      'Coulomb Friction (Penalty)'
+#
+#     The base deck is read once into literal text and patch slots, so each
+#     variant only rewrites the affected keyword lines and is written in one
+#     buffered write.
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import os
+import sys
+from Bone_Screw_and_Plate_Runner import readTable
+
+# *****************************************************************************
+# Names used in the deck written by the model scripts
+# *****************************************************************************
+
+# Parameter patched in the *ELASTIC data line of each material
+materialParams={
+	'cortical bone':'Ecortical',
+	'trabecular bone':'Etrabecular',
+	'pure ti grade iv':'Eplate',
+	'ti-6al-4v':'Escrew'}
+
+# Interaction property of each contact formulation
+contactProperties={
+	'Lagrange':'Lagrange Friction',
+	'Coulomb':'Coulomb Friction (Penalty)',
+	'Rough':'Rough Contact'}
+
+# Frictional interaction properties patched by fricFact
+frictionProperties=['lagrange friction', 'coulomb friction (penalty)']
+
+# Boundary condition patched by DispLoad and screw-bone interactions
+dispLoadName='Disp Load of Bone X Plane'
+contactNames=['Screw 1 and Bone', 'Screw 2 and Bone']
+
+# Size of the write buffer (bytes)
+bufferSize=1<<20
+
+# *****************************************************************************
+# Define Function to Parse a Keyword Line
+# *****************************************************************************
+def parseKeyword(line):
+	# '*Material, name="Cortical Bone"' -> ('material', {'name':'cortical bone'})
+	fields=line[1:].split(',')
+	params={}
+	for field in fields[1:]:
+		if '=' in field:
+			name, value=field.split('=', 1)
+			params[name.strip().lower()]=value.strip().strip('"').lower()
+		elif field.strip():
+			params[field.strip().lower()]=None
+	return fields[0].strip().lower(), params
+
+# *****************************************************************************
+# Define Functions to Rewrite Patched Lines
+# *****************************************************************************
+def _formatValue(value):
+	if isinstance(value, float):
+		return '%.10g' % value
+	return str(value)
+
+def _replaceField(line, index, value):
+	fields=line.rstrip('\r\n').split(',')
+	fields[index]=' '+_formatValue(value) if index else _formatValue(value)
+	return ','.join(fields)+'\n'
+
+def _replaceInteraction(line, value):
+	fields=line.rstrip('\r\n').split(',')
+	for i, field in enumerate(fields):
+		if field.strip().lower().startswith('interaction'):
+			fields[i]=' interaction="%s"' % contactProperties[value]
+	return ','.join(fields)+'\n'
+
+# *****************************************************************************
+# Define Function to Read a Base Deck into a Template
+# *****************************************************************************
+def readTemplate(inpPath):
+	# The template is a list of literal text and (param, line, rewrite) slots
+	template=[]
+	literal=[]
+	block=None
+	material=None
+	interaction=None
+	surfaceInteraction=None
+	comment=''
+
+	f=open(inpPath)
+	try:
+		for line in f:
+			slot=None
+
+			if line.startswith('**'):
+				comment=line[2:].strip()
+			elif line.startswith('*'):
+				keyword, params=parseKeyword(line)
+				block=keyword
+				if comment.startswith('Interaction: '):
+					interaction=comment[len('Interaction: '):]
+				if keyword=='material':
+					material=params.get('name')
+				elif keyword=='surface interaction':
+					surfaceInteraction=params.get('name')
+				elif keyword=='contact pair' and interaction in contactNames:
+					slot=('contactForm', _replaceInteraction)
+				elif keyword=='friction' and 'rough' in params:
+					block=None
+				if keyword=='boundary' and comment.startswith('Name: '+dispLoadName+' '):
+					block='disp load'
+				comment=''
+			elif block=='elastic' and material in materialParams:
+				slot=(materialParams[material], lambda line, v: _replaceField(line, 0, v))
+				block=None
+			elif block=='disp load':
+				slot=('DispLoad', lambda line, v: _replaceField(line, 3, v))
+			elif block=='friction' and surfaceInteraction in frictionProperties:
+				slot=('fricFact', lambda line, v: _replaceField(line, 0, v))
+				block=None
+
+			if slot is None:
+				literal.append(line)
+			else:
+				template.append(''.join(literal))
+				template.append((slot[0], line, slot[1]))
+				literal=[]
+	finally:
+		f.close()
+
+	template.append(''.join(literal))
+	return template
+
+# *****************************************************************************
+# Define Function to Render a Variant from the Template
+# *****************************************************************************
+def renderVariant(template, values):
+	found=set()
+	pieces=[]
+	for piece in template:
+		if isinstance(piece, tuple):
+			param, line, rewrite=piece
+			if param in values and values[param]!='':
+				pieces.append(rewrite(line, values[param]))
+				found.add(param)
+			else:
+				pieces.append(line)
+		else:
+			pieces.append(piece)
+
+	missing=[p for p in values if p!='jobName' and values[p]!='' and p not in found]
+	if missing:
+		raise ValueError('Parameters not found in the base deck: '+', '.join(missing))
+	return ''.join(pieces)
+
+# *****************************************************************************
+# Define Function to Write Variant Decks
+# *****************************************************************************
+def writeVariants(inpPath, variants, outDir):
+	template=readTemplate(inpPath)
+	if not os.path.isdir(outDir):
+		os.makedirs(outDir)
+
+	paths=[]
+	for values in variants:
+		path=os.path.join(outDir, values['jobName']+'.inp')
+		f=open(path, 'w', buffering=bufferSize)
+		try:
+			f.write(renderVariant(template, values))
+		finally:
+			f.close()
+		paths.append(path)
+	return paths
+
+# *****************************************************************************
+# Patch Base Deck
+# *****************************************************************************
+if __name__=='__main__':
+	if len(sys.argv)!=4:
+		print('Usage: python Bone_Screw_and_Plate_Inp_Patcher.py base.inp variants.csv outDir')
+		sys.exit(1)
+
+	inpPath, variantsPath, outDir=sys.argv[1:]
+	paths=writeVariants(inpPath, readTable(variantsPath), outDir)
+	print('%d variant decks written to %s' % (len(paths), outDir))
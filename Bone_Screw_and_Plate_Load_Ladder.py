@@ -0,0 +1,87 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code to solve several DispLoad values of the Bone and Screw model in
+#   one job (plain Python, uses the runner and loadLevels of the model scripts)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     >>python Bone_Screw_and_Plate_Load_Ladder.py
+#       or, for another design
+#     >>python Bone_Screw_and_Plate_Load_Ladder.py Bone_Screw_and_Plate_New_Design.py
+#
+#     1. The model is built once and solved with one static step per value
+#        of DispLoad in loadLevels, each step starting from the displacements
+#        and contact state of the step before
+#     2. The responses of the last frame of each step are written to
+#        ladderTable, one row per DispLoad value
+#
+#     N load levels cost one CAE build and one solver start-up instead of N
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import sys
+from Bone_Screw_and_Plate_Runner import runVariant, writeTable, MODEL_SCRIPT
+
+# *****************************************************************************
+# Create a list of 'load ladder' parameters
+# *****************************************************************************
+
+# DispLoad values (mm), in the order they are applied
+loadLevels=[0.0125, 0.0227, 0.025, 0.0375, 0.05]
+
+# Fixed model parameters
+baseParams={}
+
+# Responses of each level
+responses=['stiffness', 'reactionForce', 'displacement', 'peakContactPressure',
+	'peakSlip']
+
+# Directory of the runs
+workDir='runs'
+
+# Table of the responses of each level
+ladderTable='load_ladder.csv'
+
+# *****************************************************************************
+# Define Function to Solve the Load Ladder in One Job
+# *****************************************************************************
+def loadLadder(modelScript=MODEL_SCRIPT, levels=loadLevels):
+	jobName='Ladder-'+modelScript.replace('Bone_Screw_and_Plate_', '').replace('.py', '')
+	results=runVariant(dict(baseParams, loadLevels=','.join(['%g' % v for v in levels])),
+		jobName, modelScript=modelScript, workDir=workDir)
+
+	# Completed steps only, so a ladder that stops early keeps its lower levels
+	rows=[]
+	for level, frame in zip(levels, results.get('levels', [])):
+		row=dict([(r, frame[r]) for r in responses])
+		row['DispLoad']=level
+		row['step']=frame['step']
+		rows.append(row)
+	return results, rows
+
+# *****************************************************************************
+# Run Load Ladder
+# *****************************************************************************
+if __name__=='__main__':
+	if len(sys.argv)>1:
+		modelScript=sys.argv[1]
+	else:
+		modelScript=MODEL_SCRIPT
+
+	results, rows=loadLadder(modelScript)
+	writeTable(ladderTable, rows, ['DispLoad', 'step']+responses)
+
+	print('%-10s %-22s' % ('DispLoad', 'step') + ''.join(['%-22s' % r for r in responses]))
+	for row in rows:
+		print('%-10.4g %-22s' % (row['DispLoad'], row['step']) + ''.join(
+			['%-22.4g' % row[r] for r in responses]))
+	if len(rows)<len(loadLevels):
+		print('%d of %d levels completed in %.1f s, see %s' % (len(rows),
+			len(loadLevels), results['wallTime'], results['jobDir']))
+	else:
+		print('%d levels solved in one job in %.1f s' % (len(rows), results['wallTime']))
@@ -0,0 +1,163 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code for an automated mesh convergence study of a model script
+#   (plain Python, Richardson extrapolation of meshSize refinements)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     >>python Bone_Screw_and_Plate_Mesh_Convergence.py
+#       or, for another design
+#     >>python Bone_Screw_and_Plate_Mesh_Convergence.py Bone_Screw_and_Plate_New_Design.py
+#
+#     1. The model is solved at the geometric sequence of mesh sizes
+#          meshSize = startMeshSize/refinementRatio**k
+#        numWorkers levels at a time
+#     2. After each batch the tracked responses of the three finest levels are
+#        extrapolated to zero mesh size (Richardson)
+#     3. The study stops once the relative change between the two finest
+#        levels is below tolerance for all tracked responses
+#     4. The coarsest mesh size within tolerance of the extrapolated values is
+#        recommended, and cost against accuracy of each level is written to
+#        convergenceTable
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import sys
+from math import log
+from Bone_Screw_and_Plate_Runner import runVariants, writeTable, MODEL_SCRIPT
+
+# *****************************************************************************
+# Create a list of 'convergence study' parameters
+# *****************************************************************************
+
+# Coarsest mesh size and refinement ratio between levels
+startMeshSize=1.3
+refinementRatio=1.5
+
+# Maximum number of refinement levels
+maxLevels=7
+
+# Relative change at which the mesh is considered converged
+tolerance=0.02
+
+# Responses tracked
+responses=['stiffness', 'peakContactPressure']
+
+# Fixed model parameters for all levels
+baseParams={}
+
+# Number of levels solved at the same time
+numWorkers=3
+
+# *****************************************************************************
+# Define Function for Richardson Extrapolation of Three Levels
+# *****************************************************************************
+def richardson(fFine, fMedium, fCoarse, ratio):
+	# Returns the extrapolated value and observed order of convergence, or the
+	# finest value and None if the three levels do not converge monotonically
+	if fFine==fMedium or fMedium==fCoarse:
+		return fFine, None
+	ratioOfChanges=(fCoarse-fMedium)/(fMedium-fFine)
+	if ratioOfChanges<=1:
+		return fFine, None
+	order=log(ratioOfChanges)/log(ratio)
+	return fFine+(fFine-fMedium)/(ratio**order-1), order
+
+# *****************************************************************************
+# Define Function for Relative Change
+# *****************************************************************************
+def relativeChange(a, b):
+	if b==0:
+		return abs(a-b)
+	return abs(a-b)/abs(b)
+
+# *****************************************************************************
+# Define Function to Run the Convergence Study
+# *****************************************************************************
+def convergenceStudy(modelScript=MODEL_SCRIPT):
+	jobPrefix='Conv-'+modelScript.replace('Bone_Screw_and_Plate_', '').replace('.py', '')
+	levels=[]
+	converged=False
+
+	while not converged and len(levels)<maxLevels:
+		# ============= Solve the Next Batch of Levels in Parallel =========
+		first=len(levels)
+		sizes=[startMeshSize/refinementRatio**k
+			for k in range(first, min(first+numWorkers, maxLevels))]
+		paramList=[dict(baseParams, meshSize=size) for size in sizes]
+		rows=runVariants(paramList, jobPrefix='%s-L%d' % (jobPrefix, first),
+			numWorkers=numWorkers, modelScript=modelScript)
+
+		for row in rows:
+			if not row['completed']:
+				print('Level meshSize=%.4g did not complete, stopping' % row['meshSize'])
+				converged=None
+				break
+			levels.append(row)
+		if converged is None:
+			break
+
+		# ============= Check Change Between the Two Finest Levels =========
+		if len(levels)>=2:
+			converged=all([relativeChange(levels[-1][r], levels[-2][r])<tolerance
+				for r in responses])
+
+	# ================= Extrapolate and Recommend Mesh Size ================
+	extrapolated={}
+	for r in responses:
+		if len(levels)>=3:
+			extrapolated[r], order=richardson(levels[-1][r], levels[-2][r],
+				levels[-3][r], refinementRatio)
+		elif levels:
+			extrapolated[r], order=levels[-1][r], None
+		else:
+			extrapolated[r], order=None, None
+		extrapolated[r+'Order']=order
+
+	recommended=None
+	for row in levels:
+		for r in responses:
+			row[r+'Error']=relativeChange(row[r], extrapolated[r])
+		if recommended is None and all([row[r+'Error']<tolerance for r in responses]):
+			recommended=row['meshSize']
+
+	return levels, extrapolated, recommended, bool(converged)
+
+# *****************************************************************************
+# Run Convergence Study
+# *****************************************************************************
+if __name__=='__main__':
+	if len(sys.argv)>1:
+		modelScript=sys.argv[1]
+	else:
+		modelScript=MODEL_SCRIPT
+
+	levels, extrapolated, recommended, converged=convergenceStudy(modelScript)
+
+	columns=['meshSize', 'wallTime']
+	for r in responses:
+		columns+=[r, r+'Error']
+	convergenceTable=modelScript.replace('.py', '_convergence.csv')
+	writeTable(convergenceTable, levels, columns)
+
+	print('%-10s %-10s' % ('meshSize', 'wallTime') + ''.join(
+		['%-22s' % (r+' error') for r in responses]))
+	for row in levels:
+		print('%-10.4g %-10.1f' % (row['meshSize'], row['wallTime']) + ''.join(
+			['%-22.3g' % row[r+'Error'] for r in responses]))
+	for r in responses:
+		if extrapolated[r] is not None:
+			print('Extrapolated %s: %.6g (observed order %s)' % (r,
+				extrapolated[r], extrapolated[r+'Order']))
+
+	if not converged:
+		print('Not converged within %d levels' % len(levels))
+	if recommended is None:
+		print('No level within %g of the extrapolated values' % tolerance)
+	else:
+		print('Recommended meshSize=%.4g' % recommended)
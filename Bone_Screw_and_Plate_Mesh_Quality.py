@@ -0,0 +1,330 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code to check the element quality of a Bone and Screw input deck
+#   (plain Python with NumPy, also runs in the Abaqus Python interpreter)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     >>python Bone_Screw_and_Plate_Mesh_Quality.py Job-1.inp
+#
+#     With meshQuality=On the model scripts write the deck, check it with
+#     checkInput and submit the job only if it passes (the report is written
+#     next to the deck as Job-1_mesh_quality.json)
+#
+#     1. The nodes and elements of every part (or of the flat deck) are read
+#        and the hex (C3D8*, C3D20*) and tet (C3D4*, C3D10*) elements are
+#        checked on their corner nodes, all elements of a type at once
+#     2. Metrics of each element
+#          scaledJacobian - smallest determinant of the unit edge vectors at a
+#                           corner (1 for a cube or a regular tet, <=0 for an
+#                           inverted corner)
+#          aspectRatio    - longest over shortest edge
+#          skew           - equiangle skew of the face corner angles (0 for
+#                           square or equilateral faces, 1 for a degenerate
+#                           face)
+#          minAngle       - smallest face corner angle (degrees)
+#          maxAngle       - largest face corner angle (degrees)
+#     3. Elements outside the limits are counted per region (part and section
+#        material), histograms of each metric are reported per region, and
+#        the deck fails when more than maxBadFraction of the elements of any
+#        region are outside the limits
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import os
+import sys
+import json
+import numpy as np
+
+# *****************************************************************************
+# Create a list of 'mesh quality' parameters
+# *****************************************************************************
+
+# Limits of each metric (lower, upper; None for no limit)
+limits={
+	'scaledJacobian':(0.2, None),
+	'aspectRatio':(None, 10.0),
+	'skew':(None, 0.85),
+	'minAngle':(10.0, None),
+	'maxAngle':(None, 170.0)}
+
+# Fraction of elements of a region allowed outside the limits
+maxBadFraction=0.0
+
+# Bin edges of the histograms of each metric
+bins={
+	'scaledJacobian':[-1.0, 0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
+	'aspectRatio':[1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 1e30],
+	'skew':[0.0, 0.25, 0.5, 0.75, 0.85, 0.95, 1.0],
+	'minAngle':[0.0, 10.0, 20.0, 30.0, 45.0, 60.0, 90.0],
+	'maxAngle':[90.0, 120.0, 135.0, 150.0, 170.0, 180.0]}
+
+metricNames=['scaledJacobian', 'aspectRatio', 'skew', 'minAngle', 'maxAngle']
+
+# *****************************************************************************
+# Corner topology of the checked element shapes (Abaqus node order)
+# *****************************************************************************
+
+# Shape of each checked element type (corner nodes come first)
+elementShapes={
+	'C3D8':'Hex', 'C3D8R':'Hex', 'C3D8I':'Hex', 'C3D8H':'Hex', 'C3D8RH':'Hex',
+	'C3D8IH':'Hex', 'C3D20':'Hex', 'C3D20R':'Hex', 'C3D20H':'Hex',
+	'C3D20RH':'Hex', 'C3D4':'Tet', 'C3D4H':'Tet', 'C3D10':'Tet',
+	'C3D10M':'Tet', 'C3D10H':'Tet', 'C3D10MH':'Tet'}
+
+shapes={
+	'Hex':{
+		# Corner and its three neighbours (right-handed for a valid element)
+		'corners':[(0,1,3,4), (1,2,0,5), (2,3,1,6), (3,0,2,7),
+			(4,7,5,0), (5,4,6,1), (6,5,7,2), (7,6,4,3)],
+		'edges':[(0,1), (1,2), (2,3), (3,0), (4,5), (5,6), (6,7), (7,4),
+			(0,4), (1,5), (2,6), (3,7)],
+		'faces':[(0,1,2,3), (4,7,6,5), (0,4,5,1), (1,5,6,2), (2,6,7,3),
+			(3,7,4,0)],
+		'jacobianScale':1.0, 'idealAngle':90.0},
+	'Tet':{
+		'corners':[(0,1,2,3), (1,0,3,2), (2,0,1,3), (3,0,2,1)],
+		'edges':[(0,1), (1,2), (2,0), (0,3), (1,3), (2,3)],
+		'faces':[(0,1,2), (0,3,1), (1,3,2), (2,3,0)],
+		'jacobianScale':np.sqrt(2.0), 'idealAngle':60.0}}
+
+# *****************************************************************************
+# Define Functions to Read the Mesh of an Input Deck
+# *****************************************************************************
+def _keyword(line):
+	fields=line[1:].split(',')
+	params={}
+	for field in fields[1:]:
+		if '=' in field:
+			k, v=field.split('=', 1)
+			params[k.strip().lower()]=v.strip().strip('"')
+		elif field.strip():
+			params[field.strip().lower()]=None
+	return fields[0].strip().lower(), params
+
+def _labels(data, generate):
+	labels=[]
+	for line in data:
+		values=[int(v) for v in line.split(',') if v.strip()]
+		if generate:
+			labels+=range(values[0], values[1]+1, values[2] if len(values)>2 else 1)
+		else:
+			labels+=values
+	return labels
+
+def readMesh(inpPath):
+	# Nodes, elements (by type), element sets and section materials of each
+	# part or instance with its own mesh ('Model' for a flat deck)
+	blocks=[]
+	f=open(inpPath)
+	try:
+		for line in f:
+			line=line.strip()
+			if line.startswith('**') or not line:
+				continue
+			if line.startswith('*'):
+				blocks.append([_keyword(line), []])
+			elif blocks:
+				# Long element definitions continue on the next line
+				if blocks[-1][0][0]=='element' and blocks[-1][1] and blocks[-1][1][-1].endswith(','):
+					blocks[-1][1][-1]+=line
+				else:
+					blocks[-1][1].append(line)
+	finally:
+		f.close()
+
+	meshes={}
+	owner='Model'
+	for (keyword, params), data in blocks:
+		if keyword in ('part', 'instance'):
+			owner=params['name']
+			continue
+		elif keyword in ('end part', 'end instance'):
+			owner='Model'
+			continue
+		elif keyword in ('assembly', 'end assembly', 'step'):
+			owner=None
+			continue
+		if owner is None:
+			continue
+
+		mesh=meshes.setdefault(owner, {'nodes':{}, 'elements':{}, 'elsets':{},
+			'sections':[]})
+		if keyword=='node':
+			for line in data:
+				values=line.split(',')
+				mesh['nodes'][int(values[0])]=[float(v) for v in values[1:4]]
+		elif keyword=='element':
+			elType=params['type'].upper()
+			rows=[[int(v) for v in line.split(',') if v.strip()] for line in data]
+			mesh['elements'].setdefault(elType, []).extend(rows)
+			if 'elset' in params:
+				mesh['elsets'].setdefault(params['elset'].lower(), []).extend(
+					[row[0] for row in rows])
+		elif keyword=='elset' and 'instance' not in params:
+			mesh['elsets'].setdefault(params['elset'].lower(), []).extend(
+				_labels(data, 'generate' in params))
+		elif keyword=='solid section':
+			mesh['sections'].append((params['elset'].lower(), params['material']))
+	return dict([(k, v) for k, v in meshes.items() if v['elements']])
+
+# *****************************************************************************
+# Define Function for the Quality Metrics of Many Elements at Once
+# *****************************************************************************
+def _unit(v):
+	length=np.sqrt(np.sum(v*v, axis=-1))
+	return v/np.maximum(length, 1e-300)[..., None]
+
+def elementMetrics(X, shape):
+	# X - corner coordinates of all elements of one shape (elements, corners, 3)
+	topology=shapes[shape]
+
+	# ================= Scaled Jacobian at Every Corner ====================
+	c=np.array(topology['corners'])
+	E1=_unit(X[:, c[:,1]]-X[:, c[:,0]])
+	E2=_unit(X[:, c[:,2]]-X[:, c[:,0]])
+	E3=_unit(X[:, c[:,3]]-X[:, c[:,0]])
+	det=np.sum(E1*np.cross(E2, E3), axis=-1)
+	scaledJacobian=np.clip(topology['jacobianScale']*det.min(axis=1), -1.0, 1.0)
+
+	# ================= Edge Length Ratio ==================================
+	e=np.array(topology['edges'])
+	length=np.sqrt(np.sum((X[:, e[:,1]]-X[:, e[:,0]])**2, axis=-1))
+	aspectRatio=length.max(axis=1)/np.maximum(length.min(axis=1), 1e-300)
+
+	# ================= Face Corner Angles and Equiangle Skew ==============
+	faces=np.array(topology['faces'])
+	prev=np.roll(faces, 1, axis=1)
+	nxt=np.roll(faces, -1, axis=1)
+	A=_unit(X[:, prev]-X[:, faces])
+	B=_unit(X[:, nxt]-X[:, faces])
+	angles=np.degrees(np.arccos(np.clip(np.sum(A*B, axis=-1), -1.0, 1.0)))
+	angles=angles.reshape(len(X), -1)
+	minAngle=angles.min(axis=1)
+	maxAngle=angles.max(axis=1)
+	ideal=topology['idealAngle']
+	skew=np.maximum((maxAngle-ideal)/(180.0-ideal), (ideal-minAngle)/ideal)
+
+	return {'scaledJacobian':scaledJacobian, 'aspectRatio':aspectRatio,
+		'skew':skew, 'minAngle':minAngle, 'maxAngle':maxAngle}
+
+# *****************************************************************************
+# Define Function to Check the Mesh of Each Region
+# *****************************************************************************
+def meshQuality(meshes):
+	report={'regions':{}, 'unchecked':{}}
+	for owner in sorted(meshes):
+		mesh=meshes[owner]
+		labels=np.array(sorted(mesh['nodes']))
+		coords=np.array([mesh['nodes'][k] for k in labels])
+
+		# Region (section material) of each element label
+		material={}
+		for elset, name in mesh['sections']:
+			for label in mesh['elsets'].get(elset, []):
+				material[label]=name
+
+		for elType in sorted(mesh['elements']):
+			rows=mesh['elements'][elType]
+			shape=elementShapes.get(elType)
+			if shape is None:
+				report['unchecked'][elType]=report['unchecked'].get(elType, 0)+len(rows)
+				continue
+			numCorners=len(shapes[shape]['corners'])
+			conn=np.array([row[1:numCorners+1] for row in rows])
+			X=coords[np.searchsorted(labels, conn)]
+			metrics=elementMetrics(X, shape)
+
+			regionNames=np.array(['%s (%s)' % (owner, material[row[0]])
+				if row[0] in material else owner for row in rows])
+			for region in np.unique(regionNames):
+				mask=regionNames==region
+				_addRegion(report['regions'], region, shape,
+					dict([(m, metrics[m][mask]) for m in metricNames]))
+
+	# ================= Limits and Histograms of Each Region ===============
+	report['passed']=True
+	report['problems']=[]
+	for region, values in sorted(report['regions'].items()):
+		bad=np.zeros(len(values['scaledJacobian']), bool)
+		summary={'elements':len(bad), 'shapes':values['shapes']}
+		for m in metricNames:
+			lower, upper=limits[m]
+			outside=np.zeros(len(bad), bool)
+			if lower is not None:
+				outside|=values[m]<lower
+			if upper is not None:
+				outside|=values[m]>upper
+			bad|=outside
+			summary[m]={'min':float(values[m].min()), 'max':float(values[m].max()),
+				'mean':float(values[m].mean()), 'outside':int(outside.sum()),
+				'histogram':np.histogram(np.clip(values[m], bins[m][0], bins[m][-1]),
+					bins[m])[0].tolist()}
+		summary['bad']=int(bad.sum())
+		if summary['bad']>maxBadFraction*summary['elements']:
+			report['passed']=False
+			report['problems'].append('%s: %d of %d elements outside the limits '
+				'(worst scaled Jacobian %.3g, aspect ratio %.3g, skew %.3g)' % (region,
+				summary['bad'], summary['elements'], summary['scaledJacobian']['min'],
+				summary['aspectRatio']['max'], summary['skew']['max']))
+		report['regions'][region]=summary
+	report['limits']=limits
+	report['bins']=bins
+	return report
+
+def _addRegion(regions, region, shape, values):
+	if region not in regions:
+		regions[region]=dict(values, shapes=[shape])
+		return
+	for m in metricNames:
+		regions[region][m]=np.concatenate([regions[region][m], values[m]])
+	if shape not in regions[region]['shapes']:
+		regions[region]['shapes'].append(shape)
+
+# *****************************************************************************
+# Define Function to Check an Input Deck and Write the Report
+# *****************************************************************************
+def checkInput(inpPath, reportPath=None):
+	# Returns the report ('passed' and the 'problems' of each failed region)
+	report=meshQuality(readMesh(inpPath))
+	if reportPath is None:
+		reportPath=os.path.splitext(inpPath)[0]+'_mesh_quality.json'
+	f=open(reportPath, 'w')
+	try:
+		json.dump(report, f, indent=1, sort_keys=True)
+	finally:
+		f.close()
+	return report
+
+def printReport(report):
+	for region, summary in sorted(report['regions'].items()):
+		print('%s: %d %s elements, %d outside the limits' % (region,
+			summary['elements'], '/'.join(summary['shapes']), summary['bad']))
+		for m in metricNames:
+			edges=bins[m]
+			counts=summary[m]['histogram']
+			print('  %-15s %8.3g to %-8.3g ' % (m, summary[m]['min'], summary[m]['max'])
+				+' '.join(['[%g,%g):%d' % (edges[i], edges[i+1], counts[i])
+				for i in range(len(counts)) if counts[i]]))
+	for elType, count in sorted(report['unchecked'].items()):
+		print('%d %s elements not checked' % (count, elType))
+
+# *****************************************************************************
+# Check Input Deck
+# *****************************************************************************
+if __name__=='__main__':
+	inpPath=sys.argv[1]
+	report=checkInput(inpPath)
+	printReport(report)
+
+	if not report['passed']:
+		print('Mesh quality check FAILED')
+		for problem in report['problems']:
+			print('  '+problem)
+		sys.exit(1)
+	print('Mesh quality check passed')
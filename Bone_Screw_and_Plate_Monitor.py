@@ -0,0 +1,267 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code to monitor the convergence of running Bone and Screw jobs
+#   (plain Python, tails the .sta and .msg files of every job directory)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     >>python Bone_Screw_and_Plate_Monitor.py runs
+#       writes one JSON line of metrics per job whenever it changes
+#     >>python Bone_Screw_and_Plate_Monitor.py runs --port=8765
+#       also serves the metrics of all jobs at http://localhost:8765/ and of
+#       the stalled jobs at http://localhost:8765/stalled
+#     >>python Bone_Screw_and_Plate_Monitor.py runs --kill-stalled
+#       also terminates stalled jobs (abaqus terminate)
+#
+#     From Python (e.g. a scheduler)
+#      >>from Bone_Screw_and_Plate_Monitor import *
+#      >>jobs={}
+#      >>pollJobs('runs', jobs)
+#      >>stalled=[m for m in jobs.values() if m['stalled']]
+#
+#     1. Only the bytes appended to the .sta and .msg files since the last
+#        poll are read, so long jobs cost the same to poll as short ones
+#     2. Metrics of each job
+#          increments, attempts, cutbacks  - from the rows of the .sta file
+#          iterations                      - equilibrium iterations (.sta)
+#          currentIterations               - iterations of the increment in
+#                                            progress (.msg)
+#          contactChanges                  - contact points changing status
+#                                            (.msg)
+#          step, stepFraction              - step in progress and fraction
+#                                            of its time period completed
+#                                            (from the step time, so it
+#                                            restarts with each step of a
+#                                            load ladder, cycles or restart)
+#          lastIncrementWallTime,
+#          meanIncrementWallTime           - seen between accepted increments
+#     3. A running job (with a .lck file) is stalled when its files have not
+#        grown for stallSeconds, when no increment has been accepted for
+#        maxIncrementSeconds, or when the increment in progress has taken
+#        more than maxIterations iterations
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import os
+import re
+import sys
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from Bone_Screw_and_Plate_Runner import callAbaqus, STATUS_ROW, statusAttempt, \
+	statusStepTime, COMPLETED_MESSAGE
+
+# *****************************************************************************
+# Create a list of 'monitor' parameters
+# *****************************************************************************
+
+# Seconds between polls of the job directories
+interval=5.0
+
+# Limits of a stalled job (seconds without file growth, seconds without an
+#   accepted increment, iterations of the increment in progress)
+stallSeconds=600.0
+maxIncrementSeconds=1800.0
+maxIterations=50
+
+# Time period of the static steps of the model scripts
+stepPeriod=1.0
+
+# Lines of the .msg file counted for each metric
+msgPatterns={
+	'iteration':re.compile(r'EQUILIBRIUM ITERATION\s+\d+|SEVERE DISCONTINUITY ITERATION\s+\d+'),
+	'contactChanges':re.compile(r'(\d+)\s+POINTS CHANGED FROM'),
+	'incrementDone':re.compile(r'INCREMENT\s+\d+\s+SUMMARY')}
+
+# *****************************************************************************
+# Define Functions to Read What Was Appended to a File
+# *****************************************************************************
+def newLines(state, path, key):
+	# Complete lines appended to path since the last call
+	if not os.path.exists(path):
+		return []
+	size=os.path.getsize(path)
+	offset, partial=state.get(key, (0, b''))
+	if size<=offset:
+		return []
+	f=open(path, 'rb')
+	try:
+		f.seek(offset)
+		data=partial+f.read(size-offset)
+	finally:
+		f.close()
+	lines=data.split(b'\n')
+	state[key]=(size, lines[-1])
+	state['lastActivity']=time.time()
+	return [line.decode('latin-1') for line in lines[:-1]]
+
+# *****************************************************************************
+# Define Function to Update the Metrics of One Job
+# *****************************************************************************
+def newMetrics(jobDir, jobName):
+	now=time.time()
+	return {'jobName':jobName, 'jobDir':jobDir, 'running':False,
+		'completed':False, 'increments':0, 'attempts':0, 'cutbacks':0,
+		'iterations':0, 'currentIterations':0, 'contactChanges':0,
+		'step':None, 'stepFraction':0.0, 'lastIncrementWallTime':None,
+		'meanIncrementWallTime':None, 'stalled':False, 'stallReason':'',
+		'_state':{'lastActivity':now, 'lastIncrement':now, 'incrementTimes':[]}}
+
+def updateJob(metrics):
+	state=metrics['_state']
+	base=os.path.join(metrics['jobDir'], metrics['jobName'])
+	before=dict([(k, v) for k, v in metrics.items() if k!='_state'])
+	now=time.time()
+
+	# ================= Rows of the Status File ============================
+	for line in newLines(state, base+'.sta', 'sta'):
+		if COMPLETED_MESSAGE in line:
+			metrics['completed']=True
+		match=STATUS_ROW.match(line)
+		if not match:
+			continue
+		step, inc, attempt, cutback, iterations, size=statusAttempt(match)
+		if step!=metrics['step']:
+			metrics['step']=step
+			metrics['stepFraction']=0.0
+		metrics['attempts']+=1
+		metrics['iterations']+=iterations
+		metrics['currentIterations']=0
+		if cutback:
+			metrics['cutbacks']+=1
+			continue
+		metrics['increments']+=1
+		metrics['stepFraction']=min(1.0, statusStepTime(match)/stepPeriod)
+		state['incrementTimes'].append(now-state['lastIncrement'])
+		state['lastIncrement']=now
+		metrics['lastIncrementWallTime']=state['incrementTimes'][-1]
+		metrics['meanIncrementWallTime']=sum(state['incrementTimes'])/len(
+			state['incrementTimes'])
+
+	# ================= Iterations and Contact Changes in the Message File =
+	for line in newLines(state, base+'.msg', 'msg'):
+		if msgPatterns['iteration'].search(line):
+			metrics['currentIterations']+=1
+		match=msgPatterns['contactChanges'].search(line)
+		if match:
+			metrics['contactChanges']+=int(match.group(1))
+		if msgPatterns['incrementDone'].search(line):
+			metrics['currentIterations']=0
+
+	# ================= Stalled Running Jobs ===============================
+	metrics['running']=os.path.exists(base+'.lck') and not metrics['completed']
+	reasons=[]
+	if metrics['running']:
+		if now-state['lastActivity']>stallSeconds:
+			reasons.append('no output for %g s' % stallSeconds)
+		if now-state['lastIncrement']>maxIncrementSeconds:
+			reasons.append('no increment for %g s' % maxIncrementSeconds)
+		if metrics['currentIterations']>maxIterations:
+			reasons.append('more than %d iterations in the increment' % maxIterations)
+	metrics['stalled']=bool(reasons)
+	metrics['stallReason']='; '.join(reasons)
+
+	after=dict([(k, v) for k, v in metrics.items() if k!='_state'])
+	return after!=before
+
+# *****************************************************************************
+# Define Function to Poll All Jobs of a Work Directory
+# *****************************************************************************
+def pollJobs(workDir, jobs):
+	# Updates jobs (keyed by status file path) and returns the changed ones
+	changed=[]
+	for jobDir in sorted(os.listdir(workDir)):
+		jobDir=os.path.join(workDir, jobDir)
+		if not os.path.isdir(jobDir):
+			continue
+		for name in os.listdir(jobDir):
+			if not name.endswith('.sta'):
+				continue
+			key=os.path.join(jobDir, name)
+			if key not in jobs or os.path.getsize(key)<jobs[key]['_state'].get('sta', (0,))[0]:
+				# New job, or the job was resubmitted in the same directory
+				jobs[key]=newMetrics(jobDir, name[:-4])
+			if updateJob(jobs[key]):
+				changed.append(jobs[key])
+	return changed
+
+def publicMetrics(metrics):
+	return dict([(k, v) for k, v in metrics.items() if k!='_state'])
+
+# *****************************************************************************
+# Define Function to Terminate a Stalled Job
+# *****************************************************************************
+def terminateJob(metrics):
+	return callAbaqus(['terminate', 'job='+metrics['jobName']], metrics['jobDir'],
+		'monitor.log')
+
+# *****************************************************************************
+# Define Function to Serve the Metrics over HTTP
+# *****************************************************************************
+def serveMetrics(jobs, port):
+	lock=threading.Lock()
+
+	class MetricsHandler(BaseHTTPRequestHandler):
+		def do_GET(self):
+			lock.acquire()
+			try:
+				rows=[publicMetrics(m) for m in jobs.values()]
+			finally:
+				lock.release()
+			if self.path.rstrip('/')=='/stalled':
+				rows=[row for row in rows if row['stalled']]
+			elif self.path not in ('/', ''):
+				self.send_error(404)
+				return
+			body=json.dumps(rows, sort_keys=True).encode('utf-8')
+			self.send_response(200)
+			self.send_header('Content-Type', 'application/json')
+			self.send_header('Content-Length', str(len(body)))
+			self.end_headers()
+			self.wfile.write(body)
+
+		def log_message(self, *args):
+			pass
+
+	server=ThreadingHTTPServer(('localhost', port), MetricsHandler)
+	thread=threading.Thread(target=server.serve_forever)
+	thread.daemon=True
+	thread.start()
+	return server, lock
+
+# *****************************************************************************
+# Run Monitor
+# *****************************************************************************
+if __name__=='__main__':
+	workDir=sys.argv[1] if len(sys.argv)>1 and not sys.argv[1].startswith('--') else 'runs'
+	port=None
+	for arg in sys.argv[1:]:
+		if arg.startswith('--port='):
+			port=int(arg.split('=', 1)[1])
+	killStalled='--kill-stalled' in sys.argv
+
+	jobs={}
+	lock=threading.Lock()
+	if port is not None:
+		server, lock=serveMetrics(jobs, port)
+
+	terminated=set()
+	while True:
+		lock.acquire()
+		try:
+			changed=pollJobs(workDir, jobs)
+		finally:
+			lock.release()
+		for metrics in changed:
+			sys.stdout.write(json.dumps(publicMetrics(metrics), sort_keys=True)+'\n')
+			if killStalled and metrics['stalled'] and metrics['jobDir'] not in terminated:
+				terminateJob(metrics)
+				terminated.add(metrics['jobDir'])
+		sys.stdout.flush()
+		time.sleep(interval)
@@ -0,0 +1,276 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code for Monte Carlo propagation of patient variability
+#   (plain Python with NumPy, uses the Bone and Screw model for training)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     >>python Bone_Screw_and_Plate_Monte_Carlo.py
+#
+#     1. Training runs of the FE model are read from trainingTable or, if the
+#        table does not exist, run with the runner and written to it
+#     2. A quadratic response surface in the logarithm of the patient
+#        parameters is fitted to the training runs, to the logarithm of the
+#        response unless a response is zero or negative (e.g. peakSlip with
+#        'Rough' contact), which is fitted on a linear scale
+#     3. Correlated patient samples are pushed through the response surface in
+#        vectorized batches (crude Monte Carlo and importance sampling)
+#     4. A small validation subset is run directly with the FE model
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import os
+import numpy as np
+from statistics import NormalDist
+from Bone_Screw_and_Plate_Runner import runVariants, writeTable, readTable
+
+# *****************************************************************************
+# Create a list of 'patient distribution' parameters
+# *****************************************************************************
+
+# Patient parameters (lognormal, median and coefficient of variation)
+paramNames=['Ecortical', 'Etrabecular', 'dcort', 'dbone']
+medians=np.array([12e3, 1.1e3, 0.75, 12.0])
+coefVars=np.array([0.35, 0.60, 0.25, 0.10])
+
+# Correlation of the logarithm of the patient parameters
+correlation=np.array([
+	[1.0, 0.6, 0.3, 0.1],
+	[0.6, 1.0, 0.2, 0.1],
+	[0.3, 0.2, 1.0, 0.3],
+	[0.1, 0.1, 0.3, 1.0]])
+
+# *****************************************************************************
+# Create a list of 'failure' parameters
+# *****************************************************************************
+
+# Response used for failure (stiffness, peakContactPressure, or peakSlip)
+failureResponse='peakContactPressure'
+
+# Failure when the response is Above or Below the limit
+failureWhen='Above'
+
+# Failure limit (N/mm^2 for peakContactPressure)
+failureLimit=130.0
+
+# Scale of the fitted response (Log, Linear, or Auto: Log when every training
+#   response is positive, otherwise Linear)
+responseScale='Auto'
+
+# *****************************************************************************
+# Create a list of 'simulation' parameters
+# *****************************************************************************
+
+# Model script and fixed model parameters for FE runs
+modelScript='Bone_Screw_and_Plate_Final_Model.py'
+baseParams={'contactForm':'Rough'}
+
+# Number of FE training runs and validation runs
+numTraining=30
+numValidation=5
+
+# Number of Monte Carlo samples and vectorized batch size
+numSamples=10000000
+batchSize=1000000
+
+# Number of pilot samples used to locate the failure region
+numPilot=100000
+
+# Number of FE runs solved at the same time
+numWorkers=2
+
+# Tables of FE runs
+trainingTable='monte_carlo_training.csv'
+validationTable='monte_carlo_validation.csv'
+
+# Random seed
+seed=2012
+
+# *****************************************************************************
+# Lognormal parameters and correlation factor
+# *****************************************************************************
+logMedians=np.log(medians)
+logStds=np.sqrt(np.log(1+coefVars**2))
+choleskyFactor=np.linalg.cholesky(correlation)
+
+# *****************************************************************************
+# Define Function to Map Independent Standard Normals to Patient Samples
+# *****************************************************************************
+def patientSamples(z):
+	return np.exp(logMedians+logStds*z.dot(choleskyFactor.T))
+
+# *****************************************************************************
+# Define Functions for the Quadratic Response Surface
+# *****************************************************************************
+def responseFeatures(x):
+	u=(np.log(x)-logMedians)/logStds
+	n=u.shape[1]
+	columns=[np.ones(len(u))]+[u[:,i] for i in range(n)]
+	columns+=[u[:,i]*u[:,j] for i in range(n) for j in range(i,n)]
+	return np.column_stack(columns)
+
+def fitResponseModel(x, y):
+	if not np.all(np.isfinite(y)):
+		raise ValueError('%s is not finite in every training run' % failureResponse)
+	logScale=responseScale=='Log' or (responseScale=='Auto' and np.all(y>0))
+	if logScale and not np.all(y>0):
+		raise ValueError('responseScale=Log needs %s>0 in every training run '
+			'(use Linear or Auto)' % failureResponse)
+	target=np.log(y) if logScale else y
+	coeffs=np.linalg.lstsq(responseFeatures(x), target, rcond=None)[0]
+	return {'coeffs':coeffs, 'logScale':logScale}
+
+def predictResponse(model, x):
+	y=responseFeatures(x).dot(model['coeffs'])
+	if model['logScale']:
+		return np.exp(y)
+	return y
+
+def relativeErrors(predicted, y):
+	# Relative to each response, or to the largest one where it is zero
+	scale=np.where(y!=0, np.abs(y), max(np.abs(y).max(), 1e-30))
+	return (predicted-y)/scale
+
+# *****************************************************************************
+# Define Function for the Failure Indicator
+# *****************************************************************************
+def failed(y):
+	if failureWhen=='Above':
+		return y>failureLimit
+	return y<failureLimit
+
+# *****************************************************************************
+# Define Function for Confidence Interval of a Mean (95%)
+# *****************************************************************************
+def confidenceInterval(total, totalSq, count):
+	mean=total/count
+	std=np.sqrt(max(totalSq/count-mean**2, 0.0))
+	half=1.96*std/np.sqrt(count)
+	return mean, max(mean-half, 0.0), mean+half
+
+# *****************************************************************************
+# Define Function for Crude Monte Carlo
+# *****************************************************************************
+def crudeMonteCarlo(model, rng):
+	numFailed=0
+	count=0
+	while count<numSamples:
+		n=min(batchSize, numSamples-count)
+		z=rng.standard_normal((n, len(paramNames)))
+		numFailed+=np.count_nonzero(failed(predictResponse(model, patientSamples(z))))
+		count+=n
+
+	if numFailed==0:
+		return 0.0, 0.0, 3.0/count
+	return confidenceInterval(float(numFailed), float(numFailed), count)
+
+# *****************************************************************************
+# Define Function to Locate the Most Likely Failure Point
+# *****************************************************************************
+def designPoint(model, rng):
+	# ================= Inflated Pilot Samples Reach the Tails =============
+	z=3.0*rng.standard_normal((numPilot, len(paramNames)))
+	y=predictResponse(model, patientSamples(z))
+	fail=failed(y)
+
+	if np.any(fail):
+		zFail=z[fail]
+		return zFail[np.argmin(np.sum(zFail**2, axis=1))]
+
+	# ================= Closest Approach to the Limit ======================
+	if model['logScale']:
+		return z[np.argmin(np.abs(np.log(y/failureLimit)))]
+	return z[np.argmin(np.abs(y-failureLimit))]
+
+# *****************************************************************************
+# Define Function for Importance Sampling (shifted mean)
+# *****************************************************************************
+def importanceSampling(model, rng):
+	zStar=designPoint(model, rng)
+
+	total=0.0
+	totalSq=0.0
+	count=0
+	while count<numSamples:
+		n=min(batchSize, numSamples-count)
+		z=zStar+rng.standard_normal((n, len(paramNames)))
+		weights=np.exp(-z.dot(zStar)+0.5*zStar.dot(zStar))
+		weights*=failed(predictResponse(model, patientSamples(z)))
+		total+=weights.sum()
+		totalSq+=(weights**2).sum()
+		count+=n
+
+	return confidenceInterval(total, totalSq, count), patientSamples(zStar[None,:])[0]
+
+# *****************************************************************************
+# Define Function to Run FE Models for a Set of Patient Samples
+# *****************************************************************************
+def runPatients(x, jobPrefix):
+	paramList=[]
+	for sample in x:
+		params=dict(baseParams)
+		params.update(zip(paramNames, [float(v) for v in sample]))
+		paramList.append(params)
+	rows=runVariants(paramList, jobPrefix=jobPrefix, numWorkers=numWorkers,
+		modelScript=modelScript)
+	return [row for row in rows if row['completed']]
+
+# *****************************************************************************
+# Define Function to Read or Run the Training Set
+# *****************************************************************************
+def trainingSet(rng):
+	if not os.path.exists(trainingTable):
+		# ============= Latin Hypercube in Standard Normal Space =======
+		strata=np.array([rng.permutation(numTraining) for i in paramNames]).T
+		quantiles=(strata+rng.random(strata.shape))/numTraining
+		z=np.vectorize(NormalDist().inv_cdf)(0.01+0.98*quantiles)
+		x=np.exp(logMedians+logStds*z)
+		writeTable(trainingTable, runPatients(x, 'MC-Train'))
+
+	rows=readTable(trainingTable)
+	x=np.array([[row[name] for name in paramNames] for row in rows])
+	y=np.array([row[failureResponse] for row in rows])
+	return x, y
+
+# *****************************************************************************
+# Run Monte Carlo
+# *****************************************************************************
+if __name__=='__main__':
+	rng=np.random.default_rng(seed)
+
+	x, y=trainingSet(rng)
+	model=fitResponseModel(x, y)
+	fitError=np.sqrt(np.mean(relativeErrors(predictResponse(model, x), y)**2))
+	print('Response surface (%s scale) fitted to %d FE runs (RMS relative error '
+		'%.3g)' % ('log' if model['logScale'] else 'linear', len(y), fitError))
+
+	p, low, high=crudeMonteCarlo(model, rng)
+	print('Crude Monte Carlo:   Pf=%.4g (95%% CI %.4g - %.4g)' % (p, low, high))
+
+	(p, low, high), xStar=importanceSampling(model, rng)
+	print('Importance sampling: Pf=%.4g (95%% CI %.4g - %.4g)' % (p, low, high))
+	print('Design point: '+', '.join(['%s=%.4g' % (name, v)
+		for name, v in zip(paramNames, xStar)]))
+
+	# ================= Validation of the Response Surface =================
+	if numValidation>0:
+		z=rng.standard_normal((numValidation, len(paramNames)))
+		rows=runPatients(patientSamples(z), 'MC-Valid')
+		for row in rows:
+			xRow=np.array([[row[name] for name in paramNames]])
+			row['predicted']=predictResponse(model, xRow)[0]
+		if rows:
+			errors=relativeErrors(np.array([row['predicted'] for row in rows]),
+				np.array([row[failureResponse] for row in rows]))
+			for row, error in zip(rows, errors):
+				row['relativeError']=error
+		writeTable(validationTable, rows)
+		if rows:
+			print('Validation: RMS relative error %.3g over %d FE runs' % (
+				np.sqrt(np.mean([row['relativeError']**2 for row in rows])),
+				len(rows)))
@@ -0,0 +1,226 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code for multi-fidelity modelling of the Bone and Screw model
+#   (plain Python with NumPy, coarse and fine meshSize runs)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     >>python Bone_Screw_and_Plate_Multi_Fidelity.py
+#
+#     1. Many cheap runs at coarseMeshSize over a Latin hypercube design
+#     2. A few expensive runs at fineMeshSize on a space-filling subset of
+#        the coarse design (nested, so each fine run has a coarse partner)
+#     3. Co-kriging (Kennedy & O'Hagan):
+#          yFine(x) = rho*yCoarse(x) + delta(x)
+#        with Gaussian processes for yCoarse and for the correction delta
+#     4. Fine-fidelity predictions with standard deviations over a grid of
+#        the design space are written to predictionTable
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import os
+import itertools
+import numpy as np
+from Bone_Screw_and_Plate_Runner import runVariants, writeTable, readTable
+
+# *****************************************************************************
+# Create a list of 'design space' parameters
+# *****************************************************************************
+
+# Design variables and their ranges (low, high)
+designSpace=[
+	('Ecortical', 6e3, 25e3),
+	('Etrabecular', 0.04e3, 2.2e3),
+	('dcort', 0.5, 1.0)]
+
+# Responses modelled
+responses=['stiffness', 'peakContactPressure']
+
+# *****************************************************************************
+# Create a list of 'simulation' parameters
+# *****************************************************************************
+
+# Model script and fixed model parameters for FE runs
+modelScript='Bone_Screw_and_Plate_Final_Model.py'
+baseParams={'contactForm':'Rough'}
+
+# Mesh sizes and number of runs of each fidelity
+coarseMeshSize=1.3
+fineMeshSize=0.325
+numCoarse=40
+numFine=8
+
+# Number of points per design variable in the prediction grid
+gridPoints=5
+
+# Number of FE runs solved at the same time
+numWorkers=2
+
+# Tables of FE runs and predictions
+coarseTable='multi_fidelity_coarse.csv'
+fineTable='multi_fidelity_fine.csv'
+predictionTable='multi_fidelity_predictions.csv'
+
+# Number of random length-scale candidates tried when fitting each process
+numCandidates=200
+
+# Random seed
+seed=2012
+
+paramNames=[name for name, low, high in designSpace]
+lows=np.array([low for name, low, high in designSpace])
+highs=np.array([high for name, low, high in designSpace])
+
+# *****************************************************************************
+# Define Function for a Latin Hypercube Design in the Unit Cube
+# *****************************************************************************
+def latinHypercube(numPoints, rng):
+	strata=np.array([rng.permutation(numPoints) for name in paramNames]).T
+	return (strata+rng.random(strata.shape))/numPoints
+
+# *****************************************************************************
+# Define Function to Pick a Space-Filling Subset (greedy maximin)
+# *****************************************************************************
+def maximinSubset(u, numPoints):
+	chosen=[int(np.argmin(np.sum((u-0.5)**2, axis=1)))]
+	while len(chosen)<numPoints:
+		dist=np.min(np.sum((u[:,None,:]-u[None,chosen,:])**2, axis=2), axis=1)
+		chosen.append(int(np.argmax(dist)))
+	return chosen
+
+# *****************************************************************************
+# Define Functions for Gaussian Process Regression (squared exponential)
+# *****************************************************************************
+def _kernel(u1, u2, lengths):
+	d=(u1[:,None,:]-u2[None,:,:])/lengths
+	return np.exp(-0.5*np.sum(d**2, axis=2))
+
+def _logLikelihood(u, y, lengths, nugget):
+	K=_kernel(u, u, lengths)+nugget*np.eye(len(u))
+	try:
+		L=np.linalg.cholesky(K)
+	except np.linalg.LinAlgError:
+		return -np.inf
+	alpha=np.linalg.solve(L.T, np.linalg.solve(L, y))
+	variance=y.dot(alpha)/len(y)
+	return -0.5*len(y)*np.log(variance)-np.sum(np.log(np.diag(L)))
+
+def fitGaussianProcess(u, y, rng):
+	mean=y.mean()
+	scale=y.std() or 1.0
+	yn=(y-mean)/scale
+
+	# ================= Random Search of Length Scales =====================
+	best=None
+	for i in range(numCandidates):
+		lengths=np.exp(rng.uniform(np.log(0.05), np.log(3.0), u.shape[1]))
+		nugget=10**rng.uniform(-8, -2)
+		logLike=_logLikelihood(u, yn, lengths, nugget)
+		if best is None or logLike>best[0]:
+			best=(logLike, lengths, nugget)
+
+	logLike, lengths, nugget=best
+	K=_kernel(u, u, lengths)+nugget*np.eye(len(u))
+	L=np.linalg.cholesky(K)
+	alpha=np.linalg.solve(L.T, np.linalg.solve(L, yn))
+	return {'u':u, 'mean':mean, 'scale':scale, 'lengths':lengths,
+		'L':L, 'alpha':alpha, 'variance':yn.dot(alpha)/len(yn)}
+
+def predictGaussianProcess(gp, u):
+	k=_kernel(u, gp['u'], gp['lengths'])
+	v=np.linalg.solve(gp['L'], k.T)
+	mean=gp['mean']+gp['scale']*k.dot(gp['alpha'])
+	var=gp['variance']*np.maximum(1-np.sum(v**2, axis=0), 0)
+	return mean, gp['scale']*np.sqrt(var)
+
+# *****************************************************************************
+# Define Functions for Co-Kriging (autoregressive correction)
+# *****************************************************************************
+def fitCoKriging(coarseGP, uFine, yFine, rng):
+	# ================= Coarse Partner of Each Fine Run ====================
+	yCoarseAtFine=predictGaussianProcess(coarseGP, uFine)[0]
+
+	# ================= Scale Factor rho by Least Squares ==================
+	a=yCoarseAtFine-yCoarseAtFine.mean()
+	b=yFine-yFine.mean()
+	rho=a.dot(b)/a.dot(a) if a.dot(a)>0 else 1.0
+
+	deltaGP=fitGaussianProcess(uFine, yFine-rho*yCoarseAtFine, rng)
+	return {'coarse':coarseGP, 'delta':deltaGP, 'rho':rho,
+		'coarseAtFine':yCoarseAtFine}
+
+def predictCoKriging(model, u):
+	coarseMean, coarseStd=predictGaussianProcess(model['coarse'], u)
+	deltaMean, deltaStd=predictGaussianProcess(model['delta'], u)
+	rho=model['rho']
+	return rho*coarseMean+deltaMean, np.sqrt((rho*coarseStd)**2+deltaStd**2)
+
+# *****************************************************************************
+# Define Function to Run FE Models at a Given Fidelity
+# *****************************************************************************
+def runDesign(u, meshSize, jobPrefix, table):
+	if not os.path.exists(table):
+		paramList=[]
+		for point in lows+u*(highs-lows):
+			params=dict(baseParams)
+			params.update(zip(paramNames, [float(v) for v in point]))
+			params['meshSize']=meshSize
+			paramList.append(params)
+		writeTable(table, runVariants(paramList, jobPrefix=jobPrefix,
+			numWorkers=numWorkers, modelScript=modelScript))
+	return readTable(table)
+
+def _unit(rows):
+	return (np.array([[row[name] for name in paramNames] for row in rows])-lows)/(highs-lows)
+
+def _completed(rows):
+	return [row for row in rows if row['completed']]
+
+# *****************************************************************************
+# Run Multi-Fidelity Study
+# *****************************************************************************
+if __name__=='__main__':
+	rng=np.random.default_rng(seed)
+
+	uDesign=latinHypercube(numCoarse, rng)
+	uFineDesign=uDesign[maximinSubset(uDesign, numFine)]
+
+	coarseRows=_completed(runDesign(uDesign, coarseMeshSize, 'MF-Coarse', coarseTable))
+	fineRows=_completed(runDesign(uFineDesign, fineMeshSize, 'MF-Fine', fineTable))
+	uCoarse=_unit(coarseRows)
+	uFine=_unit(fineRows)
+
+	# ================= Prediction Grid ====================================
+	axes=[np.linspace(0, 1, gridPoints) for name in paramNames]
+	uGrid=np.array(list(itertools.product(*axes)))
+	gridRows=[dict(zip(paramNames, point)) for point in lows+uGrid*(highs-lows)]
+
+	for response in responses:
+		yCoarse=np.array([row[response] for row in coarseRows])
+		yFine=np.array([row[response] for row in fineRows])
+
+		coarseGP=fitGaussianProcess(uCoarse, yCoarse, rng)
+		model=fitCoKriging(coarseGP, uFine, yFine, rng)
+		mean, std=predictCoKriging(model, uGrid)
+		for row, m, s in zip(gridRows, mean, std):
+			row[response]=m
+			row[response+'Std']=s
+
+		# ============= Leave-One-Out Check on the Fine Runs ===========
+		errors=[]
+		for i in range(len(yFine)):
+			keep=np.arange(len(yFine))!=i
+			looModel=fitCoKriging(coarseGP, uFine[keep], yFine[keep], rng)
+			errors.append(predictCoKriging(looModel, uFine[i:i+1])[0][0]/yFine[i]-1)
+		print('%s: rho=%.4g, coarse bias %.3g%%, leave-one-out RMS error %.3g%%' % (
+			response, model['rho'], 100*np.mean(model['coarseAtFine']/yFine-1),
+			100*np.sqrt(np.mean(np.square(errors)))))
+
+	writeTable(predictionTable, gridRows)
+	print('Fine-fidelity predictions at %d points written to %s' % (
+		len(gridRows), predictionTable))
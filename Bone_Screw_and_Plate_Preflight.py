@@ -0,0 +1,525 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code for a pre-flight check of Bone and Screw model parameters
+#   (plain Python, no Abaqus needed, screens variants before CAE is started)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     >>python Bone_Screw_and_Plate_Preflight.py dscrew=11.5 meshSize=0.325
+#       or, for another design
+#     >>python Bone_Screw_and_Plate_Preflight.py Bone_Screw_and_Plate_New_Design.py cx=5.0
+#
+#     From Python
+#      >>from Bone_Screw_and_Plate_Preflight import *
+#      >>rows=screenVariants([{'dscrew':11.5},{'dcort':1.0,'meshSize':0.325}])
+#
+#     1. The parameter header of the model script is read from its source and
+#        run with the parameters of the variant applied at each
+#        applyOverrides(), as the model script does (so BoneStrength sets
+#        the bone moduli unless they are given)
+#     2. The parameters are checked against the partition layout derived from
+#        the screw holes (as in the model scripts), the four screw
+#        penetration cases and the findAt probe points used to create the
+#        sets and surfaces; infeasible variants are rejected with a list of
+#        problems
+#     3. For feasible variants the element count and a solve cost relative
+#        to the defaults of the model script are estimated
+#
+#     The runner calls checkParams before starting CAE, so rejected variants
+#     cost no CAE start-up or licence token
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import os
+import ast
+import sys
+from math import pi, cos, hypot, ceil
+
+# *****************************************************************************
+# Create a list of 'pre-flight' parameters
+# *****************************************************************************
+
+# Thinnest layer of a partitioned screw or ligament of bone/plate around a
+#   hole that is accepted (mm)
+minSliver=0.05
+
+# Distance from a probe point to a hole wall or cell boundary below which
+#   findAt may pick the wrong face or cell (mm)
+probeTolerance=1e-3
+
+# Exponent of the solve cost in the number of degrees of freedom (sparse
+#   direct solver on a 3D mesh)
+costExponent=2.0
+
+# Newton iterations per increment with contact and with tied screws
+contactIterations=3
+tieIterations=1
+
+# Solves of one cycle of a direct cyclic step (Fourier terms of the
+#   displacement) relative to one increment of a static step, and iterations
+#   to the stabilized cycle usually taken (at most cyclicIterations)
+directCyclicFactor=2.0
+directCyclicIterations=20
+
+# Cost of one explicit increment per degree of freedom, in the units of the
+#   implicit cost (iterations*dofs**costExponent); to be calibrated with
+#   Bone_Screw_and_Plate_Explicit_Benchmark.py
+explicitIncrementCost=50.0
+
+# Elements per hexahedron of size meshSize and nodes per element of each
+#   element technology of the model scripts
+elementTechnologies={
+	'Default':(1.0, 1.0),
+	'Reduced':(1.0, 1.0),
+	'Incompatible':(1.0, 1.0),
+	'Quadratic':(1.0, 4.0),
+	'Tet':(5.0, 1.4)}
+
+# Allowed values of the option parameters of the model scripts
+options={
+	'contactForm':('Lagrange', 'Coulomb', 'Rough', 'Tie'),
+	'BoneStrength':('Low', 'Med', 'High'),
+	'construction':('Merge', 'Direct'),
+	'screwPlate':('Tie', 'Merged'),
+	'jobAction':('None', 'Write Input', 'Submit'),
+	'inputFormat':('Parts', 'Flat'),
+	'farField':('On', 'Off'),
+	'checkpoints':('On', 'Off'),
+	'meshQuality':('On', 'Off'),
+	'boneElement':elementTechnologies,
+	'plateElement':elementTechnologies,
+	'screwElement':elementTechnologies,
+	'matrixSolver':('Auto', 'Direct', 'Iterative'),
+	'matrixStorage':('Auto', 'Symmetric', 'Unsymmetric'),
+	'contactStabilization':('On', 'Off'),
+	'cyclicLoad':('Off', 'Auto', 'Direct', 'Steps'),
+	'solver':('Standard', 'Explicit')}
+
+# *****************************************************************************
+# Partition layout of the model scripts (x, y in the bone top face)
+# *****************************************************************************
+
+# Model scripts with a known layout (-X arm of the plate chamfered to block 1
+#   in the Final Model, stepped between the blocks in the New Design)
+designs={
+	'Bone_Screw_and_Plate_Final_Model.py':'Chamfered',
+	'Bone_Screw_and_Plate_New_Design.py':'Stepped'}
+
+# *****************************************************************************
+# Define Functions to Read the Parameters of a Model Script
+# *****************************************************************************
+_headers={}
+
+def _arithmetic(node):
+	# Literal numbers and strings, names, arithmetic and comparisons on them
+	#   (and the 'dtrab' not in cmdParams test of the model scripts)
+	allowed=(ast.Expression, ast.Constant, ast.Name, ast.Load, ast.BinOp,
+		ast.UnaryOp, ast.operator, ast.unaryop, ast.Compare, ast.cmpop,
+		ast.BoolOp, ast.boolop)
+	return all(isinstance(n, allowed) for n in ast.walk(node))
+
+def _isOverride(node):
+	return isinstance(node, ast.Expr) and isinstance(node.value, ast.Call) and \
+		isinstance(node.value.func, ast.Name) and node.value.func.id=='applyOverrides'
+
+def readHeader(modelScript):
+	# Statements of the parameter header (after the definition of
+	#   applyOverrides up to its last call) and the parameters they assign
+	path=os.path.join(os.path.dirname(os.path.abspath(__file__)), modelScript)
+	if path not in _headers:
+		f=open(path)
+		try:
+			tree=ast.parse(f.read())
+		finally:
+			f.close()
+		body=tree.body
+		first=[k for k, node in enumerate(body) if isinstance(node, ast.FunctionDef)
+			and node.name=='applyOverrides'][0]+1
+		last=[k for k, node in enumerate(body) if _isOverride(node)][-1]+1
+		names=[]
+		for node in ast.walk(ast.Module(body=body[first:last], type_ignores=[])):
+			if isinstance(node, ast.Assign) and len(node.targets)==1 and \
+				isinstance(node.targets[0], ast.Name) and node.targets[0].id not in names:
+				names.append(node.targets[0].id)
+		_headers[path]=(body[first:last], names, path)
+	return _headers[path]
+
+def _runHeader(nodes, namespace, params, path):
+	# Assignments, BoneStrength branches and applyOverrides() as the model
+	#   script runs them
+	for node in nodes:
+		if isinstance(node, ast.Assign) and len(node.targets)==1 and \
+			isinstance(node.targets[0], ast.Name):
+			expr=ast.Expression(node.value)
+			if _arithmetic(expr):
+				try:
+					namespace[node.targets[0].id]=eval(compile(expr, path, 'eval'),
+						{'__builtins__':{}}, namespace)
+				except (NameError, ZeroDivisionError, TypeError):
+					pass
+		elif isinstance(node, ast.If):
+			expr=ast.Expression(node.test)
+			if _arithmetic(expr):
+				try:
+					test=eval(compile(expr, path, 'eval'), {'__builtins__':{}}, namespace)
+				except (NameError, TypeError):
+					continue
+				_runHeader(node.body if test else node.orelse, namespace, params, path)
+		elif _isOverride(node):
+			namespace.update(params)
+
+def headerValues(params, modelScript):
+	# Parameters of the model script with those of the variant applied
+	nodes, names, path=readHeader(modelScript)
+	namespace={'pi':pi, 'cmdParams':params}
+	_runHeader(nodes, namespace, params, path)
+	return dict([(name, namespace[name]) for name in names if name in namespace])
+
+def readDefaults(modelScript):
+	return headerValues({}, modelScript)
+
+# *****************************************************************************
+# Define Function to Apply Variant Parameters as the Model Script Does
+# *****************************************************************************
+def modelValues(params, modelScript):
+	values=headerValues(params, modelScript)
+	values.update(params)
+	return values
+
+# *****************************************************************************
+# Define Function for the DispLoad Values of a Load Ladder
+# *****************************************************************************
+def loadLevels(values):
+	# Empty for a single step with DispLoad
+	if values['loadLevels']=='':
+		return []
+	return [float(v) for v in str(values['loadLevels']).split(',')]
+
+# *****************************************************************************
+# Define Function for the Partition Layout Derived from the Screw Holes
+# *****************************************************************************
+def partitionLayout(values, modelScript):
+	# Same rules as the 'Partition Layout' section of the model scripts
+	cx, cy, cx2, cy2=values['cx'], values['cy'], values['cx2'], values['cy2']
+	half=values['blockHalf']
+	armHalf=values['armHalf']
+	boneX, boneY1, boneY2=values['boneX'], values['boneY1'], values['boneY2']
+	blocks=((cx-half,cy-half,cx+half,cy+half), (cx2-half,cy2-half,cx2+half,cy2+half))
+	(h1x1,h1y1,h1x2,h1y2),(h2x1,h2y1,h2x2,h2y2)=blocks
+
+	armX=h1x1-(half-armHalf)
+	lowArmY=h1y1-(half-armHalf)
+	if designs[os.path.basename(modelScript)]=='Stepped':
+		armY=(h1y2+h2y1)/2
+		armJoin=[(armX,armY-armHalf), (h1x1,h1y2), (h1x1,h1y1)]
+		topJoin=[(h2x1,h2y1), (h1x1,h2y1), (armX,armY+armHalf)]
+	else:
+		armY=cy
+		armJoin=[(armX,armY-armHalf), (h1x1,h1y1)]
+		topJoin=[(h2x1,h2y1), (h1x1,h1y2), (armX,armY+armHalf)]
+	plateOutline=([(0,armY-armHalf)]+armJoin
+		+[(cx-armHalf,lowArmY), (cx-armHalf,boneY1), (cx+armHalf,boneY1),
+		(cx+armHalf,lowArmY), (h1x2,h1y1), (h1x2,h1y2), (h2x2,h2y1),
+		(h2x2,h2y2), (h2x1,h2y2)]+topJoin+[(0,armY+armHalf)])
+
+	# ================= Probe Points of Faces, Edges and Cells =============
+	probes=[(h1x1/2,cy), (boneX,cy), (armX/2,armY), (h1x2,cy), (0,armY),
+		(cx,boneY1), (0,boneY2), (boneX,boneY2), (boneX,boneY1)]
+	probes+=[(x,boneY1) for x in (h1x1/2, cx, (h1x2+boneX)/2)]
+	probes+=[(boneX,y) for y in ((boneY1+h1y1)/2, cy, (h1y2+h2y1)/2,
+		(h2y1+boneY2)/2)]
+
+	return {'bone':(0.0, boneY1, boneX, boneY2), 'blocks':blocks, 'armX':armX,
+		'lowArmY':lowArmY, 'plateOutline':plateOutline, 'probes':probes}
+
+# *****************************************************************************
+# Define Functions for Plane Geometry of the Layout
+# *****************************************************************************
+def polygonArea(points):
+	area=0.0
+	for (x1,y1),(x2,y2) in zip(points, points[1:]+points[:1]):
+		area+=x1*y2-x2*y1
+	return abs(area)/2
+
+def leavesCircle(corner, point, center):
+	# Line from a block corner to a point on the hole circle stays outside
+	return ((corner[0]-point[0])*(point[0]-center[0])
+		+(corner[1]-point[1])*(point[1]-center[1]))>0
+
+# *****************************************************************************
+# Define Function to Check Parameters Against the Layout
+# *****************************************************************************
+def checkParams(params, modelScript='Bone_Screw_and_Plate_Final_Model.py'):
+	# Only the layouts of the model scripts above are known
+	if os.path.basename(modelScript) not in designs:
+		return []
+	values=modelValues(params, modelScript)
+	problems=[]
+
+	# ================= Options ============================================
+	for name, allowed in options.items():
+		if values.get(name) not in allowed:
+			problems.append('%s=%s is not one of %s' % (name, values.get(name),
+				', '.join(allowed)))
+	if values['submodelHole'] not in (0, 1, 2):
+		problems.append('submodelHole=%s is not 0, 1 or 2' % values['submodelHole'])
+	elif values['submodelHole'] and values['farField']=='On':
+		problems.append('submodelHole requires farField=Off')
+	if values['loadLevels']!='':
+		try:
+			levels=loadLevels(values)
+		except ValueError:
+			levels=[]
+			problems.append('loadLevels=%s is not a comma-separated list of '
+				'numbers' % values['loadLevels'])
+		if values['submodelHole'] and levels:
+			problems.append('loadLevels requires submodelHole=0 (the submodel is '
+				'driven by the first global step)')
+	if values['cyclicLoad']!='Off':
+		if values['submodelHole']:
+			problems.append('cyclicLoad requires submodelHole=0 (the submodel is '
+				'driven by the first global step)')
+		if values['loadLevels']!='':
+			problems.append('cyclicLoad and loadLevels cannot be used together')
+		if values['contactForm'] in ('Tie', 'Rough'):
+			problems.append('cyclicLoad has no micromotion with contactForm=%s (the '
+				'screws do not slip, use Coulomb or Lagrange)' % values['contactForm'])
+		if values['cyclicLoad']=='Direct' and values['contactForm']=='Lagrange':
+			problems.append('cyclicLoad=Direct cannot solve the Lagrange '
+				'multipliers of contactForm=Lagrange (use Steps or Auto)')
+		if not 0<=values['cycleRatio']<1:
+			problems.append('cycleRatio=%g is not in [0, 1)' % values['cycleRatio'])
+		for name in ('numCycles', 'cycleIncrements', 'cyclicIterations'):
+			if values[name]<1:
+				problems.append('%s=%g is less than 1' % (name, values[name]))
+	if values['solver']=='Explicit':
+		# Steps, elements and features of the Standard build only
+		if values['farField']=='On':
+			problems.append('solver=Explicit cannot use the substructure of farField=On')
+		if values['submodelHole']:
+			problems.append('solver=Explicit requires submodelHole=0')
+		if values['loadLevels']!='' or values['cyclicLoad']!='Off':
+			problems.append('solver=Explicit has one load step (no loadLevels or '
+				'cyclicLoad)')
+		if values['restartFrequency']:
+			problems.append('restartFrequency applies to the Standard solver only')
+		if values['contactStabilization']=='On':
+			problems.append('contactStabilization applies to the Standard solver only')
+		for name in ('boneElement', 'plateElement', 'screwElement'):
+			if values[name]=='Quadratic':
+				problems.append('%s=Quadratic has no hex element in the explicit '
+					'library' % name)
+		if not 0<values['explicitInc']<values['explicitTime']:
+			problems.append('explicit increments need 0<explicitInc<explicitTime (got '
+				'%g, %g)' % (values['explicitInc'], values['explicitTime']))
+	if values['restartFrequency']<0:
+		problems.append('restartFrequency=%g is negative' % values['restartFrequency'])
+	if values['matrixSolver']=='Iterative':
+		if values['matrixStorage']=='Unsymmetric' or (values['matrixStorage']=='Auto'
+			and values['contactForm'] in ('Lagrange', 'Coulomb')):
+			problems.append('matrixSolver=Iterative requires symmetric matrix storage')
+		if values['contactForm']=='Lagrange':
+			problems.append('matrixSolver=Iterative cannot solve the Lagrange '
+				'multipliers of contactForm=Lagrange')
+
+	# ================= Dimensions =========================================
+	for name in ('R', 'dbone', 'dcort', 'dtrab', 'dplate', 'dscrew', 'meshSize',
+		'blockHalf', 'armHalf'):
+		if values[name]<=0:
+			problems.append('%s=%g is not positive' % (name, values[name]))
+	if not 0<values['minInc']<=values['initialInc']<=values['maxInc']<=1:
+		problems.append('increments need 0<minInc<=initialInc<=maxInc<=1 (got %g, '
+			'%g, %g)' % (values['minInc'], values['initialInc'], values['maxInc']))
+	if problems:
+		return problems
+
+	R=values['R']
+	dbone=values['dbone']
+	dcort=values['dcort']
+	dtrab=values['dtrab']
+	dplate=values['dplate']
+	dscrew=values['dscrew']
+	if abs(2*dcort+dtrab-dbone)>probeTolerance:
+		problems.append('dcort+dtrab+dcort=%g does not equal dbone=%g' % (
+			2*dcort+dtrab, dbone))
+
+	# ================= Bone Layer Cell Probes =============================
+	# Trabecular cells are picked at z=dtrab
+	if dtrab<=dcort+probeTolerance:
+		problems.append('trabecular probe z=dtrab=%g is not inside the '
+			'trabecular layer (needs dtrab>dcort)' % dtrab)
+
+	# ================= Screw Penetration Cases ============================
+	# Case 2 and 4 are selected by exact equality in the model script, so a
+	#   screw tip close to a layer boundary leaves a sliver cell instead
+	topTrab=dplate+dcort
+	botTrab=dplate+dcort+dtrab
+	botBone=dplate+dbone
+	if dscrew<=topTrab+minSliver:
+		problems.append('dscrew=%g does not reach the trabecular bone '
+			'(needs dscrew>%g)' % (dscrew, topTrab+minSliver))
+	elif dscrew>botBone:
+		problems.append('dscrew=%g protrudes below the bone (needs '
+			'dscrew<=%g)' % (dscrew, botBone))
+	for boundary, name in ((botTrab, 'trabecular'), (botBone, 'bottom cortical')):
+		if dscrew!=boundary and abs(dscrew-boundary)<minSliver:
+			problems.append('dscrew=%r is within %g of the bottom of the %s '
+				'layer (%r) but not on it' % (dscrew, minSliver, name, boundary))
+
+	# ================= Holes in Their Partition Blocks ====================
+	layout=partitionLayout(values, modelScript)
+	(h1x1,h1y1,h1x2,h1y2),(h2x1,h2y1,h2x2,h2y2)=layout['blocks']
+	if values['blockHalf']-R<minSliver:
+		problems.append('blockHalf=%g leaves no ring of partitions around holes '
+			'of R=%g' % (values['blockHalf'], R))
+	rp=R*cos(pi/4)
+	holes=[(values['cx'], values['cy']), (values['cx2'], values['cy2'])]
+	for k, ((cx,cy), (x1,y1,x2,y2)) in enumerate(zip(holes, layout['blocks'])):
+		for corner, point in (((x1,y2),(cx-rp,cy+rp)), ((x2,y2),(cx+rp,cy+rp)),
+			((x1,y1),(cx-rp,cy-rp)), ((x2,y1),(cx+rp,cy-rp))):
+			if not leavesCircle(corner, point, (cx,cy)):
+				problems.append('partition line from %s to hole %d cuts through '
+					'the hole' % (corner, k+1))
+
+	# ================= Blocks and Plate Arms Inside the Bone ==============
+	x1,y1,x2,y2=layout['bone']
+	if layout['armX']<minSliver:
+		problems.append('-X arm of the plate ends at x=%g, block 1 is too close '
+			'to the bone edge x=0' % layout['armX'])
+	if layout['lowArmY']-y1<minSliver:
+		problems.append('-Y arm of the plate ends at y=%g, block 1 is too close '
+			'to the plane of symmetry y=%g' % (layout['lowArmY'], y1))
+	for k, (bx1,by1,bx2,by2) in enumerate(layout['blocks']):
+		if bx2>x2-minSliver or by2>y2+probeTolerance:
+			problems.append('block of hole %d %s is not inside the bone' % (k+1,
+				(bx1,by1,bx2,by2)))
+	if h2y1-h1y2<minSliver:
+		problems.append('blocks of holes 1 and 2 overlap or touch in y (%g to %g)'
+			% (h1y2, h2y1))
+	elif designs[os.path.basename(modelScript)]=='Stepped' and \
+		h2y1-h1y2<2*values['armHalf']:
+		problems.append('-X arm of width %g does not fit between the blocks '
+			'(%g to %g)' % (2*values['armHalf'], h1y2, h2y1))
+
+	# ================= Probe Points Clear of the Holes ====================
+	for probe in layout['probes']:
+		for k, (cx,cy) in enumerate(holes):
+			if hypot(probe[0]-cx, probe[1]-cy)<R+probeTolerance:
+				problems.append('probe point %s lies in hole %d' % (probe, k+1))
+	return problems
+
+# *****************************************************************************
+# Define Function to Estimate Element Count and Solve Cost
+# *****************************************************************************
+def estimateCost(params, modelScript='Bone_Screw_and_Plate_Final_Model.py'):
+	values=modelValues(params, modelScript)
+	layout=partitionLayout(values, modelScript)
+	h=values['meshSize']
+	holeArea=pi*values['R']**2
+
+	def elementLayers(t):
+		return max(1, int(round(t/h)))
+
+	# ================= Modelled Areas of Bone, Plate and Screws ===========
+	x1,y1,x2,y2=layout['bone']
+	boneArea=(x2-x1)*(y2-y1)
+	plateArea=polygonArea(layout['plateOutline'])
+	numHoles=2
+	if values['submodelHole']:
+		x1,y1,x2,y2=layout['blocks'][int(values['submodelHole'])-1]
+		boneArea=plateArea=(x2-x1)*(y2-y1)
+		numHoles=1
+	elif values['farField']=='On':
+		boneArea=sum([(x2-x1)*(y2-y1) for x1,y1,x2,y2 in layout['blocks']])
+
+	# ================= Hexahedra of Size meshSize Through Each Layer ======
+	holeDepth=values['dscrew']-values['dplate']
+	bone=0.0
+	for t in (values['dcort'], values['dtrab'], values['dcort']):
+		bone+=boneArea/h**2*elementLayers(t)
+	bone-=numHoles*holeArea/h**2*holeDepth/h
+	plate=(plateArea-numHoles*holeArea)/h**2*elementLayers(values['dplate'])
+	screws=numHoles*holeArea/h**2*elementLayers(values['dscrew'])
+
+	# ================= Elements and Nodes of Each Element Technology ======
+	elements=0
+	nodes=0
+	for hexes, technology in ((bone, values['boneElement']),
+		(plate, values['plateElement']), (screws, values['screwElement'])):
+		perHex, nodesPerElement=elementTechnologies[technology]
+		elements+=hexes*perHex
+		nodes+=hexes*perHex*nodesPerElement
+	elements=int(elements)
+
+	# ================= Solve Cost =========================================
+	dofs=3*int(nodes)
+	if values['solver']=='Explicit':
+		# Increments at the stable time increment targeted by mass scaling
+		increments=int(ceil(values['explicitTime']/values['explicitInc']))
+		return {'elements':elements, 'dofs':dofs,
+			'cost':increments*dofs*explicitIncrementCost}
+	if values['contactForm']=='Tie':
+		iterations=tieIterations
+	else:
+		iterations=int(ceil(1.0/values['maxInc']))*contactIterations
+	iterations*=max(1, len(loadLevels(values)))
+	if values['cyclicLoad']!='Off' and values['contactForm']!='Tie':
+		# Direct cyclic iterations each solve one cycle, as the static steps do
+		cycle=values['cycleIncrements']*contactIterations
+		if values['cyclicLoad']=='Direct' or (values['cyclicLoad']=='Auto' and
+			values['contactForm']!='Lagrange'):
+			cycle*=directCyclicFactor
+			iterations+=int(cycle*min(directCyclicIterations,
+				values['cyclicIterations']))
+		else:
+			iterations+=int(cycle*values['numCycles'])
+	return {'elements':elements, 'dofs':dofs,
+		'cost':iterations*float(dofs)**costExponent}
+
+# *****************************************************************************
+# Define Function to Screen Many Variants
+# *****************************************************************************
+def screenVariants(paramList, modelScript='Bone_Screw_and_Plate_Final_Model.py'):
+	baseCost=estimateCost({}, modelScript)['cost']
+	rows=[]
+	for params in paramList:
+		row=dict(params)
+		problems=checkParams(params, modelScript)
+		row['feasible']=not problems
+		row['problems']='; '.join(problems)
+		if not problems:
+			row.update(estimateCost(params, modelScript))
+			row['relativeCost']=row['cost']/baseCost
+		rows.append(row)
+	return rows
+
+# *****************************************************************************
+# Run Pre-Flight Check
+# *****************************************************************************
+if __name__=='__main__':
+	args=sys.argv[1:]
+	modelScript='Bone_Screw_and_Plate_Final_Model.py'
+	if args and args[0].endswith('.py'):
+		modelScript=args.pop(0)
+
+	params={}
+	for arg in args:
+		name,value=arg.split('=',1)
+		try:
+			params[name]=float(value)
+		except ValueError:
+			params[name]=value
+
+	row=screenVariants([params], modelScript)[0]
+	if not row['feasible']:
+		print('Rejected:')
+		for problem in row['problems'].split('; '):
+			print('  '+problem)
+		sys.exit(1)
+	print('Feasible: about %d elements, %d degrees of freedom, %.3gx the solve '
+		'cost of the defaults' % (row['elements'], row['dofs'], row['relativeCost']))
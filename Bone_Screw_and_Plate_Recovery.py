@@ -0,0 +1,252 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code to recover Bone and Screw variants that fail to converge
+#   (plain Python, resubmits through the runner with escalating remedies)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     >>python Bone_Screw_and_Plate_Recovery.py sweep.csv
+#       runs the variants of sweep.csv (one column per parameter) and writes
+#       the results to resultsTable
+#
+#     From Python
+#      >>from Bone_Screw_and_Plate_Recovery import *
+#      >>results=runRecoverable({'contactForm':'Lagrange'}, 'Job-Lagrange')
+#
+#     1. When a run does not complete, the failure mode is read from the
+#        messages of the final failing increment (after the last accepted
+#        increment of the .msg and .sta files), so warnings of earlier
+#        increments that were solved do not hide the cause
+#          Distortion - excessively distorted elements
+#          Singular   - zero pivots or numerical singularities (screws not
+#                       yet held by contact)
+#          Contact    - overclosure or contact that does not settle
+#          Cutbacks   - too many attempts or an increment below minInc
+#          Unknown    - the analysis ran but none of the above was found
+#        Runs that were rejected or that did not start are not resubmitted
+#     2. The variant is resubmitted with the next remedy of the ladder of its
+#        failure mode that applies, keeping the earlier remedies; once each
+#        remedy of the ladder has been tried, Increments and Mesh are applied
+#        again (up to remedyRepeats times) to escalate them
+#          Increments    - smaller initial, largest and smallest increments
+#          Stabilization - contactStabilization=On
+#          Penalty       - 'Coulomb Friction (Penalty)' instead of 'Lagrange
+#                          Friction'
+#          Mesh          - a finer mesh for distortion, a coarser one
+#                          otherwise
+#     3. At most maxRetries resubmissions are made, and every attempt is
+#        appended to recoveryLog
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import os
+import re
+import sys
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from Bone_Screw_and_Plate_Runner import runVariant, readTable, writeTable, STATUS_ROW, \
+	MODEL_SCRIPT
+from Bone_Screw_and_Plate_Preflight import modelValues
+
+# *****************************************************************************
+# Create a list of 'recovery' parameters
+# *****************************************************************************
+
+# Text of the .msg and .sta files identifying each failure mode, checked in
+#   this order
+failureModes=[
+	('Distortion', ['EXCESSIVELY DISTORTED', 'EXCESSIVE DISTORTION']),
+	('Singular', ['ZERO PIVOT', 'NUMERICAL SINGULARITY']),
+	('Contact', ['OVERCLOSURE', 'TOO MANY SEVERE DISCONTINUITY']),
+	('Cutbacks', ['TOO MANY ATTEMPTS', 'LESS THAN THE MINIMUM SPECIFIED'])]
+
+# Remedies in the order they are tried for each failure mode
+ladders={
+	'Distortion':['Mesh', 'Increments', 'Stabilization', 'Penalty'],
+	'Singular':['Stabilization', 'Increments', 'Penalty', 'Mesh'],
+	'Contact':['Stabilization', 'Penalty', 'Increments', 'Mesh'],
+	'Cutbacks':['Increments', 'Stabilization', 'Penalty', 'Mesh'],
+	'Unknown':['Increments', 'Stabilization', 'Penalty', 'Mesh']}
+
+# Times each remedy may be applied to a variant (Stabilization and Penalty
+#   apply once by nature)
+remedyRepeats={'Increments':3, 'Stabilization':1, 'Penalty':1, 'Mesh':2}
+
+# Largest number of resubmissions of a variant
+maxRetries=6
+
+# Line of the .msg file written after each accepted increment
+INCREMENT_SUMMARY=re.compile(r'INCREMENT\s+\d+\s+SUMMARY')
+
+# Reduction of the initial and largest increments, and smallest increment
+#   relative to the initial increment
+incrementFactor=0.1
+maxIncFactor=0.5
+minIncRatio=1e-3
+
+# Change of meshSize of the Mesh remedy
+meshFactor=1.5
+
+# Number of variants solved at the same time
+numWorkers=2
+
+# Directory of the runs, log of all attempts and table of results
+workDir='runs'
+recoveryLog='recovery_log.jsonl'
+resultsTable='recovery_results.csv'
+
+# *****************************************************************************
+# Define Function to Read the Failure Mode of a Run
+# *****************************************************************************
+def finalIncrementText(text, accepted):
+	# Text after the last match of accepted (the last accepted increment)
+	last=None
+	for last in accepted:
+		pass
+	if last is None:
+		return text
+	return text[last.end():]
+
+def failureMode(jobDir, jobName):
+	text=''
+	found=False
+	for ext in ('.msg', '.sta'):
+		path=os.path.join(jobDir, jobName+ext)
+		if os.path.exists(path):
+			f=open(path)
+			try:
+				fileText=f.read().upper()
+			finally:
+				f.close()
+			found=found or bool(fileText)
+			if ext=='.msg':
+				text+=finalIncrementText(fileText, INCREMENT_SUMMARY.finditer(fileText))
+			else:
+				text+=finalIncrementText(fileText, [m for m in
+					STATUS_ROW.finditer(fileText) if m.group(4)!='U'])
+	if not found:
+		return None
+	for mode, messages in failureModes:
+		if any([message in text for message in messages]):
+			return mode
+	return 'Unknown'
+
+# *****************************************************************************
+# Define Function to Apply a Remedy to the Parameters of a Variant
+# *****************************************************************************
+def applyRemedy(remedy, params, mode, modelScript):
+	# Returns the new parameters, or None if the remedy does not apply
+	values=modelValues(params, modelScript)
+	if remedy=='Increments':
+		initialInc=values['initialInc']*incrementFactor
+		return dict(params, initialInc=initialInc,
+			maxInc=max(initialInc, values['maxInc']*maxIncFactor),
+			minInc=min(values['minInc'], initialInc*minIncRatio))
+	if remedy=='Stabilization':
+		if values['contactForm']=='Tie' or values['contactStabilization']=='On':
+			return None
+		return dict(params, contactStabilization='On')
+	if remedy=='Penalty':
+		if values['contactForm']!='Lagrange':
+			return None
+		return dict(params, contactForm='Coulomb')
+	if remedy=='Mesh':
+		if mode=='Distortion':
+			return dict(params, meshSize=values['meshSize']/meshFactor)
+		return dict(params, meshSize=values['meshSize']*meshFactor)
+
+# *****************************************************************************
+# Define Function to Append an Attempt to the Recovery Log
+# *****************************************************************************
+_logLock=threading.Lock()
+
+def logAttempt(jobName, attempt, mode, remedies, params, results):
+	record={'variant':jobName, 'attempt':attempt, 'jobName':results['jobName'],
+		'previousFailure':mode, 'remedies':remedies, 'params':params,
+		'completed':results['completed'], 'wallTime':results['wallTime']}
+	_logLock.acquire()
+	try:
+		f=open(recoveryLog, 'a')
+		try:
+			f.write(json.dumps(record, sort_keys=True)+'\n')
+		finally:
+			f.close()
+	finally:
+		_logLock.release()
+
+# *****************************************************************************
+# Define Function to Run a Variant with the Recovery Ladder
+# *****************************************************************************
+def runRecoverable(params, jobName, modelScript=MODEL_SCRIPT):
+	remedies=[]
+	mode=None
+	attemptParams=dict(params)
+	attemptName=jobName
+	for attempt in range(maxRetries+1):
+		results=runVariant(attemptParams, attemptName, modelScript=modelScript,
+			workDir=workDir)
+		logAttempt(jobName, attempt, mode, list(remedies), attemptParams, results)
+		if results['completed'] or 'rejected' in results or attempt==maxRetries:
+			break
+
+		# ============= Next Remedy for the Failure Mode ===================
+		mode=failureMode(results['jobDir'], attemptName)
+		if mode is None:
+			break
+		# Remedies tried fewest times first, in the order of the ladder
+		newParams=None
+		for remedy in sorted(ladders[mode], key=lambda r: remedies.count(r)):
+			if remedies.count(remedy)<remedyRepeats[remedy]:
+				newParams=applyRemedy(remedy, attemptParams, mode, modelScript)
+				if newParams is not None:
+					remedies.append(remedy)
+					break
+		if newParams is None:
+			break
+		attemptParams=newParams
+		attemptName='%s-R%d' % (jobName, attempt+1)
+
+	results['attempts']=attempt+1
+	results['remedies']=', '.join(remedies)
+	results['failureMode']=mode
+	return results
+
+# *****************************************************************************
+# Define Function to Run a Sweep Unattended
+# *****************************************************************************
+def runSweep(paramList, jobPrefix='Variant', modelScript=MODEL_SCRIPT):
+	jobNames=['%s-%04d' % (jobPrefix, i) for i in range(len(paramList))]
+
+	pool=ThreadPoolExecutor(max_workers=numWorkers)
+	try:
+		futures=[pool.submit(runRecoverable, params, jobName, modelScript)
+			for params, jobName in zip(paramList, jobNames)]
+		return [future.result() for future in futures]
+	finally:
+		pool.shutdown()
+
+# *****************************************************************************
+# Run Sweep
+# *****************************************************************************
+if __name__=='__main__':
+	sweepTable=sys.argv[1]
+	paramList=[dict([(k, v) for k, v in row.items() if v!=''])
+		for row in readTable(sweepTable)]
+
+	rows=runSweep(paramList)
+	writeTable(resultsTable, rows)
+	recovered=[row for row in rows if row['completed'] and row['attempts']>1]
+	print('%d of %d variants completed (%d recovered), attempts logged to %s' % (
+		len([row for row in rows if row['completed']]), len(rows), len(recovered),
+		recoveryLog))
+	for row in rows:
+		if not row['completed']:
+			print('%s: %s after %d attempts (%s)' % (row['jobName'],
+				row.get('rejected') or row['failureMode'], row['attempts'],
+				row['remedies'] or 'no remedy'))
@@ -0,0 +1,446 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code for instant modulus sweeps of the Bone and Screw model from
+# region-wise stiffness matrices
+#   (plain Python with NumPy and SciPy, Abaqus is called once per geometry)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     1. Write a flat input deck of the geometry ('Rough' contact)
+#      >>abaqus cae noGUI=Bone_Screw_and_Plate_Final_Model.py -- jobAction="Write Input" inputFormat=Flat
+#
+#     2. Solve the modulus sets of a table (CSV with any of the columns
+#        Eplate, Escrew, Ecortical, Etrabecular; missing values are taken
+#        from the deck)
+#      >>python Bone_Screw_and_Plate_Region_Stiffness.py Job-1.inp moduli.csv
+#
+#     With 'Rough' contact and a small DispLoad the response is linear and
+#
+#       K = Eplate*Kplate + Escrew*Kscrew + Ecortical*Kcortical + Etrabecular*Ktrabecular
+#
+#     The unit-modulus region matrices are generated once per geometry with
+#     *MATRIX GENERATE (one deck per region, patched from the base deck) and
+#     cached next to the deck in <deck>_regions.npz, with a key of the mesh,
+#     sets, surfaces, sections and Poisson's ratios; a deck rewritten for
+#     another geometry generates them again. The ties and screw-bone contact pairs are
+#     replaced by bonded penalty springs between the nearest nodes of their
+#     surfaces, and every modulus set costs one sparse factorization and
+#     solve. Decks with contact pairs that are not 'Rough' are rejected.
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import os
+import re
+import sys
+import hashlib
+import numpy as np
+import scipy.sparse as sparse
+from scipy.sparse.linalg import splu
+from scipy.spatial import cKDTree
+from Bone_Screw_and_Plate_Runner import callAbaqus, readTable, writeTable
+from Bone_Screw_and_Plate_Inp_Patcher import readTemplate, renderVariant, materialParams
+
+# *****************************************************************************
+# Create a list of 'decomposition' parameters
+# *****************************************************************************
+
+# Modulus of the other regions in the deck of each region (removed exactly)
+offModulus=1e-6
+
+# Penalty stiffness of the bonded springs (relative to the mean diagonal of K)
+penaltyFactor=1e3
+
+# Largest distance between bonded nodes (relative to the mean nearest distance)
+bondTolerance=3.0
+
+# Keywords removed from the model data of the matrix generation decks
+removedKeywords=['tie', 'contact pair', 'boundary']
+
+# Keywords of the model data in the key of the cached region matrices (of
+#   *ELASTIC only the Poisson's ratio, the modulus being patched)
+geometryKeywords=['node', 'element', 'nset', 'elset', 'surface', 'solid section',
+	'material', 'elastic']
+
+# Nodes of each element face (corner and midside nodes)
+faceNodes={
+	'C3D4':{'S1':(1,2,3), 'S2':(1,4,2), 'S3':(2,4,3), 'S4':(3,4,1)},
+	'C3D6':{'S1':(1,2,3), 'S2':(4,6,5), 'S3':(1,4,5,2), 'S4':(2,5,6,3),
+		'S5':(3,6,4,1)},
+	'C3D8':{'S1':(1,2,3,4), 'S2':(5,8,7,6), 'S3':(1,5,6,2), 'S4':(2,6,7,3),
+		'S5':(3,7,8,4), 'S6':(4,8,5,1)},
+	'C3D10':{'S1':(1,2,3,5,6,7), 'S2':(1,4,2,8,9,5), 'S3':(2,4,3,9,10,6),
+		'S4':(3,4,1,10,8,7)},
+	'C3D15':{'S1':(1,2,3,7,8,9), 'S2':(4,6,5,12,11,10), 'S3':(1,4,5,2,13,10,14,7),
+		'S4':(2,5,6,3,14,11,15,8), 'S5':(3,6,4,1,15,12,13,9)},
+	'C3D20':{'S1':(1,2,3,4,9,10,11,12), 'S2':(5,8,7,6,16,15,14,13),
+		'S3':(1,5,6,2,17,13,18,9), 'S4':(2,6,7,3,18,14,19,10),
+		'S5':(3,7,8,4,19,15,20,11), 'S6':(4,8,5,1,20,16,17,12)}}
+
+# Degrees of freedom fixed by symmetry keywords of *BOUNDARY
+symmetryDofs={'XSYMM':(1,), 'YSYMM':(2,), 'ZSYMM':(3,),
+	'PINNED':(1,2,3), 'ENCASTRE':(1,2,3)}
+
+# *****************************************************************************
+# Define Functions to Read a Flat Input Deck
+# *****************************************************************************
+def _name(value):
+	return value.strip().strip('"').lower()
+
+def _keyword(line):
+	fields=line[1:].split(',')
+	params={}
+	for field in fields[1:]:
+		if '=' in field:
+			k, v=field.split('=', 1)
+			params[k.strip().lower()]=_name(v)
+		elif field.strip():
+			params[field.strip().lower()]=None
+	return fields[0].strip().lower(), params
+
+def _labels(dataLines, generate):
+	labels=[]
+	for line in dataLines:
+		values=[int(v) for v in line.split(',') if v.strip()]
+		if generate:
+			labels+=range(values[0], values[1]+1, values[2] if len(values)>2 else 1)
+		else:
+			labels+=values
+	return labels
+
+def readDeck(inpPath):
+	# Returns nodes, elements, sets, moduli, surfaces, bonded surface pairs
+	# and boundary conditions of a flat deck (no parts or instances)
+	deck={'nodes':{}, 'elements':{}, 'elsets':{}, 'nsets':{}, 'elastic':{},
+		'surfaces':{}, 'pairs':[], 'boundaries':[]}
+	friction={}
+	interactions=[]
+
+	blocks=[]
+	f=open(inpPath)
+	try:
+		for line in f:
+			line=line.strip()
+			if line.startswith('**') or not line:
+				continue
+			if line.startswith('*'):
+				blocks.append([_keyword(line), []])
+			elif blocks:
+				# Long element definitions continue on the next line
+				if blocks[-1][0][0]=='element' and blocks[-1][1] and blocks[-1][1][-1].endswith(','):
+					blocks[-1][1][-1]+=line
+				else:
+					blocks[-1][1].append(line)
+	finally:
+		f.close()
+
+	material=None
+	interaction=None
+	for (keyword, params), data in blocks:
+		if keyword=='node':
+			for line in data:
+				values=line.split(',')
+				deck['nodes'][int(values[0])]=[float(v) for v in values[1:4]]
+		elif keyword=='element':
+			elType=params['type'].upper()
+			for line in data:
+				values=[int(v) for v in line.split(',') if v.strip()]
+				deck['elements'][values[0]]=(elType, values[1:])
+			if 'elset' in params:
+				deck['elsets'].setdefault(params['elset'], []).extend(
+					[int(line.split(',')[0]) for line in data])
+		elif keyword=='elset':
+			deck['elsets'].setdefault(params['elset'], []).extend(
+				_labels(data, 'generate' in params))
+		elif keyword=='nset':
+			deck['nsets'].setdefault(params['nset'], []).extend(
+				_labels(data, 'generate' in params))
+		elif keyword=='material':
+			material=params['name']
+		elif keyword=='elastic':
+			deck['elastic'][material]=float(data[0].split(',')[0])
+		elif keyword=='surface':
+			deck['surfaces'][params['name']]=[(_name(line.split(',')[0]),
+				line.split(',')[1].strip().upper()) for line in data]
+		elif keyword=='surface interaction':
+			interaction=params['name']
+			friction[interaction]=None
+		elif keyword=='friction':
+			friction[interaction]='rough' if 'rough' in params else 'slip'
+		elif keyword in ('tie', 'contact pair'):
+			if keyword=='contact pair':
+				interactions.append(params.get('interaction'))
+			deck['pairs']+=[tuple([_name(v) for v in line.split(',')[:2]])
+				for line in data]
+		elif keyword=='boundary':
+			for line in data:
+				values=[v.strip() for v in line.split(',')]
+				if values[1].upper() in symmetryDofs:
+					deck['boundaries']+=[(_name(values[0]), dof, 0.0)
+						for dof in symmetryDofs[values[1].upper()]]
+					continue
+				last=int(values[2]) if len(values)>2 and values[2] else int(values[1])
+				value=float(values[3]) if len(values)>3 and values[3] else 0.0
+				deck['boundaries']+=[(_name(values[0]), dof, value)
+					for dof in range(int(values[1]), last+1) if dof<=3]
+
+	# ================= Only Rough Contact Is Bonded =======================
+	slipping=sorted(set([str(name) for name in interactions if friction.get(name)!='rough']))
+	if slipping:
+		raise ValueError('contact pairs with interaction %s are not Rough and cannot '
+			'be bonded (write the deck with contactForm=Rough)' % ', '.join(slipping))
+	return deck
+
+def geometryKey(inpPath):
+	# Key of the model data the unit-modulus region matrices depend on
+	key=hashlib.md5()
+	keyword=None
+	f=open(inpPath)
+	try:
+		for line in f:
+			line=line.strip()
+			if line.startswith('*') and not line.startswith('**'):
+				keyword=_keyword(line)[0]
+				if keyword=='step':
+					break
+			elif keyword=='elastic':
+				line=','.join(line.split(',')[1:])
+			if keyword in geometryKeywords:
+				key.update(line.encode())
+	finally:
+		f.close()
+	return key.hexdigest()
+
+# *****************************************************************************
+# Define Function to Write the Matrix Generation Deck
+# *****************************************************************************
+def writeMatrixDeck(inpPath, matrixPath):
+	# Model data without constraints and boundary conditions, followed by a
+	# single *MATRIX GENERATE step for the stiffness matrix
+	out=[]
+	skip=False
+	f=open(inpPath)
+	try:
+		for line in f:
+			if line.startswith('*') and not line.startswith('**'):
+				keyword=_keyword(line.strip())[0]
+				if keyword=='step':
+					break
+				skip=keyword in removedKeywords
+			if not skip:
+				out.append(line)
+	finally:
+		f.close()
+
+	out+=['** ----------------------------------------------------------------\n',
+		'*Step, name="Region Matrix"\n',
+		'*Matrix Generate, stiffness\n',
+		'*Matrix Output, stiffness, format=matrix input\n',
+		'*End Step\n']
+	f=open(matrixPath, 'w')
+	try:
+		f.write(''.join(out))
+	finally:
+		f.close()
+
+# *****************************************************************************
+# Define Function to Read a Matrix Written with FORMAT=MATRIX INPUT
+# *****************************************************************************
+def readMatrix(mtxPath, dofIndex, numDofs):
+	rows=[]
+	cols=[]
+	vals=[]
+	f=open(mtxPath)
+	try:
+		for line in f:
+			if line.startswith('*'):
+				continue
+			values=line.split(',')
+			if len(values)<5:
+				continue
+			rows.append(dofIndex[(int(values[0]), int(values[1]))])
+			cols.append(dofIndex[(int(values[2]), int(values[3]))])
+			vals.append(float(values[4]))
+	finally:
+		f.close()
+
+	K=sparse.coo_matrix((vals, (rows, cols)), shape=(numDofs, numDofs)).tocsr()
+
+	# ================= Symmetric Matrices Are Written as One Triangle =====
+	if sparse.triu(K, 1).nnz==0 or sparse.tril(K, -1).nnz==0:
+		K=K+K.T-sparse.diags(K.diagonal())
+	return K
+
+# *****************************************************************************
+# Define Function to Generate the Unit-Modulus Region Matrices
+# *****************************************************************************
+def regionMatrices(inpPath, deck, dofIndex, numDofs):
+	base=os.path.splitext(inpPath)[0]
+	cachePath=base+'_regions.npz'
+	regions=[materialParams[m] for m in sorted(deck['elastic']) if m in materialParams]
+	key=geometryKey(inpPath)
+
+	if os.path.exists(cachePath):
+		cache=np.load(cachePath)
+		if 'geometryKey' in cache.files and str(cache['geometryKey'])==key and \
+			all([r+'_indptr' in cache.files and len(cache[r+'_indptr'])==numDofs+1
+				for r in regions]):
+			return dict([(r, sparse.csr_matrix((cache[r+'_data'], cache[r+'_indices'],
+				cache[r+'_indptr']), shape=(numDofs, numDofs))) for r in regions])
+		print('%s is of another geometry, generating the region matrices again' %
+			cachePath)
+
+	# ================= One Deck per Region (patched moduli) ===============
+	workDir=os.path.dirname(os.path.abspath(inpPath))
+	matrixPath=base+'_matrix.inp'
+	writeMatrixDeck(inpPath, matrixPath)
+	template=readTemplate(matrixPath)
+
+	deckMatrices={}
+	for region in regions:
+		jobName='%s-%s' % (os.path.basename(base), region)
+		values=dict([(r, offModulus) for r in regions])
+		values[region]=1.0
+		f=open(os.path.join(workDir, jobName+'.inp'), 'w')
+		try:
+			f.write(renderVariant(template, values))
+		finally:
+			f.close()
+		callAbaqus(['job='+jobName, 'interactive'], workDir, jobName+'.log')
+		deckMatrices[region]=readMatrix(os.path.join(workDir, jobName+'_STIF1.mtx'),
+			dofIndex, numDofs)
+
+	# ================= Remove the Off-Modulus Contributions ===============
+	# D_r = K_r + eps*(S - K_r) and sum(D_r) = S*(1 + (n-1)*eps)
+	eps=offModulus
+	S=sum(deckMatrices.values())/(1+(len(regions)-1)*eps)
+	matrices={}
+	arrays={'geometryKey':np.array(key)}
+	for region in regions:
+		K=((deckMatrices[region]-eps*S)/(1-eps)).tocsr()
+		matrices[region]=K
+		arrays[region+'_data']=K.data
+		arrays[region+'_indices']=K.indices
+		arrays[region+'_indptr']=K.indptr
+	np.savez_compressed(cachePath, **arrays)
+	return matrices
+
+# *****************************************************************************
+# Define Function for the Nodes of a Surface
+# *****************************************************************************
+def surfaceNodes(deck, surfaceName):
+	nodes=set()
+	for elset, face in deck['surfaces'][surfaceName]:
+		for label in deck['elsets'][elset]:
+			elType, conn=deck['elements'][label]
+			topology=faceNodes[re.match(r'C3D\d+', elType).group(0)]
+			nodes.update([conn[i-1] for i in topology[face]])
+	return sorted(nodes)
+
+# *****************************************************************************
+# Define Function for Bonded Springs Replacing Ties and Contact Pairs
+# *****************************************************************************
+def bondedPairs(deck, coords, nodeIndex):
+	pairs=[]
+	for slave, master in deck['pairs']:
+		slaveNodes=[nodeIndex[n] for n in surfaceNodes(deck, slave)]
+		masterNodes=[nodeIndex[n] for n in surfaceNodes(deck, master)]
+		tree=cKDTree(coords[masterNodes])
+		dist, nearest=tree.query(coords[slaveNodes])
+		spacing=np.mean(cKDTree(coords[slaveNodes]).query(coords[slaveNodes], k=2)[0][:,1])
+		for s, m, d in zip(slaveNodes, nearest, dist):
+			if d<=bondTolerance*spacing and s!=masterNodes[m]:
+				pairs.append((s, masterNodes[m]))
+	return np.array(pairs, dtype=int).reshape(-1, 2)
+
+def penaltyMatrix(pairs, numDofs):
+	rows=[]
+	cols=[]
+	vals=[]
+	for dof in range(3):
+		a=3*pairs[:,0]+dof
+		b=3*pairs[:,1]+dof
+		rows+=[a, b, a, b]
+		cols+=[a, b, b, a]
+		vals+=[np.ones(len(a)), np.ones(len(a)), -np.ones(len(a)), -np.ones(len(a))]
+	return sparse.coo_matrix((np.concatenate(vals), (np.concatenate(rows),
+		np.concatenate(cols))), shape=(numDofs, numDofs)).tocsr()
+
+# *****************************************************************************
+# Define Function to Solve One Modulus Set
+# *****************************************************************************
+def solveModuli(moduli, matrices, penalty, fixedDofs, fixedValues, loadDofs):
+	K=sum([moduli[r]*matrices[r] for r in matrices])
+	K=(K+penaltyFactor*K.diagonal().mean()*penalty).tocsc()
+
+	numDofs=K.shape[0]
+	free=np.setdiff1d(np.arange(numDofs), fixedDofs)
+	u=np.zeros(numDofs)
+	u[fixedDofs]=fixedValues
+
+	# ================= Sparse Factorization of the Free Block =============
+	Kff=K[free,:][:,free]
+	Kfp=K[free,:][:,fixedDofs]
+	u[free]=splu(Kff.tocsc()).solve(-Kfp.dot(fixedValues))
+
+	reaction=K[loadDofs,:].dot(u).sum()
+	displacement=u[loadDofs].mean()
+	return abs(reaction/displacement), reaction, displacement
+
+# *****************************************************************************
+# Run Modulus Sweep
+# *****************************************************************************
+if __name__=='__main__':
+	if len(sys.argv)!=3:
+		print('Usage: python Bone_Screw_and_Plate_Region_Stiffness.py flat.inp moduli.csv')
+		sys.exit(1)
+	inpPath, moduliPath=sys.argv[1:]
+
+	try:
+		deck=readDeck(inpPath)
+	except ValueError as error:
+		print('Not decomposed: %s' % error)
+		sys.exit(1)
+	nodeLabels=sorted(deck['nodes'])
+	nodeIndex=dict([(n, i) for i, n in enumerate(nodeLabels)])
+	coords=np.array([deck['nodes'][n] for n in nodeLabels])
+	numDofs=3*len(nodeLabels)
+	dofIndex=dict([((n, d), 3*i+d-1) for n, i in nodeIndex.items() for d in (1, 2, 3)])
+
+	matrices=regionMatrices(inpPath, deck, dofIndex, numDofs)
+	penalty=penaltyMatrix(bondedPairs(deck, coords, nodeIndex), numDofs)
+
+	# ================= Boundary Conditions of the Deck ====================
+	prescribed={}
+	loadDofs=[]
+	for setName, dof, value in deck['boundaries']:
+		if setName.isdigit():
+			nodes=[int(setName)]
+		else:
+			nodes=deck['nsets'][setName]
+		for n in nodes:
+			prescribed[dofIndex[(n, dof)]]=value
+			if value!=0.0:
+				loadDofs.append(dofIndex[(n, dof)])
+	fixedDofs=np.array(sorted(prescribed))
+	fixedValues=np.array([prescribed[d] for d in fixedDofs])
+	loadDofs=sorted(set(loadDofs))
+
+	# ================= Reference Moduli of the Deck =======================
+	reference=dict([(materialParams[m], E) for m, E in deck['elastic'].items()
+		if m in materialParams])
+
+	rows=readTable(moduliPath)
+	for row in rows:
+		moduli=dict(reference)
+		moduli.update([(r, row[r]) for r in reference if row.get(r, '')!=''])
+		row['stiffness'], row['reactionForce'], row['displacement']=solveModuli(
+			moduli, matrices, penalty, fixedDofs, fixedValues, loadDofs)
+		print(', '.join(['%s=%g' % (r, moduli[r]) for r in sorted(moduli)])+
+			': stiffness=%g N/mm' % row['stiffness'])
+
+	writeTable(os.path.splitext(moduliPath)[0]+'_stiffness.csv', rows)
@@ -0,0 +1,352 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code to resume preempted Bone and Screw jobs from their last restart
+#   point (plain Python, drives Abaqus/Standard restart analyses)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     >>python Bone_Screw_and_Plate_Restart.py runs
+#       resumes every killed job in the job directories of runs (e.g. from
+#       the requeued batch job after a preemption)
+#
+#     From Python
+#      >>from Bone_Screw_and_Plate_Restart import *
+#      >>results=runPreemptible({'contactForm':'Lagrange'}, 'Job-Lagrange')
+#
+#     1. Variants are run with restartFrequency, so restart output is written
+#        every restartFrequency increments and at the end of each step, and
+#        with a scratch directory inside the job directory
+#     2. A job is killed when its status file has neither the completed nor
+#        the failed message, and it has no lock file or its files have not
+#        grown for staleSeconds
+#     3. A killed job is resumed in a new job (<jobName>-Resume<n>) reading
+#        the restart files of the last job of the chain that wrote a restart
+#        point (*RESTART, READ); jobs with no restart point are run again
+#        from the start by runPreemptible
+#     4. The results of the jobs of the chain are merged, frames of the
+#        earlier jobs after the restart point being replaced by those of the
+#        later job
+#     5. When the chain completes, the restart files, lock files and scratch
+#        directory are deleted; the ODB of each job of the chain is kept
+#     6. The killed jobs are not written to the run history and increment
+#        store; the outcome and increments of the whole chain are written
+#        when it stops, so a preemption is not taken as a failure to converge
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import os
+import sys
+import json
+import time
+import shutil
+from Bone_Screw_and_Plate_Runner import runVariant, callAbaqus, readResults, \
+	readIncrements, readJobStats, jobCompleted, appendHistory, appendIncrements, \
+	repoDir, RESULTS_SCRIPT, MODEL_SCRIPT, HISTORY_TABLE, INCREMENT_STORE
+from Bone_Screw_and_Plate_Preflight import modelValues
+
+# *****************************************************************************
+# Create a list of 'restart' parameters
+# *****************************************************************************
+
+# Increments between restart points of runPreemptible
+restartFrequency=5
+
+# Largest number of restart jobs of a variant
+maxResumes=10
+
+# Seconds without growth of the status and message files after which a job
+#   with a lock file is taken as killed
+staleSeconds=600.0
+
+# Message written to the status file of a failed analysis (not resumed)
+FAILED_MESSAGE='THE ANALYSIS HAS NOT BEEN COMPLETED'
+
+# Restart files read by a restart analysis, and files deleted with them
+restartFiles=('.res', '.mdl', '.stt', '.prt')
+cleanupFiles=restartFiles+('.lck', '.abq', '.pac', '.sel')
+
+# Scratch directory inside each job directory
+scratchName='scratch'
+
+# Directory of the runs
+workDir='runs'
+
+# *****************************************************************************
+# Define Functions to Read the Chain of Jobs of a Variant
+# *****************************************************************************
+def chainPath(jobDir, jobName):
+	return os.path.join(jobDir, jobName+'_restart.json')
+
+def readChain(jobDir, jobName):
+	# Jobs of the chain (oldest first), restart frequency and CPUs of the jobs
+	path=chainPath(jobDir, jobName)
+	if not os.path.exists(path):
+		return {'jobs':[jobName], 'restartFrequency':restartFrequency, 'numCpus':1}
+	f=open(path)
+	try:
+		return json.load(f)
+	finally:
+		f.close()
+
+def writeChain(jobDir, jobName, chain):
+	f=open(chainPath(jobDir, jobName), 'w')
+	try:
+		json.dump(chain, f, indent=1)
+	finally:
+		f.close()
+
+# *****************************************************************************
+# Define Function to Tell Whether a Job Was Killed
+# *****************************************************************************
+def jobState(jobDir, jobName):
+	# Completed, Failed, Running, Killed, or None if the job did not start
+	staPath=os.path.join(jobDir, jobName+'.sta')
+	if not os.path.exists(staPath):
+		return None
+	if jobCompleted(jobDir, jobName):
+		return 'Completed'
+	f=open(staPath)
+	try:
+		if FAILED_MESSAGE in f.read():
+			return 'Failed'
+	finally:
+		f.close()
+	if os.path.exists(os.path.join(jobDir, jobName+'.lck')):
+		paths=[os.path.join(jobDir, jobName+ext) for ext in ('.sta', '.msg')]
+		lastChange=max([os.path.getmtime(p) for p in paths if os.path.exists(p)])
+		if time.time()-lastChange<staleSeconds:
+			return 'Running'
+	return 'Killed'
+
+# *****************************************************************************
+# Define Function to Find the Last Restart Point of a Job
+# *****************************************************************************
+def restartPoint(jobDir, jobName, frequency):
+	# (step, increment) of the last restart point written, from the accepted
+	#   increments of the status file, or None
+	if not all([os.path.exists(os.path.join(jobDir, jobName+ext))
+		for ext in restartFiles]):
+		return None
+	accepted=[(step, inc) for step, inc, attempt, cutback, iterations, size
+		in readIncrements(jobDir, jobName) if not cutback]
+	point=None
+	for k, (step, inc) in enumerate(accepted):
+		# Restart data are also written at the end of each step
+		stepEnded=k+1<len(accepted) and accepted[k+1][0]>step
+		if inc%frequency==0 or stepEnded:
+			point=(step, inc)
+	return point
+
+# *****************************************************************************
+# Define Function to Resume a Killed Job in a New Job
+# *****************************************************************************
+def resumeJob(jobDir, jobName):
+	# Returns the name of the new job, or None if no job of the chain has a
+	#   restart point
+	chain=readChain(jobDir, jobName)
+	jobs=chain['jobs']
+	for oldJob in reversed(jobs):
+		point=restartPoint(jobDir, oldJob, chain['restartFrequency'])
+		if point is not None:
+			break
+	else:
+		return None
+
+	newJob='%s-Resume%d' % (jobName, len(jobs))
+	f=open(os.path.join(jobDir, newJob+'.inp'), 'w')
+	try:
+		f.write('*HEADING\n')
+		f.write('Resume of %s from step %d increment %d\n' % ((oldJob,)+point))
+		f.write('*RESTART, READ, STEP=%d, INC=%d\n' % point)
+	finally:
+		f.close()
+
+	# ================= Stale Lock of the Killed Job and Old Scratch =======
+	lockPath=os.path.join(jobDir, jobs[-1]+'.lck')
+	if os.path.exists(lockPath):
+		os.remove(lockPath)
+	scratch=os.path.join(jobDir, scratchName)
+	shutil.rmtree(scratch, ignore_errors=True)
+	os.makedirs(scratch)
+
+	writeChain(jobDir, jobName, dict(chain, jobs=jobs+[newJob]))
+	callAbaqus(['job='+newJob, 'oldjob='+oldJob, 'input='+newJob+'.inp',
+		'cpus=%d' % chain['numCpus'], 'scratch='+scratch, 'interactive'], jobDir,
+		'restart.log')
+	return newJob
+
+# *****************************************************************************
+# Define Function to Merge the Results of the Jobs of a Chain
+# *****************************************************************************
+def mergeResults(chain):
+	# Results of the jobs of the chain, oldest first
+	steps=[]
+	cycles={}
+	for results in chain:
+		for step in results.get('steps', []):
+			earlier=[s for s in steps if s['name']==step['name']]
+			if not earlier:
+				steps.append({'name':step['name'], 'frames':list(step['frames'])})
+			elif step['frames']:
+				start=step['frames'][0]['time']
+				earlier[0]['frames']=[frame for frame in earlier[0]['frames']
+					if frame['time']<start]+step['frames']
+		for cycle in results.get('cycles', []):
+			cycles[cycle['step']]=cycle
+
+	merged={}
+	for step in steps:
+		if step['frames']:
+			merged=dict(step['frames'][-1])
+			del merged['time']
+	merged['steps']=steps
+	merged['levels']=[dict(step['frames'][-1], step=step['name'])
+		for step in steps if step['frames']]
+	merged['cycles']=[cycles[step['name']] for step in steps if step['name'] in cycles]
+	for k, cycle in enumerate(merged['cycles']):
+		cycle['cycle']=k+1
+	return merged
+
+def chainResults(jobDir, jobs):
+	chain=[]
+	for job in jobs:
+		if not os.path.exists(os.path.join(jobDir, job+'_results.json')) and \
+			os.path.exists(os.path.join(jobDir, job+'.odb')):
+			callAbaqus(['python', os.path.join(repoDir, RESULTS_SCRIPT), job+'.odb'],
+				jobDir, 'results.log')
+		chain.append(readResults(jobDir, job))
+	return mergeResults(chain)
+
+# *****************************************************************************
+# Define Function to Record the Outcome of a Chain
+# *****************************************************************************
+def chainIncrements(jobDir, jobs):
+	# Attempts of the jobs of the chain, those of the earlier jobs after the
+	#   restart point being replaced by those of the later job
+	increments=[]
+	for job in jobs:
+		rows=readIncrements(jobDir, job)
+		if rows:
+			first=tuple(rows[0][:2])
+			increments=[inc for inc in increments if tuple(inc[:2])<first]
+		increments+=rows
+	return increments
+
+def recordChain(jobDir, jobName, results):
+	# Appends the chain to the run history and increment store, as one run of
+	#   the parameters of its first job (chains still killed are not recorded)
+	chain=readChain(jobDir, jobName)
+	if 'params' not in chain or jobState(jobDir, chain['jobs'][-1]) not in \
+		('Completed', 'Failed'):
+		return
+	increments=chainIncrements(jobDir, chain['jobs'])
+	results['increments']=len([i for i in increments if not i[3]])
+	results['cutbacks']=len([i for i in increments if i[3]])
+	if HISTORY_TABLE:
+		appendHistory(results, chain['params'], chain['modelScript'])
+	if INCREMENT_STORE and increments:
+		appendIncrements(results, chain['params'], chain['modelScript'], increments)
+
+# *****************************************************************************
+# Define Function to Delete the Restart and Scratch Files of a Chain
+# *****************************************************************************
+def cleanChain(jobDir, jobs):
+	for job in jobs:
+		for ext in cleanupFiles:
+			path=os.path.join(jobDir, job+ext)
+			if os.path.exists(path):
+				os.remove(path)
+	shutil.rmtree(os.path.join(jobDir, scratchName), ignore_errors=True)
+
+# *****************************************************************************
+# Define Function to Resume a Chain Until It Completes or Stops
+# *****************************************************************************
+def resumeChain(jobDir, jobName):
+	# Returns the state of the last job of the chain and the number of restart
+	#   jobs started
+	resumes=0
+	jobs=readChain(jobDir, jobName)['jobs']
+	state=jobState(jobDir, jobs[-1])
+	while state=='Killed' and len(jobs)-1<maxResumes:
+		newJob=resumeJob(jobDir, jobName)
+		if newJob is None:
+			break
+		resumes+=1
+		jobs=readChain(jobDir, jobName)['jobs']
+		state=jobState(jobDir, newJob)
+	if state=='Completed':
+		cleanChain(jobDir, jobs)
+	return state, resumes
+
+# *****************************************************************************
+# Define Function to Run a Variant That Survives Preemption
+# *****************************************************************************
+def runPreemptible(params, jobName, modelScript=MODEL_SCRIPT):
+	jobDir=os.path.abspath(os.path.join(workDir, jobName))
+	runParams=dict(params, restartFrequency=restartFrequency,
+		scratchDir=os.path.join(jobDir, scratchName))
+	numCpus=int(modelValues(runParams, modelScript)['numCpus'])
+
+	# Killed before the first restart point, the variant is run again from the
+	#   start
+	for attempt in range(maxResumes+1):
+		if not os.path.isdir(runParams['scratchDir']):
+			os.makedirs(runParams['scratchDir'])
+		writeChain(jobDir, jobName, {'jobs':[jobName],
+			'restartFrequency':restartFrequency, 'numCpus':numCpus,
+			'params':runParams, 'modelScript':os.path.basename(modelScript)})
+		results=runVariant(runParams, jobName, modelScript=modelScript,
+			workDir=workDir, record=False)
+		if 'rejected' in results:
+			return results
+
+		# ============= Resume While the Chain Is Killed ===================
+		start=time.time()
+		state, resumes=resumeChain(jobDir, jobName)
+		if not (state=='Killed' and resumes==0):
+			break
+		cleanChain(jobDir, [jobName])
+
+	jobs=readChain(jobDir, jobName)['jobs']
+	if len(jobs)>1:
+		results.update(chainResults(jobDir, jobs))
+		results.update(readJobStats(jobDir, jobs[-1]))
+		results['wallTime']+=time.time()-start
+	results['completed']=(state=='Completed')
+	results['resumes']=len(jobs)-1
+	results['reruns']=attempt
+	recordChain(jobDir, jobName, results)
+	return results
+
+# *****************************************************************************
+# Resume the Killed Jobs of a Work Directory
+# *****************************************************************************
+if __name__=='__main__':
+	if len(sys.argv)>1:
+		workDir=sys.argv[1]
+
+	for jobName in sorted(os.listdir(workDir)):
+		jobDir=os.path.abspath(os.path.join(workDir, jobName))
+		if not os.path.isdir(jobDir):
+			continue
+		jobs=readChain(jobDir, jobName)['jobs']
+		if jobState(jobDir, jobs[-1])!='Killed':
+			continue
+		state, resumes=resumeChain(jobDir, jobName)
+		if resumes==0:
+			print('%s: killed, no restart point (run it again)' % jobName)
+			continue
+		results=chainResults(jobDir, readChain(jobDir, jobName)['jobs'])
+		results['completed']=(state=='Completed')
+		recordChain(jobDir, jobName, results)
+		f=open(os.path.join(jobDir, jobName+'_merged_results.json'), 'w')
+		try:
+			json.dump(results, f, indent=1)
+		finally:
+			f.close()
+		print('%s: %s after %d restart jobs' % (jobName, state, resumes))
@@ -0,0 +1,235 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code to extract results of the Bone and Screw model from an ODB
+#   (run with the Abaqus Python interpreter)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     At Abaqus command window,  type
+#      >>abaqus python Bone_Screw_and_Plate_Results.py Job-1.odb
+#
+#     The results are written next to the ODB as Job-1_results.json
+#
+#     Results per frame:
+#       stiffness           - reaction force / displacement of 'Bone X Plane' (N/mm)
+#       reactionForce       - total reaction force on 'Bone X Plane' (N)
+#       displacement        - mean X displacement of 'Bone X Plane' (mm)
+#       peakContactPressure - maximum CPRESS on all contact surfaces (N/mm^2)
+#       peakSlip            - maximum tangential slip magnitude CSLIP (mm)
+#
+#     The last frame of each step is also written to 'levels' (one level of a
+#     load ladder per step)
+#
+#     Results per load cycle (cyclicLoad of the model scripts), written to
+#     'cycles' for hole 1 and 2 (no suffix when the ODB does not name the
+#     contact pairs)
+#       micromotion1, 2     - largest slip of a node from the start to the peak
+#                             of the cycle (mm)
+#       slipIncrement1, 2   - largest slip of a node from the start to the end
+#                             of the cycle, accumulated by the cycle (mm)
+#       slip1, 2            - largest slip of a node at the end of the cycle (mm)
+#       peakStiffness       - stiffness at the peak of the cycle (N/mm)
+#
+#     Results of a quasi-static explicit step (solver=Explicit of the model
+#     scripts), from the energy history of the whole model
+#       kineticEnergyRatio    - largest ALLKE/ALLIE once ALLIE exceeds
+#                               energyFloor of its final value
+#       artificialEnergyRatio - ALLAE/ALLIE at the end of the step
+#       massChange            - largest change of the model mass from mass
+#                               scaling, DMASS (%)
+
+# *****************************************************************************
+# Import modules required for Abaqus Python
+# *****************************************************************************
+
+from odbAccess import *
+from math import *
+import sys
+import os
+import json
+
+# Fraction of the final internal energy below which the kinetic energy ratio
+#   is not checked (start of the step)
+energyFloor = 0.1
+
+# *****************************************************************************
+# Define Function to Extract the Results of One Frame
+# *****************************************************************************
+def frameResults(frame, xPlane):
+
+	# ================= Reaction Force and Displacement ====================
+	# (local submodels have no loaded X plane)
+	reactionForce = 0.0
+	displacement = 0.0
+	if xPlane is not None:
+		rf = frame.fieldOutputs['RF'].getSubset(region=xPlane)
+		u = frame.fieldOutputs['U'].getSubset(region=xPlane)
+		reactionForce = sum([v.data[0] for v in rf.values])
+		displacement = sum([v.data[0] for v in u.values])/max(len(u.values),1)
+
+	if displacement != 0:
+		stiffness = abs(reactionForce/displacement)
+	else:
+		stiffness = 0.0
+
+	# ================= Contact Pressure ===================================
+	peakContactPressure = 0.0
+	if 'CPRESS' in frame.fieldOutputs.keys():
+		for v in frame.fieldOutputs['CPRESS'].values:
+			peakContactPressure = max(peakContactPressure, v.data)
+
+	# ================= Tangential Slip ====================================
+	peakSlip = 0.0
+	if 'CSLIP1' in frame.fieldOutputs.keys():
+		slip = {}
+		for name in ('CSLIP1', 'CSLIP2'):
+			if name not in frame.fieldOutputs.keys():
+				continue
+			for v in frame.fieldOutputs[name].values:
+				key = (v.instance and v.instance.name, v.nodeLabel)
+				slip[key] = slip.get(key, 0.0) + v.data**2
+		if slip:
+			peakSlip = sqrt(max(slip.values()))
+
+	return {'time': frame.frameValue,
+		'stiffness': stiffness,
+		'reactionForce': reactionForce,
+		'displacement': displacement,
+		'peakContactPressure': peakContactPressure,
+		'peakSlip': peakSlip}
+
+# *****************************************************************************
+# Define Functions to Extract the Slip at Each Screw Hole
+# *****************************************************************************
+def holeSlip(frame):
+	# Slip vector (CSLIP1, CSLIP2) of each node of each contact pair
+	holes = {}
+	for name in frame.fieldOutputs.keys():
+		if not name.startswith('CSLIP1'):
+			continue
+		pair = name[len('CSLIP1'):]
+		if 'HOLE 2 INTERIOR' in pair.upper():
+			hole = '2'
+		elif 'HOLE INTERIOR' in pair.upper():
+			hole = '1'
+		else:
+			hole = ''
+		slip = holes.setdefault(hole, {})
+		for k, component in enumerate(('CSLIP1', 'CSLIP2')):
+			if component + pair not in frame.fieldOutputs.keys():
+				continue
+			for v in frame.fieldOutputs[component + pair].values:
+				key = (v.instance and v.instance.name, v.nodeLabel)
+				slip.setdefault(key, [0.0, 0.0])[k] = v.data
+	return holes
+
+def slipChange(after, before):
+	# Largest distance slipped by a node between two frames
+	change = 0.0
+	for key, s in after.items():
+		b = before.get(key, (0.0, 0.0))
+		change = max(change, hypot(s[0] - b[0], s[1] - b[1]))
+	return change
+
+# *****************************************************************************
+# Define Function to Extract the Micromotion of Each Load Cycle
+# *****************************************************************************
+def cycleResults(step, xPlane):
+	# Frame 0 holds the state at the start of the step, the peak of the cycle
+	#   is at half the step time
+	frames = step.frames
+	if len(frames) < 2:
+		return None
+	peak = frames[1]
+	for frame in frames[1:]:
+		if abs(frame.frameValue - step.timePeriod/2) < abs(peak.frameValue - step.timePeriod/2):
+			peak = frame
+	start, top, end = holeSlip(frames[0]), holeSlip(peak), holeSlip(frames[-1])
+
+	cycle = {'step': step.name,
+		'peakStiffness': frameResults(peak, xPlane)['stiffness']}
+	for hole in end.keys():
+		cycle['micromotion' + hole] = slipChange(top.get(hole, {}), start.get(hole, {}))
+		cycle['slipIncrement' + hole] = slipChange(end[hole], start.get(hole, {}))
+		cycle['slip' + hole] = slipChange(end[hole], {})
+	return cycle
+
+# *****************************************************************************
+# Define Function to Extract the Energy Ratios of an Explicit Step
+# *****************************************************************************
+def energyResults(step):
+	for region in step.historyRegions.values():
+		outputs = region.historyOutputs
+		if 'ALLKE' not in outputs.keys() or 'ALLIE' not in outputs.keys():
+			continue
+		ke = outputs['ALLKE'].data
+		ie = outputs['ALLIE'].data
+		finalIE = ie[-1][1]
+		if finalIE <= 0:
+			return {}
+
+		energies = {'kineticEnergyRatio': max([k / i for (t, k), (u, i) in zip(ke, ie)
+			if i > energyFloor * finalIE])}
+		if 'ALLAE' in outputs.keys():
+			energies['artificialEnergyRatio'] = outputs['ALLAE'].data[-1][1] / finalIE
+		if 'DMASS' in outputs.keys():
+			energies['massChange'] = max([abs(v) for t, v in outputs['DMASS'].data])
+		return energies
+	return {}
+
+# *****************************************************************************
+# Define Function to Extract the Results of a Job
+# *****************************************************************************
+def odbResults(odbPath):
+	odb = openOdb(path=odbPath, readOnly=True)
+	xPlane = None
+	if 'BONE X PLANE' in odb.rootAssembly.nodeSets.keys():
+		xPlane = odb.rootAssembly.nodeSets['BONE X PLANE']
+
+	steps = []
+	cycles = []
+	energies = {}
+	for step in odb.steps.values():
+		frames = [frameResults(frame, xPlane) for frame in step.frames[1:]]
+		steps.append({'name': step.name, 'frames': frames})
+		energies = energyResults(step) or energies
+
+		# Static steps of one cycle each, or the stabilized cycle of a direct
+		#   cyclic step
+		if step.name.startswith('Cycle ') or step.name == 'Load Cycles (Direct Cyclic)':
+			cycle = cycleResults(step, xPlane)
+			if cycle is not None:
+				cycle['cycle'] = len(cycles) + 1
+				cycles.append(cycle)
+	odb.close()
+
+	# ================= Final State of the Last Completed Frame ============
+	results = {}
+	for step in steps:
+		if step['frames']:
+			results = dict(step['frames'][-1])
+			del results['time']
+	results['steps'] = steps
+	results.update(energies)
+
+	# ================= Final State of Each Step of a Load Ladder ==========
+	results['levels'] = [dict(step['frames'][-1], step=step['name'])
+		for step in steps if step['frames']]
+	results['cycles'] = cycles
+	return results
+
+#*****************************************************************************
+# Extract Results of Each ODB Given on the Command Line
+#*****************************************************************************
+if __name__ == '__main__':
+	for odbPath in sys.argv[1:]:
+		results = odbResults(odbPath)
+		resultsPath = os.path.splitext(odbPath)[0] + '_results.json'
+		f = open(resultsPath, 'w')
+		json.dump(results, f, indent=1)
+		f.close()
+		print('%s: stiffness=%g N/mm, peak CPRESS=%g N/mm^2' % (odbPath,
+			results.get('stiffness', 0), results.get('peakContactPressure', 0)))
@@ -0,0 +1,338 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code to run variants of the Bone and Screw model
+#   (plain Python, drives Abaqus CAE/Standard from the command line)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To use the runner
+#
+#     Each variant is built, solved and post-processed in its own directory
+#
+#      >>abaqus cae noGUI=Bone_Screw_and_Plate_Final_Model.py -- jobName=...
+#      >>abaqus python Bone_Screw_and_Plate_Results.py Job.odb
+#
+#     From Python
+#      >>from Bone_Screw_and_Plate_Runner import *
+#      >>results=runVariants([{'BoneStrength':'Low'},{'BoneStrength':'High'}])
+#
+#     Variants rejected by the pre-flight check are returned with
+#     completed=False and the problems in 'rejected', without starting CAE
+#     (with meshQuality=On, variants whose mesh fails the quality limits are
+#     built but not submitted, and returned the same way)
+#
+#     The Abaqus command can be changed with the environment variable
+#     ABAQUS_CMD (e.g. ABAQUS_CMD=abq2021)
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import os
+import re
+import csv
+import json
+import time
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from Bone_Screw_and_Plate_Preflight import checkParams
+
+# *****************************************************************************
+# Runner settings
+# *****************************************************************************
+
+# Abaqus command
+ABAQUS=os.environ.get('ABAQUS_CMD','abaqus')
+
+# Directory containing the model scripts
+repoDir=os.path.dirname(os.path.abspath(__file__))
+
+# Default model script and results script
+MODEL_SCRIPT='Bone_Screw_and_Plate_Final_Model.py'
+RESULTS_SCRIPT='Bone_Screw_and_Plate_Results.py'
+
+# Message written to the status file of a successful analysis
+COMPLETED_MESSAGE='THE ANALYSIS HAS COMPLETED SUCCESSFULLY'
+
+# Table of instrumentation of past runs, appended after each run (used to
+#   train the runtime and memory model of the scheduler, None to disable)
+HISTORY_TABLE=os.path.join(repoDir, 'run_history.csv')
+
+# Store of the increment histories of past runs, one JSON line per run (used
+#   by the increment controller, None to disable)
+INCREMENT_STORE=os.path.join(repoDir, 'increment_history.jsonl')
+
+# *****************************************************************************
+# Define Function to Call Abaqus
+# *****************************************************************************
+def callAbaqus(args, jobDir, logName):
+	log=open(os.path.join(jobDir, logName), 'a')
+	try:
+		return subprocess.call([ABAQUS]+args, cwd=jobDir, stdout=log,
+			stderr=subprocess.STDOUT, shell=(os.name=='nt'))
+	finally:
+		log.close()
+
+# *****************************************************************************
+# Define Function to Format Parameters as Command Line Overrides
+# *****************************************************************************
+def formatParams(params):
+	return ['%s=%s' % (name, params[name]) for name in sorted(params)]
+
+# *****************************************************************************
+# Define Function to Check Whether a Job Completed
+# *****************************************************************************
+def jobCompleted(jobDir, jobName):
+	staPath=os.path.join(jobDir, jobName+'.sta')
+	if not os.path.exists(staPath):
+		return False
+	f=open(staPath)
+	try:
+		return COMPLETED_MESSAGE in f.read()
+	finally:
+		f.close()
+
+# *****************************************************************************
+# Define Functions to Read the Increments from the Status File
+# *****************************************************************************
+
+# Row of an increment attempt in the status file
+STATUS_ROW=re.compile(r'^\s*(\d+)\s+(\d+)\s+(\d+)(U?)\s+(\d+)\s+(\d+)\s+(\d+)'
+	r'\s+\S+\s+(\S+)\s+(\S+)', re.M)
+
+def statusAttempt(match):
+	# (step, increment, attempt, cut back, equilibrium iterations, increment
+	#   size) of a row of the status file
+	return (int(match.group(1)), int(match.group(2)), int(match.group(3)),
+		match.group(4)=='U', int(match.group(6)), float(match.group(9)))
+
+def statusStepTime(match):
+	# Step time at the end of the increment of a row of the status file
+	return float(match.group(8))
+
+def readIncrements(jobDir, jobName):
+	# Every attempt in the status file
+	staPath=os.path.join(jobDir, jobName+'.sta')
+	if not os.path.exists(staPath):
+		return []
+	f=open(staPath)
+	try:
+		text=f.read()
+	finally:
+		f.close()
+
+	return [statusAttempt(m) for m in STATUS_ROW.finditer(text)]
+
+# *****************************************************************************
+# Define Function to Read Results Written by the Results Script
+# *****************************************************************************
+def readResults(jobDir, jobName):
+	resultsPath=os.path.join(jobDir, jobName+'_results.json')
+	if not os.path.exists(resultsPath):
+		return {}
+	f=open(resultsPath)
+	try:
+		return json.load(f)
+	finally:
+		f.close()
+
+# *****************************************************************************
+# Define Function to Read Problem Size, CPU Time and Memory from the Data File
+# *****************************************************************************
+def readJobStats(jobDir, jobName):
+	datPath=os.path.join(jobDir, jobName+'.dat')
+	if not os.path.exists(datPath):
+		return {}
+	f=open(datPath)
+	try:
+		text=f.read()
+	finally:
+		f.close()
+
+	stats={}
+	for name, label in (('elements', 'NUMBER OF ELEMENTS IS'),
+		('nodes', 'NUMBER OF NODES IS'),
+		('variables', 'TOTAL NUMBER OF VARIABLES IN THE MODEL')):
+		match=re.search(label+r'\s+(\d+)', text)
+		if match:
+			stats[name]=int(match.group(1))
+
+	match=re.search(r'TOTAL CPU TIME \(SEC\)\s*=\s*(\S+)', text)
+	msgPath=os.path.join(jobDir, jobName+'.msg')
+	if not match and os.path.exists(msgPath):
+		# The explicit solver writes it to the message file only
+		f=open(msgPath)
+		try:
+			match=re.search(r'TOTAL CPU TIME \(SEC\)\s*=\s*(\S+)', f.read())
+		finally:
+			f.close()
+	if match:
+		stats['cpuTime']=float(match.group(1))
+
+	# ================= Memory to Minimize I/O of Each Step (MB) ===========
+	memory=[float(m) for m in re.findall(r'MINIMIZE I/O.*?\n\s*\n\s+1\s+\S+\s+\S+\s+(\S+)',
+		text, re.S)]
+	if memory:
+		stats['memoryMB']=max(memory)
+
+	# ================= Floating Point Operations per Factorization ========
+	flops=[float(m) for m in re.findall(r'PER ITERATION.*?\n\s*\n\s+1\s+(\S+)',
+		text, re.S)]
+	if flops:
+		stats['factorFlops']=max(flops)
+	return stats
+
+# *****************************************************************************
+# Define Function to Append a Run to the History Table
+# *****************************************************************************
+_historyLock=threading.Lock()
+historyColumns=['modelScript', 'params', 'completed', 'wallTime', 'elements',
+	'nodes', 'variables', 'memoryMB']
+
+def appendHistory(results, params, modelScript):
+	row=dict(results)
+	row['modelScript']=os.path.basename(modelScript)
+	row['params']=json.dumps(params, sort_keys=True)
+	_historyLock.acquire()
+	try:
+		newTable=not os.path.exists(HISTORY_TABLE)
+		f=open(HISTORY_TABLE, 'a', newline='')
+		try:
+			writer=csv.DictWriter(f, fieldnames=historyColumns, extrasaction='ignore')
+			if newTable:
+				writer.writeheader()
+			writer.writerow(row)
+		finally:
+			f.close()
+	finally:
+		_historyLock.release()
+
+# *****************************************************************************
+# Define Function to Append the Increments of a Run to the Increment Store
+# *****************************************************************************
+def appendIncrements(results, params, modelScript, increments):
+	record={'modelScript':os.path.basename(modelScript), 'params':params,
+		'completed':results['completed'], 'increments':increments}
+	_historyLock.acquire()
+	try:
+		f=open(INCREMENT_STORE, 'a')
+		try:
+			f.write(json.dumps(record, sort_keys=True)+'\n')
+		finally:
+			f.close()
+	finally:
+		_historyLock.release()
+
+# *****************************************************************************
+# Define Function to Build, Solve and Post-Process One Variant
+# *****************************************************************************
+def runVariant(params, jobName, modelScript=MODEL_SCRIPT, workDir='runs',
+	jobAction='Submit', record=True):
+	# record=False leaves the run out of the history table and increment store
+	#   (e.g. a job that may be resumed, recorded when its chain ends)
+
+	jobDir=os.path.abspath(os.path.join(workDir, jobName))
+
+	# ================= Reject Infeasible Parameters Before CAE ============
+	problems=checkParams(params, modelScript)
+	if problems:
+		results=dict(params)
+		results.update({'jobName':jobName, 'jobDir':jobDir, 'wallTime':0.0,
+			'completed':False, 'rejected':'; '.join(problems)})
+		return results
+
+	if not os.path.isdir(jobDir):
+		os.makedirs(jobDir)
+
+	# ================= Build and Solve ====================================
+	start=time.time()
+	callAbaqus(['cae', 'noGUI='+os.path.join(repoDir, modelScript), '--',
+		'jobName='+jobName, 'jobAction='+jobAction, 'meshQualityDir='+repoDir]
+		+formatParams(params), jobDir, 'cae.log')
+	wallTime=time.time()-start
+
+	# ================= Post-Process =======================================
+	results={}
+	odbName=jobName+'.odb'
+	if os.path.exists(os.path.join(jobDir, odbName)):
+		callAbaqus(['python', os.path.join(repoDir, RESULTS_SCRIPT), odbName],
+			jobDir, 'results.log')
+		results=readResults(jobDir, jobName)
+
+	results.update(params)
+	results['jobName']=jobName
+	results['jobDir']=jobDir
+	results['wallTime']=wallTime
+	results['completed']=jobCompleted(jobDir, jobName)
+	results.update(readJobStats(jobDir, jobName))
+	increments=readIncrements(jobDir, jobName)
+	results['increments']=len([i for i in increments if not i[3]])
+	results['cutbacks']=len([i for i in increments if i[3]])
+
+	# ================= Variants Not Submitted for Their Mesh Quality ======
+	meshReportPath=os.path.join(jobDir, jobName+'_mesh_quality.json')
+	if os.path.exists(meshReportPath):
+		f=open(meshReportPath)
+		try:
+			meshReport=json.load(f)
+		finally:
+			f.close()
+		if not meshReport['passed']:
+			results['rejected']='; '.join(meshReport['problems'])
+
+	if HISTORY_TABLE and jobAction=='Submit' and record:
+		appendHistory(results, params, modelScript)
+	if INCREMENT_STORE and jobAction=='Submit' and record and increments:
+		appendIncrements(results, params, modelScript, increments)
+	return results
+
+# *****************************************************************************
+# Define Function to Run Many Variants in Parallel
+# *****************************************************************************
+def runVariants(paramList, jobPrefix='Variant', numWorkers=1, **kwargs):
+	jobNames=['%s-%04d' % (jobPrefix, i) for i in range(len(paramList))]
+
+	pool=ThreadPoolExecutor(max_workers=numWorkers)
+	try:
+		futures=[pool.submit(runVariant, params, jobName, **kwargs)
+			for params, jobName in zip(paramList, jobNames)]
+		return [future.result() for future in futures]
+	finally:
+		pool.shutdown()
+
+# *****************************************************************************
+# Define Functions to Write and Read Tables of Results (CSV)
+# *****************************************************************************
+def writeTable(path, rows, columns=None):
+	if columns is None:
+		columns=[]
+		for row in rows:
+			columns+=[k for k in row if k not in columns and
+				k not in ('steps', 'levels', 'cycles')]
+	f=open(path, 'w', newline='')
+	try:
+		writer=csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+		writer.writeheader()
+		writer.writerows(rows)
+	finally:
+		f.close()
+
+def readTable(path):
+	f=open(path, newline='')
+	try:
+		rows=list(csv.DictReader(f))
+	finally:
+		f.close()
+
+	for row in rows:
+		for k, v in row.items():
+			if v in ('True', 'False'):
+				row[k]=(v=='True')
+				continue
+			try:
+				row[k]=float(v)
+			except ValueError:
+				pass
+	return rows
@@ -0,0 +1,281 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code to predict wall time and memory of Bone and Screw variants and
+#   schedule them longest-first (plain Python with NumPy, uses the runner)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     >>python Bone_Screw_and_Plate_Scheduler.py sweep.csv
+#       plans the variants of sweep.csv (one column per parameter) on nodes
+#     >>python Bone_Screw_and_Plate_Scheduler.py sweep.csv --run
+#       runs them on this machine, longest first
+#
+#     1. The runner appends the wall time, problem size and memory of every
+#        run to its history table
+#     2. Log wall time and log memory are fitted by least squares to
+#          log(elements), log(nodes), contact pairs, contactForm,
+#          log(numCpus) and log(meshSize)
+#        Element and node counts of queued variants are the pre-flight
+#        estimates, scaled by the mean ratio of actual to estimated counts
+#     3. Variants are queued longest predicted wall time first, and each is
+#        placed on the fullest node with enough free cores and memory
+#     4. When run locally the model is updated after every completed run and
+#        the queue is re-predicted before the next job is started
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import os
+import sys
+import json
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from Bone_Screw_and_Plate_Runner import runVariant, writeTable, readTable, \
+	HISTORY_TABLE, MODEL_SCRIPT
+from Bone_Screw_and_Plate_Preflight import modelValues, estimateCost
+
+# *****************************************************************************
+# Create a list of 'scheduling' parameters
+# *****************************************************************************
+
+# Nodes of the cluster for a plan (cores, memory in MB)
+nodes=[(32, 128e3)]*4
+
+# Cores and memory (MB) of this machine for a local run
+localCores=os.cpu_count() or 1
+localMemoryMB=16e3
+
+# Ridge regularization of the least squares fit
+ridge=1e-3
+
+# Tables of the planned schedule and of the results of a local run
+scheduleTable='schedule.csv'
+resultsTable='schedule_results.csv'
+
+# Directory of the runs
+workDir='runs'
+
+# Predicted quantities
+targets=['wallTime', 'memoryMB']
+
+featureNames=['intercept', 'logElements', 'logNodes', 'contactPairs', 'Rough',
+	'Lagrange', 'Coulomb', 'logNumCpus', 'logMeshSize']
+
+# *****************************************************************************
+# Define Functions for the Features of a Variant
+# *****************************************************************************
+def variantSize(params, modelScript):
+	est=estimateCost(params, modelScript)
+	return est['elements'], est['dofs']//3
+
+def features(params, modelScript, elements, nodes):
+	values=modelValues(params, modelScript)
+	if values['contactForm']=='Tie':
+		contactPairs=0
+	elif values['submodelHole']:
+		contactPairs=1
+	else:
+		contactPairs=2
+	return np.array([1.0, np.log(elements), np.log(nodes), contactPairs]
+		+[float(values['contactForm']==form) for form in featureNames[4:7]]
+		+[np.log(values['numCpus']), np.log(values['meshSize'])])
+
+# *****************************************************************************
+# Define Functions for the Online Least Squares Model
+# *****************************************************************************
+def newModel():
+	n=len(featureNames)
+	return {'A':np.zeros((n,n)), 'b':dict([(t, np.zeros(n)) for t in targets]),
+		'counts':dict([(t, 0) for t in targets]),
+		'logElementRatio':0.0, 'logNodeRatio':0.0, 'numRatios':0}
+
+def updateModel(model, params, modelScript, row):
+	# Only completed runs with the problem size read from the data file
+	if not row.get('completed') or not row.get('elements') or not row.get('nodes'):
+		return
+	x=features(params, modelScript, row['elements'], row['nodes'])
+	model['A']+=np.outer(x, x)
+	for t in targets:
+		if row.get(t):
+			model['b'][t]+=x*np.log(row[t])
+			model['counts'][t]+=1
+
+	# ================= Actual Against Pre-Flight Problem Size =============
+	estElements, estNodes=variantSize(params, modelScript)
+	model['logElementRatio']+=np.log(float(row['elements'])/estElements)
+	model['logNodeRatio']+=np.log(float(row['nodes'])/estNodes)
+	model['numRatios']+=1
+
+def predict(model, params, modelScript):
+	elements, nodes=variantSize(params, modelScript)
+	if model['numRatios']:
+		elements*=np.exp(model['logElementRatio']/model['numRatios'])
+		nodes*=np.exp(model['logNodeRatio']/model['numRatios'])
+	x=features(params, modelScript, elements, nodes)
+
+	prediction={'elements':int(elements), 'nodes':int(nodes)}
+	A=model['A']+ridge*np.eye(len(x))
+	for t in targets:
+		if model['counts'][t]<len(x):
+			# Too few runs; the pre-flight cost still orders the queue
+			prediction[t]=None
+			continue
+		prediction[t]=float(np.exp(x.dot(np.linalg.solve(A, model['b'][t]))))
+	prediction['cost']=estimateCost(params, modelScript)['cost']
+	return prediction
+
+def loadHistory(model=None):
+	if model is None:
+		model=newModel()
+	if HISTORY_TABLE and os.path.exists(HISTORY_TABLE):
+		for row in readTable(HISTORY_TABLE):
+			updateModel(model, json.loads(row['params']), row['modelScript'], row)
+	return model
+
+# *****************************************************************************
+# Define Function for the Longest-First Order of a Queue
+# *****************************************************************************
+def longestFirst(predictions):
+	if all(p['wallTime'] is not None for p in predictions):
+		key=lambda i: predictions[i]['wallTime']
+	else:
+		key=lambda i: predictions[i]['cost']
+	return sorted(range(len(predictions)), key=key, reverse=True)
+
+def jobNeeds(params, modelScript, prediction):
+	return int(modelValues(params, modelScript)['numCpus']), prediction['memoryMB'] or 0.0
+
+# *****************************************************************************
+# Define Function to Plan a Queue on Nodes (longest first, best fit)
+# *****************************************************************************
+def planSchedule(paramList, model, modelScript=MODEL_SCRIPT, nodes=nodes,
+	order=None):
+	predictions=[predict(model, params, modelScript) for params in paramList]
+	if order is None:
+		order=longestFirst(predictions)
+	freeCores=[cores for cores, memory in nodes]
+	freeMemory=[memory for cores, memory in nodes]
+	running=[]
+	queue=list(order)
+	rows=[None]*len(paramList)
+	now=0.0
+
+	while queue:
+		# ============= Start Every Queued Job That Fits Now ===============
+		for i in list(queue):
+			cores, memory=jobNeeds(paramList[i], modelScript, predictions[i])
+			cores=min(cores, max([c for c, m in nodes]))
+			fits=[k for k in range(len(nodes)) if cores<=freeCores[k]
+				and (memory<=freeMemory[k] or freeCores[k]==nodes[k][0])]
+			if not fits:
+				continue
+			k=min(fits, key=lambda k: (freeMemory[k]-memory, freeCores[k]))
+			duration=predictions[i]['wallTime'] or predictions[i]['cost']
+			freeCores[k]-=cores
+			freeMemory[k]-=memory
+			running.append((now+duration, k, cores, memory))
+			rows[i]=dict(paramList[i], node=k, start=now, finish=now+duration,
+				**predictions[i])
+			queue.remove(i)
+
+		# ============= Advance to the Next Job to Finish ==================
+		if queue:
+			running.sort()
+			finish, k, cores, memory=running.pop(0)
+			now=finish
+			freeCores[k]+=cores
+			freeMemory[k]+=memory
+
+	makespan=max([row['finish'] for row in rows] or [0.0])
+	return rows, makespan
+
+# *****************************************************************************
+# Define Function to Run a Queue on This Machine (model updated online)
+# *****************************************************************************
+def runQueue(paramList, model, modelScript=MODEL_SCRIPT, jobPrefix='Sched',
+	cores=localCores, memoryMB=localMemoryMB):
+	jobNames=['%s-%04d' % (jobPrefix, i) for i in range(len(paramList))]
+	pending=list(range(len(paramList)))
+	running={}
+	freeCores=cores
+	freeMemory=memoryMB
+	results=[None]*len(paramList)
+
+	pool=ThreadPoolExecutor(max_workers=max(cores, 1))
+	try:
+		while pending or running:
+			# ========= Re-Predict the Queue and Start What Fits ===========
+			predictions=[predict(model, paramList[i], modelScript) for i in pending]
+			for j in longestFirst(predictions):
+				i=pending[j]
+				needCores, needMemory=jobNeeds(paramList[i], modelScript, predictions[j])
+				if running and (needCores>freeCores or needMemory>freeMemory):
+					continue
+				freeCores-=needCores
+				freeMemory-=needMemory
+				future=pool.submit(runVariant, paramList[i], jobNames[i],
+					modelScript=modelScript, workDir=workDir)
+				running[future]=(i, needCores, needMemory)
+			pending=[i for i in pending if i not in
+				[value[0] for value in running.values()]]
+
+			# ========= Learn from Each Completed Run ======================
+			done, notDone=wait(list(running), return_when=FIRST_COMPLETED)
+			for future in done:
+				i, needCores, needMemory=running.pop(future)
+				freeCores+=needCores
+				freeMemory+=needMemory
+				results[i]=future.result()
+				updateModel(model, paramList[i], modelScript, results[i])
+	finally:
+		pool.shutdown()
+	return results
+
+# *****************************************************************************
+# Define Function for the Fit Error of the Model on Its History
+# *****************************************************************************
+def historyError(model):
+	errors=dict([(t, []) for t in targets])
+	if HISTORY_TABLE and os.path.exists(HISTORY_TABLE):
+		for row in readTable(HISTORY_TABLE):
+			if not row['completed']:
+				continue
+			prediction=predict(model, json.loads(row['params']), row['modelScript'])
+			for t in targets:
+				if prediction[t] and row.get(t):
+					errors[t].append(np.log(prediction[t]/row[t]))
+	return dict([(t, np.sqrt(np.mean(np.square(e))) if e else None)
+		for t, e in errors.items()])
+
+# *****************************************************************************
+# Run Scheduler
+# *****************************************************************************
+if __name__=='__main__':
+	sweepTable=sys.argv[1]
+	paramList=[dict([(k, v) for k, v in row.items() if v!=''])
+		for row in readTable(sweepTable)]
+
+	model=loadHistory()
+	for t, error in historyError(model).items():
+		if error is None:
+			print('%s: too few runs in the history, queue ordered by pre-flight cost' % t)
+		else:
+			print('%s: RMS error of the fit on the history %.1f%%' % (t,
+				100*(np.exp(error)-1)))
+
+	if '--run' in sys.argv:
+		rows=runQueue(paramList, model)
+		writeTable(resultsTable, rows)
+		print('%d of %d variants completed, results written to %s' % (
+			len([row for row in rows if row['completed']]), len(rows), resultsTable))
+	else:
+		rows, makespan=planSchedule(paramList, model)
+		fifoRows, fifoMakespan=planSchedule(paramList, model,
+			order=range(len(paramList)))
+		writeTable(scheduleTable, rows)
+		print('Planned makespan %.4g (in order of the sweep %.4g), schedule written '
+			'to %s' % (makespan, fifoMakespan, scheduleTable))
@@ -0,0 +1,130 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code to benchmark the solver techniques of the static step of the
+#   Bone and Screw model (plain Python, uses the runner)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     >>python Bone_Screw_and_Plate_Solver_Benchmark.py
+#       or, for another design
+#     >>python Bone_Screw_and_Plate_Solver_Benchmark.py Bone_Screw_and_Plate_New_Design.py
+#
+#     1. Each contact formulation is solved at each mesh size with every
+#        feasible pair of matrixSolver (Direct, Iterative) and matrixStorage
+#        (Symmetric, Unsymmetric); pairs rejected by the pre-flight check
+#        (e.g. the iterative solver with unsymmetric storage) are skipped
+#     2. The CPU time, wall time, memory and floating point operations per
+#        factorization (from the .dat file) of each case are written to
+#        benchmarkTable, with the change of the tracked responses against the
+#        direct unsymmetric solution
+#     3. The fastest pair within tolerance is reported for each contact
+#        formulation and mesh size, to check the rules of matrixSolver=Auto
+#        and matrixStorage=Auto in the model scripts
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import sys
+from Bone_Screw_and_Plate_Runner import runVariants, writeTable, MODEL_SCRIPT
+from Bone_Screw_and_Plate_Preflight import checkParams
+from Bone_Screw_and_Plate_Mesh_Convergence import relativeChange
+
+# *****************************************************************************
+# Create a list of 'benchmark' parameters
+# *****************************************************************************
+
+# Contact formulations and mesh sizes compared
+contactForms=['Rough', 'Coulomb', 'Lagrange', 'Tie']
+meshSizes=[0.65, 0.325]
+
+# Solver techniques (matrixSolver, matrixStorage); the first one is the
+#   reference of each case
+techniques=[('Direct', 'Unsymmetric'), ('Direct', 'Symmetric'),
+	('Iterative', 'Symmetric')]
+
+# Fixed model parameters for all cases
+baseParams={}
+
+# Responses tracked and change against the reference accepted
+responses=['stiffness', 'reactionForce']
+tolerance=1e-3
+
+# Number of cases solved at the same time
+numWorkers=2
+
+# Directory of the runs
+workDir='runs'
+
+# Table of benchmark results
+benchmarkTable='solver_benchmark.csv'
+
+# *****************************************************************************
+# Define Function to Run the Benchmark
+# *****************************************************************************
+def solverBenchmark(modelScript=MODEL_SCRIPT):
+	prefix='Solver-'+modelScript.replace('Bone_Screw_and_Plate_', '').replace('.py', '')
+	paramList=[]
+	for form in contactForms:
+		for size in meshSizes:
+			for solver, storage in techniques:
+				params=dict(baseParams, contactForm=form, meshSize=size,
+					matrixSolver=solver, matrixStorage=storage)
+				if not checkParams(params, modelScript):
+					paramList.append(params)
+	rows=runVariants(paramList, jobPrefix=prefix, numWorkers=numWorkers,
+		modelScript=modelScript, workDir=workDir)
+
+	# ================= Change Against the Reference and Fastest Pair ======
+	best={}
+	for form in contactForms:
+		for size in meshSizes:
+			case=[row for row in rows if row['contactForm']==form
+				and row['meshSize']==size and row['completed']]
+			reference=[row for row in case if (row['matrixSolver'],
+				row['matrixStorage'])==techniques[0]]
+			if not reference:
+				continue
+			reference=reference[0]
+			for row in case:
+				row['cpuTime']=row.get('cpuTime', row['wallTime'])
+				row['maxChange']=max([relativeChange(row[r], reference[r])
+					for r in responses])
+				if row['maxChange']<tolerance and ((form, size) not in best or
+					row['cpuTime']<best[form, size]['cpuTime']):
+					best[form, size]=row
+	return rows, best
+
+# *****************************************************************************
+# Run Benchmark
+# *****************************************************************************
+if __name__=='__main__':
+	if len(sys.argv)>1:
+		modelScript=sys.argv[1]
+	else:
+		modelScript=MODEL_SCRIPT
+
+	rows, best=solverBenchmark(modelScript)
+	writeTable(benchmarkTable, rows, ['contactForm', 'meshSize', 'matrixSolver',
+		'matrixStorage', 'completed', 'nodes', 'variables', 'cpuTime', 'wallTime',
+		'memoryMB', 'factorFlops', 'maxChange']+responses)
+
+	print('%-10s %-10s %-10s %-12s %-10s %-10s %-10s' % ('contact', 'meshSize',
+		'solver', 'storage', 'cpuTime', 'memoryMB', 'flops'))
+	for row in rows:
+		if not row['completed']:
+			print('%-10s %-10.4g %-10s %-12s did not complete, see %s' % (
+				row['contactForm'], row['meshSize'], row['matrixSolver'],
+				row['matrixStorage'], row['jobDir']))
+			continue
+		print('%-10s %-10.4g %-10s %-12s %-10.1f %-10s %-10s' % (row['contactForm'],
+			row['meshSize'], row['matrixSolver'], row['matrixStorage'],
+			row.get('cpuTime', row['wallTime']), row.get('memoryMB', ''),
+			row.get('factorFlops', '')))
+
+	for (form, size), row in sorted(best.items()):
+		print('%s, meshSize=%.4g: fastest matrixSolver=%s matrixStorage=%s' % (
+			form, size, row['matrixSolver'], row['matrixStorage']))
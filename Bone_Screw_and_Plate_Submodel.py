@@ -0,0 +1,96 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code for global-to-local submodelling of the screw holes
+#   (plain Python, drives the Bone and Screw model through the runner)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     >>python Bone_Screw_and_Plate_Submodel.py
+#
+#     1. The global model is solved once with a coarse globalMeshSize
+#     2. A local submodel of each screw hole (the partition block around
+#        (cx, cy) or (cx2, cy2)) is built with a fine localMeshSize, its cut
+#        faces driven by displacements interpolated from the global ODB
+#          (model scripts with submodelHole=1 or 2 and globalOdb=...)
+#     3. The local submodels are solved in parallel and the hole-interface
+#        responses of the global and local models are written to
+#        submodelTable
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import os
+import sys
+from Bone_Screw_and_Plate_Runner import runVariant, runVariants, writeTable, MODEL_SCRIPT
+
+# *****************************************************************************
+# Create a list of 'submodel' parameters
+# *****************************************************************************
+
+# Mesh size of the global model and of the local submodels
+globalMeshSize=1.3
+localMeshSize=0.325
+
+# Fixed model parameters for the global and local models
+baseParams={}
+
+# Screw holes with a local submodel
+holes=[1, 2]
+
+# Directory of the runs
+workDir='runs'
+
+# Table of global and local responses
+submodelTable='submodel.csv'
+
+# Hole-interface responses compared
+responses=['peakContactPressure', 'peakSlip']
+
+# *****************************************************************************
+# Define Function to Run the Global Model and the Local Submodels
+# *****************************************************************************
+def submodelStudy(modelScript=MODEL_SCRIPT):
+	prefix='Sub-'+modelScript.replace('Bone_Screw_and_Plate_', '').replace('.py', '')
+
+	# ================= Coarse Global Model ================================
+	globalRow=runVariant(dict(baseParams, meshSize=globalMeshSize),
+		prefix+'-Global', modelScript=modelScript, workDir=workDir)
+	if not globalRow['completed']:
+		print('Global model did not complete, see %s' % globalRow['jobDir'])
+		return globalRow, []
+	globalOdb=os.path.join(globalRow['jobDir'], globalRow['jobName']+'.odb')
+
+	# ================= Fine Local Submodels in Parallel ===================
+	paramList=[dict(baseParams, meshSize=localMeshSize, submodelHole=hole,
+		globalOdb=globalOdb) for hole in holes]
+	localRows=runVariants(paramList, jobPrefix=prefix+'-Local',
+		numWorkers=len(holes), modelScript=modelScript, workDir=workDir)
+	return globalRow, localRows
+
+# *****************************************************************************
+# Run Submodel Study
+# *****************************************************************************
+if __name__=='__main__':
+	if len(sys.argv)>1:
+		modelScript=sys.argv[1]
+	else:
+		modelScript=MODEL_SCRIPT
+
+	globalRow, localRows=submodelStudy(modelScript)
+	globalRow['submodelHole']=0
+	rows=[globalRow]+localRows
+	writeTable(submodelTable, rows, ['submodelHole', 'meshSize', 'wallTime',
+		'completed']+responses)
+
+	print('%-8s %-10s %-10s' % ('hole', 'meshSize', 'wallTime') + ''.join(
+		['%-22s' % r for r in responses]))
+	for row in rows:
+		if not row['completed']:
+			print('%-8d did not complete, see %s' % (row['submodelHole'], row['jobDir']))
+			continue
+		print('%-8d %-10.4g %-10.1f' % (row['submodelHole'], row['meshSize'],
+			row['wallTime']) + ''.join(['%-22.4g' % row[r] for r in responses]))
@@ -0,0 +1,111 @@
+
+# -----------------------------------------------------------------------------
+#
+# Python code to validate the bonded approximation of 'Rough' contact
+#   (plain Python, compares contactForm=Tie against contactForm=Rough)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# To run the Python
+#
+#     >>python Bone_Screw_and_Plate_Tie_Validation.py
+#       or, for another design
+#     >>python Bone_Screw_and_Plate_Tie_Validation.py Bone_Screw_and_Plate_New_Design.py
+#
+#     1. Each sample case is solved with full 'Rough' contact (nonlinear,
+#        10 increments) and with the screws tied to the bone (one linear
+#        increment), numWorkers jobs at a time
+#     2. The relative error of the tied solution and the speed-up are written
+#        to validationTable for each case
+#     3. The approximation is accepted for screening when every case is
+#        within tolerance
+#
+#     Tied screws carry no contact pressure or slip, so only the global
+#     responses are compared
+
+# *****************************************************************************
+# Import modules required for Python
+# *****************************************************************************
+
+import sys
+from Bone_Screw_and_Plate_Runner import runVariants, writeTable, MODEL_SCRIPT
+from Bone_Screw_and_Plate_Mesh_Convergence import relativeChange
+
+# *****************************************************************************
+# Create a list of 'validation' parameters
+# *****************************************************************************
+
+# Sample cases (spanning the bone strength and cortical thickness studied)
+sampleCases=[
+	{'BoneStrength':'Low', 'dcort':0.5},
+	{'BoneStrength':'Med', 'dcort':0.75},
+	{'BoneStrength':'High', 'dcort':1.0},
+	{'BoneStrength':'Low', 'dcort':1.0},
+	{'BoneStrength':'High', 'dcort':0.5}]
+
+# Responses compared
+responses=['stiffness', 'reactionForce']
+
+# Relative error accepted for screening
+tolerance=0.05
+
+# Number of jobs solved at the same time
+numWorkers=2
+
+# Table of validation results
+validationTable='tie_validation.csv'
+
+# *****************************************************************************
+# Define Function to Compare Tied and Full Contact Solutions
+# *****************************************************************************
+def validateTie(modelScript=MODEL_SCRIPT):
+	prefix='Tie-'+modelScript.replace('Bone_Screw_and_Plate_', '').replace('.py', '')
+	paramList=[dict(case, contactForm=form) for case in sampleCases
+		for form in ('Rough', 'Tie')]
+	runs=runVariants(paramList, jobPrefix=prefix, numWorkers=numWorkers,
+		modelScript=modelScript)
+
+	rows=[]
+	for case, rough, tie in zip(sampleCases, runs[0::2], runs[1::2]):
+		row=dict(case)
+		row['completed']=rough['completed'] and tie['completed']
+		if row['completed']:
+			row['speedUp']=rough['wallTime']/tie['wallTime']
+			for r in responses:
+				row[r]=rough[r]
+				row[r+'Tie']=tie[r]
+				row[r+'Error']=relativeChange(tie[r], rough[r])
+		rows.append(row)
+	return rows
+
+# *****************************************************************************
+# Run Validation
+# *****************************************************************************
+if __name__=='__main__':
+	if len(sys.argv)>1:
+		modelScript=sys.argv[1]
+	else:
+		modelScript=MODEL_SCRIPT
+
+	rows=validateTie(modelScript)
+	columns=list(sampleCases[0])+['completed', 'speedUp']
+	for r in responses:
+		columns+=[r, r+'Tie', r+'Error']
+	writeTable(validationTable, rows, columns)
+
+	accepted=True
+	for row in rows:
+		case=', '.join(['%s=%s' % (k, row[k]) for k in sampleCases[0]])
+		if not row['completed']:
+			print('%s: did not complete' % case)
+			accepted=False
+			continue
+		errors=[row[r+'Error'] for r in responses]
+		accepted=accepted and max(errors)<tolerance
+		print('%s: speed-up %.1fx, ' % (case, row['speedUp']) + ', '.join(
+			['%s error %.3g%%' % (r, 100*e) for r, e in zip(responses, errors)]))
+
+	if accepted:
+		print('Tie approximation within %g of Rough contact for all cases' % tolerance)
+	else:
+		print('Tie approximation NOT within %g of Rough contact' % tolerance)